@@ -23,6 +23,16 @@ class LogConfig:
     LOG_FILE_PREFIX: Final[str] = 'test_execution'
     LOG_DIRECTORY: Final[str] = 'logs'
     
+    # Log rotation: rotated files are gzip-compressed, oldest are deleted
+    LOG_MAX_BYTES: Final[int] = 10 * 1024 * 1024
+    LOG_BACKUP_COUNT: Final[int] = 5
+    
+    # Number of recent Appium server output lines kept in memory
+    APPIUM_OUTPUT_TAIL: Final[int] = 500
+    
+    # Records kept in memory until the log file is opened
+    LOG_BUFFER_CAPACITY: Final[int] = 10000
+    
     # Log level mapping
     LOG_LEVELS: Final[Dict[str, int]] = {
         'DEBUG': logging.DEBUG,
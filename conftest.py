@@ -1,27 +1,161 @@
 """PyTest configuration and fixtures for test automation."""
 
+import json
+import os
+import sys
 import time
-from typing import Generator
-import pytest
+from typing import TYPE_CHECKING, Generator, Optional
 
 import pytest
-from appium.webdriver.webdriver import WebDriver
 
-from utils.driver_factory import create_driver
-from utils.appium_launcher import start_appium, stop_appium
-from utils.logger import logger
+from utils.artifact_collector import artifact_collector
+from utils.logger import Logger, logger
+from utils.step_tracker import step_tracker
 from utils.test_helpers import check_emulator, format_duration, ScreenValidator
-from test_settings import IS_REINSTALL_APP
+from test_settings import (
+    APK_NAME,
+    ENABLE_DRIVER_WATCHDOG,
+    ENABLE_LIVENESS_CHECKS,
+    ENABLE_LOGCAT_STREAM,
+    ENABLE_SCREEN_RECORDING,
+    ENABLE_SESSION_CACHE,
+    IS_REINSTALL_APP,
+    MATRIX_FILE,
+    MATRIX_RESET,
+    PERF_RESULTS_DIR,
+    SOAK_RESET
+)
+
+# Modules talking to the device (appium, selenium, requests) are imported
+# inside the fixtures using them, so collection and dry runs stay fast and
+# free of device, Appium and log file side effects.
+if TYPE_CHECKING:
+    from appium.webdriver.webdriver import WebDriver
+    from flows.navigator import Navigator
+    from flows.resumable import ResumableFlow
+    from utils.checkpoints import CheckpointStore
+    from utils.perf_sampler import PerfSampler
+    from utils.results_db import ResultsRecorder
 
 logger.debug("conftest.py LOADED")
 
-# Global validator instance
-screen_validator = ScreenValidator()
+# Recorder of the running session's results, None when recording is disabled
+results_recorder: Optional["ResultsRecorder"] = None
+
+# Markers of long runs skipped unless their option is given
+OPT_IN_MARKERS = {'soak': '--soak-flow', 'matrix': '--matrix'}
+
+def pytest_addoption(parser) -> None:
+    """Register command line options of the framework.
+    Args:
+        parser: PyTest argument parser
+    """
+    group = parser.getgroup("soak", "Soak/endurance runs")
+    group.addoption("--soak-flow", default=None,
+                    help="Name of the flow to repeat in tests/test_soak.py (e.g. warm_full_flow)")
+    group.addoption("--soak-iterations", type=int, default=None,
+                    help="Maximum number of soak iterations")
+    group.addoption("--soak-duration", type=float, default=None,
+                    help="Maximum soak duration in minutes")
+    group.addoption("--soak-reset", choices=("back", "clear"), default=SOAK_RESET,
+                    help="Reset between soak iterations by back (app keeps running) or clear")
+    group = parser.getgroup("matrix", "Ingredient combination matrix runs")
+    group.addoption("--matrix", nargs="?", const=MATRIX_FILE, default=None, metavar="PATH",
+                    help=f"Run the combinations of a JSON/CSV matrix file (default {MATRIX_FILE})")
+    group.addoption("--matrix-reset", choices=("back", "relaunch"), default=MATRIX_RESET,
+                    help="Return to ingredient selection between combinations by back or relaunch")
+    group = parser.getgroup("scheduling", "History-based test scheduling")
+    group.addoption("--shard", default=None, metavar="K/N",
+                    help="Run only shard K of N, balanced by historical test duration")
+    group.addoption("--no-history-order", action="store_true", default=False,
+                    help="Keep collection order instead of longest-first, flaky-last")
+    group.addoption("--no-results-db", action="store_true", default=False,
+                    help="Do not record this run in the results database")
+    group.addoption("--impacted-by", default=None, metavar="REF",
+                    help="Run only tests affected by the changes since git REF (e.g. origin/main)")
+
+def pytest_configure(config) -> None:
+    """Check the shard option and set up recording of test results into the results database.
+    Args:
+        config: PyTest config object
+    Raises:
+        pytest.UsageError: If --shard is not K/N with 1 <= K <= N
+    """
+    global results_recorder
+    if config.getoption("--shard"):
+        from utils.results_db import parse_shard
+        try:
+            parse_shard(config.getoption("--shard"))
+        except ValueError as e:
+            raise pytest.UsageError(f"--{e}") from None
+    if config.getoption("--no-results-db") or config.getoption("--collect-only"):
+        return
+    from utils.results_db import ResultsRecorder, results_db
+    results_recorder = ResultsRecorder(results_db)
+    results_db.start_run(shard=config.getoption("--shard"))
+    step_tracker.add_listener(results_recorder.on_step)
+
+def pytest_collection_modifyitems(session, config, items) -> None:
+    """Skip opt-in runs that were not requested, select tests impacted by a diff, order
+    them longest-first with flaky tests last, and select the requested shard. Requested
+    matrix runs stay in every shard and run their shard of the combinations instead.
+    Args:
+        session: PyTest session object
+        config: PyTest config object
+        items: Collected test items, reordered in place
+    """
+    # Skipped before their fixtures start a driver session
+    for marker, option in OPT_IN_MARKERS.items():
+        if not config.getoption(option):
+            skip = pytest.mark.skip(reason=f"{marker} run not requested, use {option}")
+            for item in items:
+                if item.get_closest_marker(marker):
+                    item.add_marker(skip)
+
+    base = config.getoption("--impacted-by")
+    if base:
+        from utils.impact_index import select_impacted_tests
+        selected, reasons = select_impacted_tests(base, [item.nodeid for item in items])
+        deselected = [item for item in items if item.nodeid not in selected]
+        items[:] = [item for item in items if item.nodeid in selected]
+        config.hook.pytest_deselected(items=deselected)
+        for item in items:
+            logger.debug(f"Impacted: {item.nodeid} ({reasons[item.nodeid]})")
+        logger.info(f"Impacted by changes since {base}: {len(items)} tests, "
+                    f"{len(deselected)} deselected")
+
+    shard = config.getoption("--shard")
+    if config.getoption("--no-history-order") and not shard:
+        return
+    from utils.results_db import balance_shards, parse_shard, results_db
+    if not results_db.exists and not shard:
+        return
+
+    durations = results_db.expected_durations()
+    flaky = results_db.flaky_tests()
+    known = [durations[item.nodeid] for item in items if item.nodeid in durations]
+    default = sorted(known)[len(known) // 2] if known else 1.0
+    expected = {item.nodeid: durations.get(item.nodeid, default) for item in items}
+    if not config.getoption("--no-history-order"):
+        items.sort(key=lambda item: (item.nodeid in flaky, -expected[item.nodeid]))
+        logger.debug(f"Ordered {len(items)} tests longest-first, {len(flaky)} flaky last")
+
+    if shard:
+        index, count = parse_shard(shard)
+        selected = set(balance_shards(expected, count)[index - 1])
+        if config.getoption("--matrix"):
+            selected.update(item.nodeid for item in items if item.get_closest_marker("matrix"))
+        deselected = [item for item in items if item.nodeid not in selected]
+        items[:] = [item for item in items if item.nodeid in selected]
+        config.hook.pytest_deselected(items=deselected)
+        logger.info(f"Shard {shard}: {len(items)} tests, "
+                    f"~{sum(expected[item.nodeid] for item in items):.0f}s expected")
 
 @pytest.fixture(scope="session", autouse=True)
 def validate_code(request) -> None:
     """Session fixture to validate code before any tests run."""
     logger.debug("Starting code validation...")
+    screen_validator = ScreenValidator()
     try:
         screen_validator.validate_all_test_files()
         if screen_validator.validation_result["errors"]:
@@ -33,13 +167,17 @@ def validate_code(request) -> None:
         raise
     logger.debug("Code validation completed successfully")
 
-@pytest.fixture(scope="session", autouse=True)
+@pytest.fixture(scope="session")
 def handle_appium_server(validate_code, request) -> None:
     """Session fixture to manage Appium server lifecycle.
+    Started by the first test that needs a driver, together with the log file.
     Args:
         validate_code: Previous fixture that validates code
         request: PyTest request object for fixture management
     """
+    from utils.appium_launcher import start_appium, stop_appium
+    
+    Logger.open_log_file()
     logger.debug("handle_appium_server fixture STARTING")
     check_emulator()
     start_appium()
@@ -53,35 +191,97 @@ def handle_appium_server(validate_code, request) -> None:
     request.addfinalizer(cleanup)
 
 @pytest.fixture
-def driver(request) -> Generator[WebDriver, None, None]:
+def driver(request, handle_appium_server) -> Generator["WebDriver", None, None]:
     """Create and yield a WebDriver instance for each test.
     Yields:
         WebDriver: Configured Appium WebDriver instance
     """
+    from utils.custom_keywords import add_wait_guard, remove_wait_guard
+    from utils.driver_factory import create_driver, get_recovery_options
+    from utils.driver_watchdog import DriverWatchdog
+    
     logger.debug("driver fixture STARTING")
     try:
         test_driver = create_driver()
+        logcat_guard = None
+        liveness_guard = None
+        watchdog = None
+        cache = None
+        recorder = None
+
+        # Registered before anything else is set up, so the session is quit and
+        # the wait guards removed even if a later setup step fails
         def cleanup() -> None:
             logger.debug("driver fixture CLEANING UP")
+            if recorder:
+                recorder.stop()
+            if cache:
+                stats = cache.stats()
+                logger.info(f"Session cache saved {stats['saved_round_trips']} round trips")
+                request.node.user_properties.append(("session_cache", stats))
+                cache.detach()
+            if watchdog:
+                watchdog.stop()
+                if watchdog.recoveries:
+                    logger.info(f"Driver session recovered {watchdog.recoveries} time(s) "
+                                f"in {watchdog.recovery_time:.2f}s")
+                    request.node.user_properties.append(("driver_recovery", watchdog.summary()))
+            if 'utils.async_client' in sys.modules:
+                sys.modules['utils.async_client'].close_async_driver(test_driver)
+            if liveness_guard:
+                remove_wait_guard(liveness_guard)
+            if logcat_guard:
+                remove_wait_guard(logcat_guard)
+                lines = request.node.logcat_stream.slice(
+                    getattr(request.node, 'start_time', 0))
+                if lines:
+                    artifact_collector.add_text("logcat", '\n'.join(lines) + '\n',
+                                                test_id=request.node.nodeid)
             try:
                 if test_driver:
                     test_driver.quit()
             except (ConnectionError, TimeoutError) as e:
                 logger.error(f"Failed to quit WebDriver: {e}")
                 raise
-        
+
         request.addfinalizer(cleanup)
+        if ENABLE_LOGCAT_STREAM:
+            from utils.logcat import get_logcat_stream
+            request.node.logcat_stream = get_logcat_stream()
+            request.node.logcat_stream.start()
+            logcat_guard = request.node.logcat_stream.crash_guard(
+                getattr(request.node, 'start_time', time.time()))
+            add_wait_guard(logcat_guard)
+        if ENABLE_LIVENESS_CHECKS:
+            from utils.app_liveness import AppLivenessGuard
+            liveness_guard = AppLivenessGuard()
+            add_wait_guard(liveness_guard)
+        if ENABLE_DRIVER_WATCHDOG:
+            apk_path = os.path.join(os.getcwd(), 'apks', APK_NAME)
+            watchdog = DriverWatchdog(test_driver, get_recovery_options(apk_path).to_capabilities())
+            watchdog.start()
+        if ENABLE_SESSION_CACHE:
+            from utils.session_cache import session_cache
+            session_cache.attach(test_driver)
+            cache = session_cache
+        if ENABLE_SCREEN_RECORDING:
+            from utils.screen_recorder import ScreenRecorder
+            recorder = ScreenRecorder(test_driver)
+            recorder.start()
+            request.node.screen_recorder = recorder
         yield test_driver
     except (ConnectionError, TimeoutError) as e:
         logger.error(f"Failed to setup test environment: {e}")
         raise
 
 @pytest.fixture(scope="function")
-def webdriver() -> Generator[WebDriver, None, None]:
+def webdriver(handle_appium_server) -> Generator["WebDriver", None, None]:
     """Create and yield a WebDriver instance with optional app reinstall.
     Yields:
         WebDriver: Configured Appium WebDriver instance
     """
+    from utils.driver_factory import create_driver
+    
     test_driver = create_driver(IS_REINSTALL_APP)
     logger.debug(f"Created driver: {test_driver}")
     try:
@@ -90,6 +290,69 @@ def webdriver() -> Generator[WebDriver, None, None]:
         logger.debug("Quitting driver")
         test_driver.quit()
 
+@pytest.fixture
+def navigator(driver) -> "Navigator":
+    """Navigator bringing the app to a requested screen.
+    Returns:
+        Navigator: Navigator bound to the test's driver
+    """
+    from flows.navigator import Navigator
+    
+    return Navigator(driver)
+
+@pytest.fixture(scope="session")
+def checkpoints() -> "CheckpointStore":
+    """Store of app-state checkpoints for the APK under test.
+    Returns:
+        CheckpointStore: Global checkpoint store, cleaned of outdated APK builds
+    """
+    from utils.checkpoints import checkpoint_store
+    
+    checkpoint_store.prune_stale()
+    return checkpoint_store
+
+@pytest.fixture
+def resumable_flow(request, driver, navigator,
+                   checkpoints) -> Generator["ResumableFlow", None, None]:
+    """Runner of flow steps that retries failures from the last checkpoint.
+
+    Yields:
+        ResumableFlow: Runner bound to the test's driver; retries per step are
+            recorded as the test's 'step_retries' property
+    """
+    from flows.resumable import ResumableFlow
+
+    flow = ResumableFlow(driver, navigator, checkpoints)
+    yield flow
+    if flow.report:
+        request.node.user_properties.append(("step_retries", flow.report))
+
+@pytest.fixture
+def perf_sampler(request, driver) -> Generator["PerfSampler", None, None]:
+    """Sample frame rendering and memory in the background while the test runs.
+    Yields:
+        PerfSampler: Running sampler; its per-screen report is exported after the test
+    """
+    from utils.perf_sampler import PerfSampler
+    
+    sampler = PerfSampler()
+    sampler.start()
+    try:
+        yield sampler
+    finally:
+        sampler.stop()
+        report = sampler.report()
+        for screen, stats in report.items():
+            logger.info(
+                f"[PERF] {screen}: frames={stats['frames']} jank={stats['jank_percent']}% "
+                f"p90={stats['p90_ms']}ms heap_growth={stats['heap_growth_kb']}KB"
+            )
+        results_dir = os.path.join(os.path.dirname(__file__), PERF_RESULTS_DIR, 'frames')
+        os.makedirs(results_dir, exist_ok=True)
+        with open(os.path.join(results_dir, f"{request.node.name}.json"), 'w',
+                  encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+
 @pytest.hookimpl(tryfirst=True)
 def pytest_runtest_setup(item):
     """Set up timing for test execution.
@@ -97,8 +360,50 @@ def pytest_runtest_setup(item):
         item: PyTest item object representing the test
     """
     item.start_time = time.time()
+    step_tracker.reset()
+    artifact_collector.current_test = item.nodeid
+    if results_recorder:
+        from utils.custom_keywords import add_wait_listener
+        add_wait_listener(results_recorder.on_wait)
+        results_recorder.begin(item.nodeid)
     logger.info(f"Start test: {item.name}")
 
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_makereport(item, call):
+    """Capture failure artifacts and recordings while the test's driver is still alive.
+    Args:
+        item: PyTest item object representing the test
+        call: Information about the test phase that just ran
+    """
+    outcome = yield
+    report = outcome.get_result()
+    if report.failed and report.when in ("setup", "call"):
+        driver = item.funcargs.get('driver') or item.funcargs.get('webdriver')
+        # A streamed logcat slice is attached at teardown, no separate dump needed
+        artifact_collector.capture(driver, label=f"{report.when} failure", test_id=item.nodeid,
+                                   logcat=not hasattr(item, 'logcat_stream'))
+        if hasattr(item, 'screen_recorder'):
+            item.screen_recorder.keep(test_id=item.nodeid)
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_runtest_logfinish(nodeid, location) -> None:
+    """Attach the test's artifacts before its Allure result is closed and record the test.
+    Args:
+        nodeid: Node id of the finished test
+        location: Location of the finished test
+    """
+    artifact_collector.attach(nodeid)
+    if results_recorder:
+        results_recorder.end(nodeid)
+
+def pytest_runtest_logreport(report) -> None:
+    """Account for each test phase in the results database.
+    Args:
+        report: Report of a setup, call or teardown phase
+    """
+    if results_recorder:
+        results_recorder.add_report(report)
+
 @pytest.hookimpl(tryfirst=True)
 def pytest_runtest_teardown(item) -> None:
     """Log test completion and duration.
@@ -110,3 +415,33 @@ def pytest_runtest_teardown(item) -> None:
         duration = time.time() - start_time
         logger.info(f"End test: {item.name}")
         logger.info(f"Total duration: {format_duration(duration)}")
+
+def pytest_sessionfinish(session, exitstatus) -> None:
+    """Finish artifact writes and the results run, save locator rankings, dedupe Allure
+    attachments and export timings.
+    Args:
+        session: PyTest session object
+        exitstatus: Exit status of the test run
+    """
+    if 'utils.logcat' in sys.modules:
+        sys.modules['utils.logcat'].stop_logcat_streams()
+    if 'utils.adaptive_locator' in sys.modules:
+        sys.modules['utils.adaptive_locator'].locator_ranking.save()
+    artifact_collector.shutdown()
+    if results_recorder:
+        results_recorder.db.finish_run()
+        results_recorder.db.close()
+    allure_dir = getattr(session.config.option, 'allure_report_dir', None)
+    if allure_dir and os.path.isdir(allure_dir):
+        from utils.artifact_store import dedupe_allure_results
+        dedupe_allure_results(allure_dir)
+    timer_module = sys.modules.get('utils.transition_timer')
+    if timer_module is None:  # No screen transition ran in this session
+        return
+    transition_timer = timer_module.transition_timer
+    for name, stats in transition_timer.summary().items():
+        logger.info(
+            f"Transition {name}: n={stats['count']} median={stats['median']:.3f}s "
+            f"p90={stats['p90']:.3f}s max={stats['max']:.3f}s"
+        )
+    transition_timer.export()
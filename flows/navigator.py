@@ -0,0 +1,240 @@
+"""Navigation to screens through deep links or the declared screen-transition graph."""
+
+import subprocess
+from collections import deque
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from appium.webdriver.webdriver import WebDriver
+from selenium.common.exceptions import WebDriverException
+
+from screens.splash_screen import SplashScreen
+from screens.ingredient_selection_screen import IngredientSelectionScreen
+from screens.dish_list_screen import DishListScreen
+from screens.dish_detail_screen import DishDetailScreen
+from utils.custom_keywords import wait_for_visible
+from utils.logger import logger
+from utils.step_tracker import step_tracker
+from test_settings import DEEP_LINKS, DEVICE_NAME, PACKAGE_NAME
+
+# Default navigation state, matching the Beef/Tomato/Noodles search of test_full_flow
+DEFAULT_STATE: Dict[str, Any] = {
+    'meat': 'Beef',
+    'vegetable': 'Tomato',
+    'grain': 'Noodles'
+}
+
+EdgeAction = Callable[[Any, Dict[str, Any]], Any]
+
+
+def open_ingredient_selection(screen: SplashScreen, state: Dict[str, Any]) -> Any:
+    """Wait for the splash screen to finish and return the ingredient selection screen."""
+    screen.app_title_and_slogan_are_displayed()
+    return IngredientSelectionScreen(screen.driver)
+
+
+def search_recipes(screen: IngredientSelectionScreen, state: Dict[str, Any]) -> Any:
+    """Select the state's ingredients at maximum calories and search for recipes."""
+    screen.select_max_calories()
+    screen.select_ingredients(meat=state['meat'], vegetables=[state['vegetable']],
+                              grains=[state['grain']])
+    return screen.click_on_find_recipe_button()
+
+
+def open_first_recipe(screen: DishListScreen, state: Dict[str, Any]) -> Any:
+    """Open the first recipe of the dish list."""
+    return screen.click_see_recipe_button()
+
+
+# Screen classes by name
+SCREENS: Dict[str, type] = {
+    'SplashScreen': SplashScreen,
+    'IngredientSelectionScreen': IngredientSelectionScreen,
+    'DishListScreen': DishListScreen,
+    'DishDetailScreen': DishDetailScreen
+}
+
+# Element identifying each screen once it is shown
+SCREEN_ANCHORS: Dict[str, Tuple[str, str]] = {
+    'SplashScreen': SplashScreen.APP_TITLE_TXT,
+    'IngredientSelectionScreen': IngredientSelectionScreen.TITLE,
+    'DishListScreen': DishListScreen.RECIPE_COUNT_MESSAGE,
+    'DishDetailScreen': DishDetailScreen.SAVE_RECIPE_BUTTON
+}
+
+# Declared screen transitions: (source, destination) -> UI action
+SCREEN_GRAPH: Dict[Tuple[str, str], EdgeAction] = {
+    ('SplashScreen', 'IngredientSelectionScreen'): open_ingredient_selection,
+    ('IngredientSelectionScreen', 'DishListScreen'): search_recipes,
+    ('DishListScreen', 'DishDetailScreen'): open_first_recipe
+}
+
+
+def find_route(source: str, target: str) -> Optional[List[str]]:
+    """Find the shortest UI route between two screens.
+
+    Args:
+        source: Name of the starting screen
+        target: Name of the destination screen
+
+    Returns:
+        List of screen names from source to target, or None if unreachable
+    """
+    queue = deque([[source]])
+    visited = {source}
+    while queue:
+        route = queue.popleft()
+        if route[-1] == target:
+            return route
+        for (edge_source, edge_target) in SCREEN_GRAPH:
+            if edge_source == route[-1] and edge_target not in visited:
+                visited.add(edge_target)
+                queue.append(route + [edge_target])
+    return None
+
+
+def build_start_command(screen_name: str, state: Dict[str, Any]) -> Optional[List[str]]:
+    """Build the `adb shell am start` command opening a screen directly.
+
+    DEEP_LINKS entries are either a URI template or a dict with an explicit
+    'component' and string 'extras', all formatted with the navigation state.
+
+    Args:
+        screen_name: Name of the screen to open
+        state: Navigation state used to fill the templates
+
+    Returns:
+        The adb command, or None if the screen has no deep link
+    """
+    link = DEEP_LINKS.get(screen_name)
+    if not link:
+        return None
+
+    command = ['adb', '-s', DEVICE_NAME, 'shell', 'am', 'start', '-W']
+    if isinstance(link, str):
+        uri = link.format(**state)
+        return command + ['-a', 'android.intent.action.VIEW', '-d', f"'{uri}'", PACKAGE_NAME]
+
+    command += ['-n', link['component']]
+    for key, value in link.get('extras', {}).items():
+        command += ['--es', key, f"'{str(value).format(**state)}'"]
+    return command
+
+
+class Navigator:
+    """Bring the app to a requested screen by the cheapest available route."""
+
+    def __init__(self, driver: WebDriver):
+        """Initialize Navigator.
+
+        Args:
+            driver: WebDriver instance with the app started
+        """
+        self.driver = driver
+        self.current: Optional[Any] = None
+
+    def _current_screen_name(self) -> str:
+        if self.current is not None:
+            return type(self.current).__name__
+        return step_tracker.current_screen or 'SplashScreen'
+
+    def detect_screen(self) -> Optional[str]:
+        """Identify the shown screen by its anchor element, checking the deepest screens first.
+
+        Returns:
+            Name of the detected screen, or None if no anchor is visible
+        """
+        for screen_name in reversed(list(SCREEN_ANCHORS)):
+            try:
+                elements = self.driver.find_elements(*SCREEN_ANCHORS[screen_name])
+                if elements and elements[0].is_displayed():
+                    return screen_name
+            except WebDriverException:
+                continue
+        return None
+
+    def resync(self) -> str:
+        """Re-establish which screen is shown, relaunching the app if none is recognized.
+
+        Returns:
+            Name of the current screen
+        """
+        screen_name = self.detect_screen()
+        if screen_name is None:
+            logger.info("No known screen is shown, relaunching the app")
+            self.driver.terminate_app(PACKAGE_NAME)
+            self.driver.activate_app(PACKAGE_NAME)
+            screen_name = 'SplashScreen'
+        self.current = SCREENS[screen_name](self.driver)
+        return screen_name
+
+    def _deep_link(self, screen_name: str, state: Dict[str, Any]) -> Optional[Any]:
+        """Open a screen through its deep link, returning None if that is not possible."""
+        command = build_start_command(screen_name, state)
+        if not command:
+            return None
+
+        logger.info(f"Opening {screen_name} through deep link")
+        try:
+            result = subprocess.run(command, capture_output=True, text=True, check=True,
+                                    timeout=30)
+            if 'Error' in result.stdout or 'Error' in result.stderr:
+                raise subprocess.CalledProcessError(1, command, result.stdout, result.stderr)
+            wait_for_visible(self.driver, SCREEN_ANCHORS[screen_name], is_scrollable=False)
+            return SCREENS[screen_name](self.driver)
+        except Exception as e:
+            logger.warning(f"Deep link to {screen_name} failed, falling back to UI: {e}")
+            return None
+
+    def go_to(self, target: type, state: Optional[Dict[str, Any]] = None) -> Any:
+        """Navigate to the target screen.
+
+        Candidate routes start either at the current screen or at a screen on
+        the way that has a deep link. The route with the fewest UI steps wins;
+        if its deep link fails, the plain UI route is used instead.
+
+        Args:
+            target: Screen class to navigate to
+            state: Navigation state (ingredients), defaults to DEFAULT_STATE
+
+        Returns:
+            Instance of the target screen
+
+        Raises:
+            ValueError: If the target cannot be reached from the current screen
+        """
+        state = {**DEFAULT_STATE, **(state or {})}
+        target_name = target.__name__
+        current_name = self._current_screen_name()
+
+        ui_route = find_route(current_name, target_name)
+        candidates = []
+        if ui_route:
+            candidates.append((len(ui_route) - 1, None, ui_route))
+        for screen_name in DEEP_LINKS:
+            route = find_route(screen_name, target_name)
+            if route and screen_name in SCREENS:
+                candidates.append((len(route) - 1, screen_name, route))
+        if not candidates:
+            raise ValueError(f"No route from {current_name} to {target_name}")
+
+        candidates.sort(key=lambda candidate: (candidate[0], candidate[1] is None))
+        for ui_steps, deep_link, route in candidates:
+            if deep_link is not None:
+                screen = self._deep_link(deep_link, state)
+                if screen is None:
+                    continue
+            elif self.current is not None and type(self.current).__name__ == route[0]:
+                screen = self.current
+            else:
+                screen = SCREENS[route[0]](self.driver)
+            logger.debug(f"Navigating {' -> '.join(route)} ({ui_steps} UI steps)")
+            self.current = self._follow(screen, route, state)
+            return self.current
+
+        raise ValueError(f"No working route from {current_name} to {target_name}")
+
+    def _follow(self, screen: Any, route: List[str], state: Dict[str, Any]) -> Any:
+        """Walk the UI route starting with an instance of its first screen."""
+        for source, destination in zip(route, route[1:]):
+            screen = SCREEN_GRAPH[(source, destination)](screen, state)
+        return screen
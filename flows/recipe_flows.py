@@ -0,0 +1,125 @@
+"""Reusable end-to-end flows built from screen objects."""
+
+from typing import Any, Callable, Dict
+
+from appium.webdriver.webdriver import WebDriver
+
+from screens.splash_screen import SplashScreen
+from screens.ingredient_selection_screen import IngredientSelectionScreen
+from screens.dish_list_screen import DishListScreen
+from screens.dish_detail_screen import DishDetailScreen
+from flows.navigator import (
+    DEFAULT_STATE,
+    Navigator,
+    open_first_recipe,
+    open_ingredient_selection,
+    search_recipes
+)
+from flows.resumable import FlowStep, ResumableFlow
+from utils.logger import logger
+
+FlowType = Callable[[WebDriver], None]
+
+
+def splash_flow(driver: WebDriver) -> None:
+    """Verify the splash screen.
+
+    Args:
+        driver: WebDriver instance with the app freshly started
+    """
+    SplashScreen(driver).app_title_and_slogan_are_displayed()
+
+
+def full_flow(driver: WebDriver) -> None:
+    """Search recipes for Beef/Tomato/Noodles, open the first one and save it.
+
+    Args:
+        driver: WebDriver instance with the app freshly started
+
+    Raises:
+        AssertionError: If a screen is not in the expected state
+    """
+    splash_screen = SplashScreen(driver)
+    splash_screen.app_title_and_slogan_are_displayed()
+
+    ingredient_screen = IngredientSelectionScreen(driver)
+    ingredient_screen.select_max_calories()
+    ingredient_screen.select_meat("Beef")
+    ingredient_screen.select_vegetable("Tomato")
+    ingredient_screen.select_grain_and_starch("Noodles")
+    dish_list_screen = ingredient_screen.click_on_find_recipe_button()
+
+    assert dish_list_screen.dish_list_is_loaded(), "Dish list is not loaded"
+    dish_detail = dish_list_screen.click_see_recipe_button()
+
+    assert dish_detail.dish_detail_screen_is_displayed(), "Dish detail screen is not displayed"
+    logger.debug(f"Dish name: {dish_detail.get_dish_name()}")
+    assert dish_detail.instructions_is_displayed(), "Instructions are not displayed"
+    dish_detail.click_save_recipe_button()
+
+
+def _check_dish_list(screen: DishListScreen, state: Dict[str, Any]) -> None:
+    assert screen.dish_list_is_loaded(), "Dish list is not loaded"
+
+
+def _check_dish_detail(screen: DishDetailScreen, state: Dict[str, Any]) -> None:
+    assert screen.dish_detail_screen_is_displayed(), "Dish detail screen is not displayed"
+    logger.debug(f"Dish name: {screen.get_dish_name()}")
+    assert screen.instructions_is_displayed(), "Instructions are not displayed"
+
+
+def _save_recipe(screen: DishDetailScreen, state: Dict[str, Any]) -> None:
+    screen.click_save_recipe_button()
+
+
+# full_flow as resumable steps, with a checkpoint at every screen; the app data
+# is archived once the first screen is passed
+FULL_FLOW_STEPS = [
+    FlowStep("open ingredient selection", open_ingredient_selection,
+             checkpoint="ingredient selection opened", save_app_state=True),
+    FlowStep("search recipes", search_recipes, checkpoint="dish list loaded"),
+    FlowStep("check dish list", _check_dish_list),
+    FlowStep("open first recipe", open_first_recipe, checkpoint="dish detail opened"),
+    FlowStep("check dish detail", _check_dish_detail),
+    FlowStep("save recipe", _save_recipe)
+]
+
+
+def resumable_full_flow(driver: WebDriver) -> None:
+    """Run full_flow, retrying failed steps from the last screen reached.
+
+    Args:
+        driver: WebDriver instance with the app freshly started
+    """
+    flow = ResumableFlow(driver)
+    flow.run(FULL_FLOW_STEPS, SplashScreen(driver), DEFAULT_STATE)
+
+
+def warm_full_flow(driver: WebDriver) -> None:
+    """Run full_flow from whichever screen is shown instead of a fresh start.
+
+    Repeating it only needs back presses in between, so the app process and
+    its memory stay alive across runs.
+
+    Args:
+        driver: WebDriver instance with the app started
+
+    Raises:
+        AssertionError: If a screen is not in the expected state
+    """
+    navigator = Navigator(driver)
+    navigator.resync()
+    dish_list = navigator.go_to(DishListScreen)
+    _check_dish_list(dish_list, DEFAULT_STATE)
+    dish_detail = open_first_recipe(dish_list, DEFAULT_STATE)
+    _check_dish_detail(dish_detail, DEFAULT_STATE)
+    _save_recipe(dish_detail, DEFAULT_STATE)
+
+
+# Flows available by name, e.g. for the soak runner
+FLOWS: Dict[str, FlowType] = {
+    'splash_flow': splash_flow,
+    'full_flow': full_flow,
+    'warm_full_flow': warm_full_flow,
+    'resumable_full_flow': resumable_full_flow
+}
@@ -0,0 +1,166 @@
+"""Step-level retries that resume a flow from its last checkpoint."""
+
+from time import perf_counter
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from appium.webdriver.webdriver import WebDriver
+from selenium.common.exceptions import WebDriverException
+
+from flows.navigator import SCREEN_ANCHORS, SCREENS, Navigator
+from utils.checkpoints import CheckpointError, CheckpointStore
+from utils.driver_factory import reset_app
+from utils.logger import logger
+from test_settings import STEP_MAX_RETRIES
+
+StepAction = Callable[[Any, Dict[str, Any]], Any]
+
+# Exceptions treated as flaky; assertion failures are never retried
+RETRYABLE_EXCEPTIONS: Tuple[type, ...] = (WebDriverException,)
+
+
+class FlowStep:
+    """One step of a resumable flow."""
+
+    def __init__(self, name: str, action: StepAction, checkpoint: Optional[str] = None,
+                 save_app_state: bool = False):
+        """Initialize FlowStep.
+
+        Args:
+            name: Step name used in reports
+            action: Callable receiving the current screen object and the flow
+                state; returns the screen shown afterwards, or None if unchanged
+            checkpoint: Name of the checkpoint reached after this step
+            save_app_state: Whether the checkpoint also archives the app data,
+                for state that navigation alone cannot rebuild
+        """
+        self.name = name
+        self.action = action
+        self.checkpoint = checkpoint
+        self.save_app_state = save_app_state
+
+
+class ResumableFlow:
+    """Run flow steps, resuming from the nearest checkpoint when a step fails.
+
+    A checkpoint remembers the screen reached after a step. On a retryable
+    failure the flow returns to that screen (directly if it is still shown,
+    otherwise by restoring archived app data and/or navigating, restarting
+    the app when it is already past the screen) and reruns only the steps
+    after it.
+    """
+
+    def __init__(self, driver: WebDriver, navigator: Optional[Navigator] = None,
+                 checkpoints: Optional[CheckpointStore] = None,
+                 max_retries: int = STEP_MAX_RETRIES):
+        """Initialize ResumableFlow.
+
+        Args:
+            driver: WebDriver instance
+            navigator: Navigator used to return to checkpoint screens
+            checkpoints: Store used for steps saving app state
+            max_retries: Maximum retries of a single step
+        """
+        self.driver = driver
+        self.navigator = navigator or Navigator(driver)
+        self.checkpoints = checkpoints
+        self.max_retries = max_retries
+        self.report: Dict[str, Dict[str, Any]] = {}
+
+    def run(self, steps: List[FlowStep], screen: Any,
+            state: Optional[Dict[str, Any]] = None) -> Any:
+        """Run the steps starting from the given screen object.
+
+        Args:
+            steps: Steps to run in order
+            screen: Screen object the first step acts on
+            state: Flow state passed to every step and used for navigation
+
+        Returns:
+            The screen object shown after the last step
+
+        Raises:
+            Exception: The step's error once its retries are exhausted, or
+                immediately for non-retryable errors
+        """
+        try:
+            return self._run_steps(steps, screen, dict(state or {}))
+        finally:
+            self.log_report()
+
+    def _run_steps(self, steps: List[FlowStep], screen: Any, state: Dict[str, Any]) -> Any:
+        """Run the steps, retrying failed ones from the last checkpoint."""
+        checkpoint: Tuple[int, Optional[str], str] = (0, None, type(screen).__name__)
+        index = 0
+        while index < len(steps):
+            step = steps[index]
+            try:
+                result = step.action(screen, state)
+                screen = result if result is not None else screen
+            except RETRYABLE_EXCEPTIONS as e:
+                stats = self.report.setdefault(step.name, {'retries': 0, 'recovery_time': 0.0,
+                                                           'errors': []})
+                message = str(e).splitlines()[0] if str(e) else ''
+                stats['errors'].append(f"{type(e).__name__}: {message}")
+                if stats['retries'] >= self.max_retries:
+                    logger.error(f"Step '{step.name}' failed after {stats['retries']} retries")
+                    raise
+                stats['retries'] += 1
+                logger.warning(
+                    f"Step '{step.name}' failed ({type(e).__name__}), "
+                    f"retry {stats['retries']}/{self.max_retries} from checkpoint "
+                    f"'{checkpoint[1] or 'start'}'"
+                )
+                start = perf_counter()
+                try:
+                    screen = self._restore(checkpoint, state)
+                except Exception as restore_error:
+                    logger.error(f"Returning to checkpoint '{checkpoint[1] or 'start'}' "
+                                 f"failed: {restore_error}")
+                    raise e from restore_error
+                stats['recovery_time'] += perf_counter() - start
+                index = checkpoint[0]
+                continue
+
+            if step.checkpoint:
+                screen_name = type(screen).__name__
+                if step.save_app_state and self.checkpoints is not None:
+                    try:
+                        self.checkpoints.save(step.checkpoint, screen_name)
+                    except CheckpointError as e:
+                        logger.warning(f"App state not saved, will resume by navigation: {e}")
+                checkpoint = (index + 1, step.checkpoint, screen_name)
+            index += 1
+        return screen
+
+    def _restore(self, checkpoint: Tuple[int, Optional[str], str],
+                 state: Dict[str, Any]) -> Any:
+        """Bring the app back to the checkpoint screen and return its screen object."""
+        _, name, screen_name = checkpoint
+        target = SCREENS[screen_name]
+        elements = self.driver.find_elements(*SCREEN_ANCHORS[screen_name])
+        if elements and elements[0].is_displayed():
+            logger.debug(f"Still on {screen_name}, resuming directly")
+            return target(self.driver)
+
+        if name and self.checkpoints is not None and self.checkpoints.exists(name):
+            try:
+                self.checkpoints.restore(name, self.driver)
+            except CheckpointError as e:
+                logger.warning(f"App state not restored, resuming by navigation: {e}")
+        screen_shown = self.navigator.resync()
+        try:
+            return self.navigator.go_to(target, state)
+        except ValueError:
+            # Screens only have forward routes, so from past the checkpoint the app starts over
+            logger.info(f"No route from {screen_shown} back to {screen_name}, restarting the app")
+        reset_app(self.driver)
+        self.navigator.resync()
+        return self.navigator.go_to(target, state)
+
+    def log_report(self) -> None:
+        """Log retries and recovery time per step."""
+        for step_name, stats in self.report.items():
+            logger.info(
+                f"Step '{step_name}': {stats['retries']} retries, "
+                f"{stats['recovery_time']:.2f}s recovering ({'; '.join(stats['errors'])})"
+            )
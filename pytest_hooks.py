@@ -1,7 +1,86 @@
 """PyTest hooks for running pre-checks before tests."""
+import hashlib
+import json
+import os
+import shutil
 import subprocess
 import sys
-from typing import List
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Tuple
+
+from test_settings import CACHE_DIR
+
+PROJECT_ROOT = os.path.dirname(os.path.abspath(__file__))
+CHECK_DIRS = ["screens", "tests", "utils"]
+CONFIG_FILES = [".pylintrc", "setup.cfg", "tox.ini", ".flake8", "mypy.ini", "pyproject.toml"]
+CACHE_FILE = os.path.join(PROJECT_ROOT, CACHE_DIR, "prechecks.json")
+
+# (tool, description, scope): "file" tools are re-run only on changed files,
+# "project" tools need the whole code base and re-run when any file changed.
+# Pylint checks imports and members across modules, so it is project wide.
+CHECKS = [
+    ("pylint", "Pylint check", "project"),
+    ("mypy", "Type checking", "project"),
+    ("flake8", "Code style check", "file")
+]
+
+
+def _hash_file(path: str) -> str:
+    with open(path, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def collect_files() -> Dict[str, str]:
+    """Get the content hash of every Python file checked by the pre-checks."""
+    files = {}
+    for directory in CHECK_DIRS:
+        for root, _, names in os.walk(os.path.join(PROJECT_ROOT, directory)):
+            for name in names:
+                if name.endswith('.py'):
+                    path = os.path.join(root, name)
+                    rel = os.path.relpath(path, PROJECT_ROOT).replace(os.sep, '/')
+                    files[rel] = _hash_file(path)
+    return files
+
+
+def tool_version(tool: str, cache: Dict[str, Any]) -> str:
+    """Get a tool's version, cached by executable path and modification time."""
+    executable = shutil.which(tool)
+    if not executable:
+        return ""
+    key = f"{executable}:{os.path.getmtime(executable)}"
+    versions = cache.setdefault("versions", {})
+    if versions.get(tool, {}).get("key") != key:
+        result = subprocess.run([tool, "--version"], capture_output=True, text=True, check=False)
+        versions[tool] = {"key": key, "version": result.stdout.strip()}
+    return versions[tool]["version"]
+
+
+def config_hash() -> str:
+    """Get a hash of the linter configuration files, which affect every result."""
+    digest = hashlib.sha256()
+    for name in CONFIG_FILES:
+        path = os.path.join(PROJECT_ROOT, name)
+        if os.path.exists(path):
+            digest.update(name.encode() + _hash_file(path).encode())
+    return digest.hexdigest()
+
+
+def run_check(tool: str, files: List[str]) -> Tuple[bool, str, float]:
+    """Run one tool on the given files.
+
+    Returns:
+        Tuple of (passed, output, duration in seconds)
+    """
+    start = time.time()
+    try:
+        result = subprocess.run([tool, *files], capture_output=True, text=True,
+                                check=False, cwd=PROJECT_ROOT)
+        return result.returncode == 0, result.stdout + result.stderr, time.time() - start
+    except FileNotFoundError:
+        return False, f"{tool} is not installed", time.time() - start
+
 
 def pytest_sessionstart(session):
     """Run pre-checks before any tests start."""
@@ -9,23 +88,57 @@ def pytest_sessionstart(session):
         return
         
     print("\nRunning pre-checks before tests...")
-    checks = [
-        (["pylint", "screens/", "tests/", "utils/"], "Pylint check"),
-        (["mypy", "screens/", "tests/", "utils/"], "Type checking"),
-        (["flake8", "screens/", "tests/", "utils/"], "Code style check")
-    ]
+    start = time.time()
+    try:
+        with open(CACHE_FILE, 'r', encoding='utf-8') as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        cache = {}
+    
+    files = collect_files()
+    settings_hash = config_hash()
+    jobs = {}
+    for tool, description, scope in CHECKS:
+        cache_key = f"{tool_version(tool, cache)}:{settings_hash}"
+        passed = cache.setdefault("passed", {}).get(tool, {})
+        if passed.get("key") != cache_key:
+            passed = {"key": cache_key, "files": {}}
+        passed["files"] = {f: h for f, h in passed["files"].items() if f in files}
+        cache["passed"][tool] = passed
+        
+        changed = [f for f, h in files.items() if passed["files"].get(f) != h]
+        if scope == "project" and changed:
+            changed = sorted(files)
+        if not changed:
+            print(f"✅ {description} passed (cached)")
+            continue
+        jobs[tool] = (description, changed)
     
     failed = False
-    for command, description in checks:
-        print(f"\nRunning {description}...")
-        try:
-            subprocess.run(command, check=True, capture_output=True, text=True)
-            print(f"✅ {description} passed")
-        except subprocess.CalledProcessError as e:
-            print(f"❌ {description} failed:")
-            print(e.stdout)
-            print(e.stderr)
-            failed = True
+    if jobs:
+        with ThreadPoolExecutor(max_workers=len(jobs)) as executor:
+            futures = {
+                tool: executor.submit(run_check, tool, changed)
+                for tool, (_, changed) in jobs.items()
+            }
+            for tool, future in futures.items():
+                description, changed = jobs[tool]
+                ok, output, duration = future.result()
+                if ok:
+                    cache["passed"][tool]["files"].update({f: files[f] for f in changed})
+                    print(f"✅ {description} passed on {len(changed)} file(s) in {duration:.2f}s")
+                else:
+                    print(f"❌ {description} failed in {duration:.2f}s:")
+                    print(output)
+                    failed = True
+    
+    try:
+        os.makedirs(os.path.dirname(CACHE_FILE), exist_ok=True)
+        with open(CACHE_FILE, 'w', encoding='utf-8') as f:
+            json.dump(cache, f)
+    except OSError as e:
+        print(f"⚠️ Could not write pre-check cache: {e}")
+    print(f"Pre-checks finished in {time.time() - start:.2f}s")
             
     if failed:
         print("\n❌ Pre-checks failed. Please fix the issues before running tests.")
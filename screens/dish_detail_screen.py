@@ -1,17 +1,26 @@
+from time import sleep
+
 from appium.webdriver.webdriver import WebDriver
-from appium.webdriver.common.appiumby import AppiumBy
 
 from utils.custom_keywords import click_element, wait_for_visible
+from utils.locator_catalog import locator_catalog
 from utils.logger import logger
+from utils.step_tracker import track_screen_steps
 
 DEFAULT_TIMEOUT = 30  # Default timeout in seconds
+FEEDBACK_TIMEOUT = 5  # Seconds for the save confirmation to appear
+FEEDBACK_SETTLE = 0.5  # Seconds for the snackbar to slide in before its baseline is recorded
+# Bottom of the screen, where the save confirmation snackbar appears (relative x, y, w, h)
+FEEDBACK_REGION = (0, 0.75, 1, 0.25)
+FEEDBACK_BASELINE = "dish_detail_save_feedback"
 
 
+@track_screen_steps
 class DishDetailScreen:
     """Page object for the Dish Detail screen."""
-    SAVE_RECIPE_BUTTON = (AppiumBy.ACCESSIBILITY_ID, "Save Recipe")
-    INSTRUCTIONS_TEXT = (AppiumBy.XPATH, "//android.view.View[@content-desc='Instructions']")
-    DISH = (AppiumBy.CLASS_NAME, "android.widget.ImageView")
+    SAVE_RECIPE_BUTTON = locator_catalog.get('DishDetailScreen', 'SAVE_RECIPE_BUTTON')
+    INSTRUCTIONS_TEXT = locator_catalog.get('DishDetailScreen', 'INSTRUCTIONS_TEXT')
+    DISH = locator_catalog.get('DishDetailScreen', 'DISH')
 
     def __init__(self, driver: WebDriver):
         """Initialize the dish detail screen.
@@ -33,7 +42,7 @@ class DishDetailScreen:
         Returns:
             True if dish detail screen is displayed, False otherwise
         """
-        wait_for_visible(self.driver, self.SAVE_RECIPE_BUTTON, timeout=timeout)
+        wait_for_visible(self.driver, self.SAVE_RECIPE_BUTTON, timeout=timeout, cache=True)
         return True
     
     def get_dish_name(self, timeout: int = DEFAULT_TIMEOUT) -> str:
@@ -67,7 +76,38 @@ class DishDetailScreen:
         Args:
             timeout: Maximum time to wait for element in seconds
         """
-        click_element(self.driver, self.SAVE_RECIPE_BUTTON, timeout=timeout)
+        click_element(self.driver, self.SAVE_RECIPE_BUTTON, timeout=timeout, cache=True)
+
+    def save_recipe_shows_feedback(self, timeout: int = DEFAULT_TIMEOUT) -> bool:
+        """Click the 'Save Recipe' button and check that a confirmation appears.
+
+        The confirmation is a transient snackbar that element queries often
+        miss, so the bottom of the screen is compared with a baseline of the
+        snackbar instead. When baselines are being updated, it is recorded
+        once the region changed after the click.
+
+        Args:
+            timeout: Maximum time to wait for the button in seconds
+
+        Returns:
+            True once the bottom of the screen matches the snackbar baseline
+
+        Raises:
+            TimeoutException: If the snackbar is not shown within FEEDBACK_TIMEOUT
+            AssertionError: If the baseline is missing (it is recorded for review)
+        """
+        from utils.visual import Region, VisualOptions, visual_checker
+        region = Region(*FEEDBACK_REGION, relative=True)
+        options = VisualOptions(timeout=FEEDBACK_TIMEOUT)
+        reference = visual_checker.capture(self.driver, region) if visual_checker.update else None
+        self.click_save_recipe_button(timeout=timeout)
+        if reference is not None:
+            visual_checker.wait_until_changes(self.driver, region, reference=reference,
+                                              options=options)
+            sleep(FEEDBACK_SETTLE)
+        visual_checker.wait_until_matches(self.driver, FEEDBACK_BASELINE, region, options=options)
+        logger.debug("Save confirmation is displayed")
+        return True
 
     def add_to_favorites_success_message_is_displayed(self, dish_name: str, timeout: int = DEFAULT_TIMEOUT) -> bool:
         """Check if the success message after adding a dish to favorites is displayed.
@@ -79,5 +119,5 @@ class DishDetailScreen:
         Returns:
             True if success message is displayed, False otherwise
         """
-        success_message_locator = (AppiumBy.XPATH, "//android.view.View[contains(@content-desc, 'Added') and contains(@content-desc, 'to favorites')]")
+        success_message_locator = locator_catalog.get('DishDetailScreen', 'FAVORITES_MESSAGE')
         return wait_for_visible(self.driver, success_message_locator, timeout=timeout) is not None
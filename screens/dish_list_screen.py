@@ -1,47 +1,145 @@
+import asyncio
+import re
+from typing import TYPE_CHECKING, List, Optional, Sequence
+
 from appium.webdriver.webdriver import WebDriver
-from appium.webdriver.common.appiumby import AppiumBy
 
 from screens.dish_detail_screen import DishDetailScreen
-from utils.custom_keywords import click_element, wait_for_visible
+from utils.custom_keywords import wait_for_visible
+from utils.locator_catalog import locator_catalog
 from utils.logger import logger
+from utils.step_tracker import track_screen_steps
+from utils.transition_timer import transition_timer
+
+if TYPE_CHECKING:
+    from utils.async_client import AsyncDriver, AsyncElement
+    from utils.recipe_oracle import RecipePrediction
 
 DEFAULT_TIMEOUT = 30  
+LOAD_TIMEOUT = 60  # Recipe search can take up to a minute
+
+
+def parse_recipe_count(message: Optional[str]) -> int:
+    """Get the number of recipes from a found recipes message.
 
+    Raises:
+        ValueError: If the message contains no number
+    """
+    match = re.search(r'\d+', message or '')
+    if not match:
+        raise ValueError(f"No recipe count in message: {message!r}")
+    return int(match.group())
 
+
+@track_screen_steps
 class DishListScreen:
     """Page object for the Dish List screen."""
-    FOUND_RECIPES_MESSAGE = (AppiumBy.XPATH, "//android.view.View[@content-desc='Found 5 matching recipes']")
-    SEE_RECIPE_BUTTON = (AppiumBy.XPATH, "(//android.widget.Button[@content-desc='See Recipe'])[1]")
+    # Found recipes message with any recipe count
+    RECIPE_COUNT_MESSAGE = locator_catalog.get('DishListScreen', 'RECIPE_COUNT_MESSAGE')
+    SEE_RECIPE_BUTTON = locator_catalog.get('DishListScreen', 'SEE_RECIPE_BUTTON')
 
-    def __init__(self, driver: WebDriver):
+    def __init__(self, driver: WebDriver, expected: Optional["RecipePrediction"] = None):
         """Initialize the dish list screen and wait for it to load.
         
         Args:
             driver: The WebDriver instance to control the screen
+            expected: Predicted search result; the found recipes message must show its count
             
         Raises:
             TimeoutException: If the screen doesn't load within the default timeout
+            AssertionError: If the found recipes message differs from the prediction
         """
         self.driver = driver
+        self.expected = expected
         logger.info("Waiting for Dish List Screen to load")
-        wait_for_visible(self.driver, self.FOUND_RECIPES_MESSAGE, timeout=60, is_scrollable=False)
+        message = wait_for_visible(self.driver, self.RECIPE_COUNT_MESSAGE, timeout=LOAD_TIMEOUT,
+                                   is_scrollable=False)
+        if expected is not None:
+            self._check_prediction(message.get_attribute("content-desc"))
         logger.info("Navigating to Dish List Screen")
         logger.debug("Initializing DishListScreen")
     
+    def _check_prediction(self, found: Optional[str]) -> None:
+        """Fail unless a found recipes message shows the predicted count."""
+        if parse_recipe_count(found) != self.expected.count:
+            dishes = ', '.join(self.expected.dishes)
+            raise AssertionError(f"Expected '{self.expected.message}' ({dishes}), "
+                                 f"but the app shows '{found}'")
+        logger.debug(f"Search result matches the prediction: {found}")
+
     # Screen Action Methods
     def dish_list_is_loaded(self, timeout: int = DEFAULT_TIMEOUT) -> bool:
         """Check if the dish list is loaded and recipes are found.
-        
+
+        With a prediction the found recipes message must show the predicted
+        count, otherwise any count above zero.
+
         Args:
             timeout: Maximum time to wait for element in seconds
-            
+
         Returns:
-            True if dish list is loaded, False otherwise
+            True if dish list is loaded
+
+        Raises:
+            TimeoutException: If no found recipes message is shown within timeout
+            AssertionError: If the count differs from the prediction, or no
+                recipes were found without one
         """
-        wait_for_visible(self.driver, self.FOUND_RECIPES_MESSAGE, timeout=timeout)
+        message = wait_for_visible(self.driver, self.RECIPE_COUNT_MESSAGE, timeout=timeout,
+                                   is_scrollable=False)
+        found = message.get_attribute("content-desc")
+        if self.expected is not None:
+            self._check_prediction(found)
+        elif parse_recipe_count(found) == 0:
+            raise AssertionError(f"No recipes found: '{found}'")
         logger.debug("Dish list loaded successfully")
         return True
     
+    def get_recipe_count(self, timeout: int = DEFAULT_TIMEOUT) -> int:
+        """Get the number of recipes found, from the found recipes message.
+
+        Args:
+            timeout: Maximum time to wait for element in seconds
+
+        Returns:
+            Number of matching recipes
+
+        Raises:
+            TimeoutException: If the message is not found within timeout
+            ValueError: If the message contains no number
+        """
+        element = wait_for_visible(self.driver, self.RECIPE_COUNT_MESSAGE, timeout=timeout,
+                                   is_scrollable=False)
+        message = element.get_attribute("content-desc")
+        logger.debug(f"Found recipes message: {message}")
+        return parse_recipe_count(message)
+
+    def visible_dishes(self, dishes: Sequence[str]) -> List[str]:
+        """Get which of the given dishes have a card on screen.
+
+        The lookups of all dishes are sent concurrently through the async
+        client, so checking a whole predicted list costs about one round
+        trip. Cards further down the list are not scrolled to.
+
+        Args:
+            dishes: Names of the dishes to look for
+
+        Returns:
+            The dishes with a card on screen, in the given order
+        """
+        from utils.async_client import get_async_driver
+        locators = [locator_catalog.get('DishListScreen', 'DISH_CARD', dish=dish)
+                    for dish in dishes]
+
+        async def find(client: "AsyncDriver") -> List[List["AsyncElement"]]:
+            return list(await asyncio.gather(*(client.find_elements(locator)
+                                               for locator in locators)))
+
+        found = get_async_driver(self.driver).run(find)
+        shown = [dish for dish, elements in zip(dishes, found) if elements]
+        logger.debug(f"{len(shown)} of {len(dishes)} dishes shown: {shown}")
+        return shown
+
     def click_see_recipe_button(self, timeout: int = DEFAULT_TIMEOUT) -> DishDetailScreen:
         """Click the 'See Recipe' button for the first recipe.
         
@@ -52,6 +150,13 @@ class DishListScreen:
             An instance of DishDetailScreen
         """
         logger.debug("Clicking 'See Recipe' button")
-        click_element(self.driver, self.SEE_RECIPE_BUTTON, timeout=timeout)
+        button = wait_for_visible(self.driver, self.SEE_RECIPE_BUTTON, timeout=timeout)
+        transition_timer.measure(
+            self.driver,
+            "DishListScreen->DishDetailScreen",
+            button,
+            DishDetailScreen.SAVE_RECIPE_BUTTON,
+            timeout=timeout
+        )
         logger.debug("'See Recipe' button clicked")
         return DishDetailScreen(self.driver)
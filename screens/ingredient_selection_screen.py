@@ -1,19 +1,44 @@
-from appium.webdriver.common.appiumby import AppiumBy
+from time import sleep, time
+from typing import TYPE_CHECKING, Dict, Iterable, Iterator, List, Optional
+
 from appium.webdriver.webdriver import WebDriver
-from screens.dish_list_screen import DishListScreen
-from utils.custom_keywords import wait_for_visible, click_element, swipe_seek_bar
+from selenium.common.exceptions import NoSuchElementException, TimeoutException
+
+from screens.dish_list_screen import DishListScreen, LOAD_TIMEOUT
+from utils.custom_keywords import (
+    wait_for_visible,
+    click_element,
+    run_wait_guards,
+    scroll_down,
+    swipe_seek_bar,
+    tap_points
+)
+from utils.hierarchy import HierarchySnapshot, UiNode
+from utils.locator_catalog import locator_catalog
 from utils.logger import logger
+from utils.step_tracker import track_screen_steps
+from utils.transition_timer import transition_timer
+
+if TYPE_CHECKING:
+    from utils.recipe_oracle import RecipePrediction
 
 DEFAULT_TIMEOUT = 30  # Default timeout in seconds
+MAX_INGREDIENT_PAGES = 4  # Scroll pages searched for ingredient chips
 
+@track_screen_steps
 class IngredientSelectionScreen:
     # Locators
-    TITLE = (AppiumBy.XPATH, "//android.view.View[contains(@text, 'Select') or contains(@content-desc, 'Select')]")
-    SEEK_BAR = (AppiumBy.XPATH, "//android.widget.SeekBar[@content-desc='50%']")
-    FIND_RECIPES_BUTTON = (AppiumBy.ACCESSIBILITY_ID, "Find Recipes")
+    TITLE = locator_catalog.get('IngredientSelectionScreen', 'TITLE')
+    SEEK_BAR = locator_catalog.get('IngredientSelectionScreen', 'SEEK_BAR')
+    FIND_RECIPES_BUTTON = locator_catalog.get('IngredientSelectionScreen', 'FIND_RECIPES_BUTTON')
+    # The same entries as conditions on page source snapshots
+    TITLE_QUERY = locator_catalog.snapshot_query('IngredientSelectionScreen', 'TITLE')
+    # Only the class, as the seek bar's description changes with its value
+    SEEK_BAR_CLASS = locator_catalog.snapshot_query('IngredientSelectionScreen', 'SEEK_BAR')[0]
 
     def __init__(self, driver: WebDriver):
         self.driver = driver
+        self.last_search_duration: Optional[float] = None
         logger.info("Navigating to Ingredient Selection Screen")
         logger.debug("Initialized IngredientSelectionScreen")
 
@@ -60,7 +85,7 @@ class IngredientSelectionScreen:
             TimeoutException: If meat element is not found within timeout
         """
         logger.debug(f"Selecting meat: {meat}")
-        locator = (AppiumBy.XPATH, f"//android.view.View[contains(@content-desc, '{meat}')]")
+        locator = locator_catalog.get('IngredientSelectionScreen', 'INGREDIENT', ingredient=meat)
         click_element(self.driver, locator, timeout=timeout)
         logger.debug(f"Meat '{meat}' selected")
 
@@ -75,7 +100,8 @@ class IngredientSelectionScreen:
             TimeoutException: If vegetable element is not found within timeout
         """
         logger.debug(f"Selecting vegetable: {vegetable}")
-        locator = (AppiumBy.XPATH, f"//android.view.View[contains(@content-desc, '{vegetable}')]")
+        locator = locator_catalog.get('IngredientSelectionScreen', 'INGREDIENT',
+                                      ingredient=vegetable)
         click_element(self.driver, locator, timeout=timeout)
         logger.debug(f"Vegetable '{vegetable}' selected")
 
@@ -92,23 +118,200 @@ class IngredientSelectionScreen:
         logger.debug(f"Selecting Grain & Starch: {grain_and_starch}")
         
         # Dùng xpath với contains để tìm element theo content-desc
-        locator = (AppiumBy.XPATH, f"//android.view.View[contains(@content-desc, '{grain_and_starch}')]")
+        locator = locator_catalog.get('IngredientSelectionScreen', 'INGREDIENT',
+                                      ingredient=grain_and_starch)
         logger.debug(f"Looking for element with content-desc containing: {grain_and_starch}")
         
         click_element(self.driver, locator, timeout=timeout)
         logger.debug(f"Grain & Starch '{grain_and_starch}' selected")
 
-    def click_on_find_recipe_button(self, timeout: int = DEFAULT_TIMEOUT) -> DishListScreen:
+    def select_calories(self, percent: float, timeout: int = DEFAULT_TIMEOUT):
+        """Set the calories seek bar by tapping at a percentage of its width.
+
+        The seek bar is located in a page source snapshot by its class, as
+        its content description changes with the value.
+
+        Args:
+            percent: Target position between 0 and 100
+            timeout: Maximum time to wait for the screen in seconds
+
+        Raises:
+            ValueError: If percent is not between 0 and 100
+            TimeoutException: If the screen is not shown within timeout
+            NoSuchElementException: If the seek bar is not on the screen
+        """
+        if not 0 <= percent <= 100:
+            raise ValueError("Percent must be between 0 and 100")
+        logger.debug(f"Setting seek bar to {percent}%")
+        seek_bar = self._wait_for_snapshot(timeout).find('', self.SEEK_BAR_CLASS)
+        if seek_bar is None or seek_bar.bounds is None:
+            raise NoSuchElementException("Calories seek bar not found on the screen")
+        left, top, right, bottom = seek_bar.bounds
+        x = min(left + int((right - left) * percent / 100), right - 1)
+        tap_points(self.driver, [{'x': x, 'y': (top + bottom) // 2}])
+        logger.debug(f"Seek bar set to {percent}%")
+
+    def select_ingredients(self, meat: Optional[str] = None, vegetables: Iterable[str] = (),
+                           grains: Iterable[str] = (), verify: bool = True,
+                           timeout: int = DEFAULT_TIMEOUT,
+                           max_pages: int = MAX_INGREDIENT_PAGES) -> None:
+        """Select several ingredients from page source snapshots instead of one lookup each.
+
+        Chips that are already selected are left as they are.
+
+        Args:
+            meat: Content description of the meat to select
+            vegetables: Content descriptions of the vegetables to select
+            grains: Content descriptions of the grains and starches to select
+            verify: Whether to check the selected states afterwards
+            timeout: Maximum time to wait for the screen in seconds
+            max_pages: Maximum number of pages searched
+
+        Raises:
+            TimeoutException: If the screen is not shown within timeout
+            NoSuchElementException: If an ingredient is not found on any page
+            AssertionError: If a tapped chip is not selected afterwards
+        """
+        self._tap_ingredients(([meat] if meat else []) + list(vegetables) + list(grains),
+                              select=True, verify=verify, timeout=timeout, max_pages=max_pages)
+
+    def toggle_ingredients(self, ingredients: Iterable[str], verify: bool = True,
+                           timeout: int = DEFAULT_TIMEOUT,
+                           max_pages: int = MAX_INGREDIENT_PAGES) -> None:
+        """Tap ingredient chips, selecting unselected and deselecting selected ones.
+
+        Every chip of a page is located in one snapshot and all of them are
+        tapped in a single action sequence; the list is scrolled once per
+        page only while chips are still missing. A snapshot taken after the
+        taps of each page checks that the tapped chips changed their state.
+
+        Args:
+            ingredients: Content descriptions of the chips to tap
+            verify: Whether to check the chip states afterwards
+            timeout: Maximum time to wait for the screen in seconds
+            max_pages: Maximum number of pages searched
+
+        Raises:
+            TimeoutException: If the screen is not shown within timeout
+            NoSuchElementException: If an ingredient is not found on any page
+            AssertionError: If a tapped chip did not change its state
+        """
+        self._tap_ingredients(ingredients, select=False, verify=verify, timeout=timeout,
+                              max_pages=max_pages)
+
+    def _tap_ingredients(self, ingredients: Iterable[str], select: bool, verify: bool,
+                         timeout: int, max_pages: int) -> None:
+        """Tap ingredient chips page by page; with select, skip the selected ones."""
+        pending = list(dict.fromkeys(ingredients))
+        if not pending:
+            return
+        logger.debug(f"{'Selecting' if select else 'Tapping'} ingredients: {pending}")
+        window = self.driver.get_window_size()
+        snapshot = self._wait_for_snapshot(timeout)
+        tapped: Dict[str, UiNode] = {}
+
+        for page in range(max_pages):
+            found = {}
+            for ingredient in pending:
+                node = next((node for node in self._find_chips(snapshot, ingredient)
+                             if node.is_within(window['width'], window['height'])), None)
+                if node is not None:
+                    found[ingredient] = node
+            taps = {ingredient: node for ingredient, node in found.items()
+                    if not (select and node.selected)}
+            if len(taps) < len(found):
+                logger.debug(f"Already selected: {[name for name in found if name not in taps]}")
+            tap_points(self.driver, [node.center for node in taps.values()])
+            tapped.update(taps)
+            if verify and taps:
+                # Checked before scrolling, while the tapped chips are still shown
+                snapshot = HierarchySnapshot.take(self.driver)
+                self._verify_selected(taps, snapshot, select)
+            pending = [ingredient for ingredient in pending if ingredient not in found]
+            if not pending:
+                break
+            logger.debug(f"Page {page + 1}: tapped {list(taps)}, still looking for {pending}")
+
+            scroll_down(self.driver)
+            previous, snapshot = snapshot, HierarchySnapshot.take(self.driver)
+            if snapshot.same_screen_as(previous):
+                break
+        if pending:
+            raise NoSuchElementException(f"Ingredients not found on the screen: {pending}")
+        logger.debug(f"Ingredients {list(tapped)} tapped")
+
+    @staticmethod
+    def _find_chips(snapshot: HierarchySnapshot, ingredient: str) -> Iterator[UiNode]:
+        """Find the chips of an ingredient with the catalog's INGREDIENT entry."""
+        return snapshot.find_matching(*locator_catalog.snapshot_query(
+            'IngredientSelectionScreen', 'INGREDIENT', ingredient=ingredient))
+
+    def _wait_for_snapshot(self, timeout: float) -> HierarchySnapshot:
+        """Take snapshots until the screen title is part of one."""
+        end_time = time() + timeout
+        while True:
+            run_wait_guards(self.driver)
+            snapshot = HierarchySnapshot.take(self.driver)
+            if next(snapshot.find_matching(*self.TITLE_QUERY), None):
+                return snapshot
+            if time() > end_time:
+                raise TimeoutException(f"Ingredient selection screen not shown after {timeout}s")
+            sleep(0.2)
+
+    def _verify_selected(self, tapped: Dict[str, UiNode], snapshot: HierarchySnapshot,
+                         select: bool) -> None:
+        """Check in a snapshot taken after the taps that the tapped chips changed state.
+
+        Chips are found again by description, the one nearest to the tapped
+        position winning, as a selected chip may change its size. With
+        select, chips exposing a selected or checked flag must have it set.
+        Otherwise the flags are compared together with the content
+        description, as chips without selection semantics only change their
+        description.
+        """
+        failed: List[str] = []
+        missing: List[str] = []
+        for ingredient, before in tapped.items():
+            x, y = before.center['x'], before.center['y']
+            after = min((node for node in self._find_chips(snapshot, ingredient)
+                         if node.center is not None),
+                        key=lambda node, x=x, y=y: (abs(node.center['x'] - x)
+                                                    + abs(node.center['y'] - y)),
+                        default=None)
+            if after is None:
+                missing.append(ingredient)
+            elif select and after.selectable:
+                if not after.selected:
+                    failed.append(ingredient)
+            elif after.state == before.state:
+                failed.append(ingredient)
+        if failed or missing:
+            raise AssertionError(
+                f"Ingredients {'not selected' if select else 'unchanged'} after tapping: "
+                f"{failed}" + (f", not found to verify: {missing}" if missing else ''))
+
+    def click_on_find_recipe_button(self, timeout: int = DEFAULT_TIMEOUT,
+                                    expected: Optional["RecipePrediction"] = None
+                                    ) -> DishListScreen:
         """Click the 'Find Recipe' button to search for recipes based on selected ingredients.
 
         Args:
             timeout: Maximum time to wait for element in seconds
+            expected: Predicted search result checked by the dish list
 
         Raises:
             TimeoutException: If 'Find Recipe' button is not found within timeout
+            AssertionError: If the search result differs from the expected one
         """
         logger.debug("Clicking on 'Find Recipe' button")
-        click_element(self.driver, self.FIND_RECIPES_BUTTON, timeout=timeout)
+        button = wait_for_visible(self.driver, self.FIND_RECIPES_BUTTON, timeout=timeout)
+        self.last_search_duration = transition_timer.measure(
+            self.driver,
+            "IngredientSelectionScreen->DishListScreen",
+            button,
+            DishListScreen.RECIPE_COUNT_MESSAGE,
+            timeout=LOAD_TIMEOUT
+        )
         logger.debug("'Find Recipe' button clicked")
 
-        return DishListScreen(self.driver)
+        return DishListScreen(self.driver, expected=expected)
@@ -1,16 +1,17 @@
-from appium.webdriver.common.appiumby import AppiumBy
 from appium.webdriver.webdriver import WebDriver
 from utils.custom_keywords import wait_for_visible
+from utils.locator_catalog import locator_catalog
 from utils.logger import logger
-from utils.constants import SPLASH_APP_TITLE, SPLASH_APP_SLOGAN
+from utils.step_tracker import track_screen_steps
 
 DEFAULT_TIMEOUT = 30  # Default timeout in seconds
 
 
+@track_screen_steps
 class SplashScreen:
     # Locators
-    APP_TITLE_TXT = (AppiumBy.ACCESSIBILITY_ID, SPLASH_APP_TITLE)
-    APP_SLOGAN_TXT = (AppiumBy.ACCESSIBILITY_ID, SPLASH_APP_SLOGAN)
+    APP_TITLE_TXT = locator_catalog.get('SplashScreen', 'APP_TITLE_TXT')
+    APP_SLOGAN_TXT = locator_catalog.get('SplashScreen', 'APP_SLOGAN_TXT')
 
     def __init__(self, driver: WebDriver):
         self.driver = driver
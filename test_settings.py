@@ -7,16 +7,101 @@ DEBUG_MODE = False  # Set True to enable detailed logging
 PACKAGE_NAME = "com.example.hnag_ui"
 IS_REINSTALL_APP = False  # True to reinstall app, False to only clear data
 APK_NAME = "app-release-1.0.apk"
+APP_VERSION = "1.0"  # Version of APK_NAME, selects locator catalog overrides
+LOCATOR_CATALOG = "config/locators.json"  # Locators of all screens, per app version
+LOCATOR_MIN_RELIABILITY = 0.8  # Moving success rate for a strategy to be ranked by speed
+LOCATOR_MIN_SAMPLES = 5  # Lookups before an alternative strategy is explored no more
+LOCATOR_EXPLORE_RATE = 0.1  # Share of successful lookups that also time an alternative
+CHECKPOINT_DIR = ".checkpoints"  # Local cache of app data snapshots, keyed by APK hash
 
 # Device settings
 DEVICE_NAME = "emulator-5554"
 PLATFORM_VERSION = "16.0"
 AVD_NAME = "Pixel 9a API 36.0"
 
+# Deep links opening screens directly, by screen name. Values are either a URI
+# template or {"component": "<pkg>/<activity>", "extras": {...}}, formatted with
+# the navigation state (meat, vegetable, grain). Screens without an entry are
+# reached through the UI, e.g.:
+# "DishListScreen": "whattoeat://recipes?meat={meat}&vegetable={vegetable}&grain={grain}"
+DEEP_LINKS = {}
+
 # Appium settings
 APPIUM_HOST = "127.0.0.1"
 APPIUM_PORT = 4723
 
+# Framework cache settings
+CACHE_DIR = ".cache"  # Content-hash caches of code validation and pre-checks
+VALIDATOR_PARALLEL_THRESHOLD = 8  # Changed test files needed to validate in parallel
+
+# Retry settings
+STEP_MAX_RETRIES = 2  # Retries of a single flow step before the test fails
+
+# App liveness settings
+ENABLE_LIVENESS_CHECKS = True  # Abort waits once the app crashed or left the foreground
+LIVENESS_CHECK_INTERVAL = 3.0  # Minimum seconds between liveness checks during a wait
+
+# Driver watchdog settings
+ENABLE_DRIVER_WATCHDOG = True  # Probe session liveness and rebuild dead sessions
+WATCHDOG_INTERVAL = 10.0  # Idle seconds between session liveness probes
+WATCHDOG_PROBE_TIMEOUT = 5.0  # Timeout (seconds) of a single probe
+WATCHDOG_MAX_RECOVERIES = 3  # Session recoveries allowed per test
+
+# Artifact settings
+ARTIFACTS_DIR = "artifacts"  # Screenshots, page sources and logcat dumps of failed tests
+ARTIFACT_WORKERS = 4  # Background threads writing artifacts
+ARTIFACT_ATTACH_TIMEOUT = 30  # Seconds to wait for pending artifacts when a test ends
+LOGCAT_TAIL_LINES = 2000  # Most recent logcat lines saved with a failure
+ENABLE_LOGCAT_STREAM = True  # Stream app logcat; crashes fail waits immediately
+LOGCAT_BUFFER_LINES = 50000  # Lines kept in the logcat ring buffer
+ARTIFACT_PHASH_DISTANCE = None  # Set (e.g. 4) to collapse near-identical screenshots; needs Pillow
+ENABLE_SCREEN_RECORDING = False  # Record the screen in rolling segments, kept only for failed tests
+RECORDING_SEGMENT_SECONDS = 30  # Length of one recording segment
+RECORDING_KEEP_SEGMENTS = 3  # Most recent segments kept on disk and attached to a failure
+RECORDING_BIT_RATE = 2000000  # Video bit rate (bits per second) of the recordings
+
+# Results history settings
+RESULTS_DB = "perf_results/results.db"  # SQLite history of test outcomes and timings
+FLAKY_HISTORY_RUNS = 10  # Recent runs of a test used for expected duration and flakiness
+
+# Async client settings
+ASYNC_MAX_CONNECTIONS = 4  # Concurrent connections of the asyncio W3C client
+ASYNC_COMMAND_TIMEOUT = 30.0  # Timeout (seconds) of a single async command
+
+# Session cache settings
+ENABLE_SESSION_CACHE = True  # Cache window size, element rects and static element handles
+
 # Timeouts (in seconds)
 EMULATOR_BOOT_TIMEOUT = 60  # Time to wait for emulator boot
 APPIUM_SERVER_TIMEOUT = 30  # Time to wait for Appium server
+
+# Performance settings
+PERF_RESULTS_DIR = "perf_results"  # Directory for exported performance data
+TRANSITION_POLL_FREQUENCY = 0.05  # Poll interval (seconds) when timing screen transitions
+PERF_SAMPLE_INTERVAL = 2.0  # Seconds between gfxinfo/meminfo samples
+PERF_MAX_SAMPLES = 1000  # Maximum samples kept in memory by the sampler
+
+# Visual verification settings
+VISUAL_BASELINE_DIR = "visual_baselines"  # Reference images of visual checks, per app version
+VISUAL_UPDATE_BASELINES = False  # Record baselines from the current screen instead of comparing
+VISUAL_PHASH_DISTANCE = 6  # Maximum perceptual hash distance (bits of 64) of a matching region
+VISUAL_PIXEL_TOLERANCE = 16  # Per-channel difference still counted as the same pixel
+VISUAL_MAX_DIFF_RATIO = 0.01  # Maximum share of differing pixels in a matching region
+VISUAL_POLL_INTERVAL = 0.1  # Seconds between screenshots when waiting for a region
+
+# Recipe oracle settings
+# Recipe dataset imported with `python -m utils.recipe_oracle import`
+RECIPE_INDEX = "config/recipe_index.json"
+RECIPE_MATCH = "all"  # Recipes must contain "all" selected ingredients, or "any" of them
+
+# Matrix settings
+MATRIX_FILE = "config/ingredient_matrix.json"  # Ingredient combinations run by --matrix
+MATRIX_RESET = "back"  # Return between combinations: "back" (untap chips) or "relaunch"
+MATRIX_DEFAULT_CALORIES = 100  # Seek bar percent of combinations without calories
+
+# Soak settings
+SOAK_WINDOW = 20  # Iterations in the baseline and recent comparison windows
+SOAK_RESET = "back"  # Between iterations: "back" (keeps the app process) or "clear" (restart)
+SOAK_LATENCY_INCREASE = 0.25  # Minimum relative latency increase to stop a soak run
+SOAK_MEMORY_GROWTH_KB = 50 * 1024  # Minimum PSS growth over the window to stop a soak run
+SOAK_Z_THRESHOLD = 3.0  # Test statistic needed to call a degradation significant
@@ -1,6 +1,10 @@
+import pytest
 from appium.webdriver.webdriver import WebDriver
 from assertpy import assert_that
 
+from flows.navigator import DEFAULT_STATE
+from flows.recipe_flows import FULL_FLOW_STEPS
+from flows.resumable import ResumableFlow
 from screens.splash_screen import SplashScreen
 from screens.ingredient_selection_screen import IngredientSelectionScreen
 from utils.logger import logger
@@ -10,6 +14,7 @@ def test_can_navigate_to_splash_screen(driver: WebDriver):
     splash_screen = SplashScreen(driver)
     splash_screen.app_title_and_slogan_are_displayed()
 
+@pytest.mark.usefixtures("perf_sampler")
 def test_full_flow(driver: WebDriver):
     # Splash screen
     splash_screen = SplashScreen(driver)
@@ -38,10 +43,14 @@ def test_full_flow(driver: WebDriver):
         dish_detail.instructions_is_displayed(),
         "Instructions are not displayed"
     ).is_true()
-    dish_detail.click_save_recipe_button()
-    # assert_that(
-    #     dish_detail.add_to_favorites_success_message_is_displayed(dish_name),
-    #     "Success message is not displayed"
-    # ).is_true()
+    assert_that(
+        dish_detail.save_recipe_shows_feedback(),
+        "Save confirmation is not displayed"
+    ).is_true()
 
     logger.info("End of test_full_flow")
+
+def test_full_flow_with_step_retries(driver: WebDriver, resumable_flow: ResumableFlow):
+    # Flaky steps are retried from the last screen reached instead of from scratch
+    resumable_flow.run(FULL_FLOW_STEPS, SplashScreen(driver), DEFAULT_STATE)
+    logger.info("End of test_full_flow_with_step_retries")
@@ -0,0 +1,42 @@
+"""Ingredient combination matrix run on one warm session."""
+
+import pytest
+from appium.webdriver.webdriver import WebDriver
+from assertpy import assert_that
+
+from flows.navigator import Navigator
+from utils.matrix_runner import MatrixRunner, load_matrix
+from utils.results_db import parse_shard
+from utils.logger import logger
+
+
+@pytest.mark.matrix
+def test_ingredient_matrix(driver: WebDriver, navigator: Navigator, request):
+    """Search recipes for every combination of the file selected with --matrix.
+
+    With --shard=K/N only shard K of the combinations is run.
+
+    Args:
+        driver: WebDriver instance reused by all combinations
+        navigator: Navigator bringing the app to ingredient selection
+        request: PyTest request object carrying the matrix options
+    """
+    path = request.config.getoption("--matrix")
+    shard = request.config.getoption("--shard")
+
+    stats = MatrixRunner(
+        driver,
+        load_matrix(path),
+        navigator=navigator,
+        reset=request.config.getoption("--matrix-reset"),
+        shard=parse_shard(shard) if shard else None
+    ).run()
+    logger.info(f"Matrix results written to {stats['results_file']}")
+    request.node.user_properties.append(("matrix", [
+        {key: record.get(key) for key in ('case', 'outcome', 'recipe_count', 'search_latency')}
+        for record in stats['results']
+    ]))
+
+    failures = {record['case']: record['error']
+                for record in stats['results'] if record['outcome'] == 'failed'}
+    assert_that(failures, "Failed combinations").is_empty()
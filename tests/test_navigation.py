@@ -0,0 +1,22 @@
+"""Tests for direct navigation to screens."""
+
+from assertpy import assert_that
+
+from flows.navigator import Navigator
+from screens.dish_detail_screen import DishDetailScreen
+from utils.logger import logger
+
+
+def test_can_navigate_to_dish_detail_screen(navigator: Navigator):
+    """Navigate straight to the dish detail screen by deep link or UI route.
+    
+    Args:
+        navigator: Navigator bound to the test's driver
+    """
+    dish_detail = navigator.go_to(DishDetailScreen)
+
+    assert_that(
+        dish_detail.dish_detail_screen_is_displayed(),
+        "Dish detail screen is not displayed"
+    ).is_true()
+    logger.info(f"Reached dish detail of {dish_detail.get_dish_name()}")
@@ -0,0 +1,52 @@
+"""Offline tests of frame and memory sampling against recorded dumpsys output."""
+
+import os
+
+from assertpy import assert_that
+
+from utils.perf_sampler import (
+    UNTAGGED,
+    PerfSampler,
+    RecordedDumpsysSource,
+    parse_framestats,
+    parse_meminfo
+)
+
+RECORDING_DIR = os.path.join(os.path.dirname(__file__), 'data', 'dumpsys')
+
+
+def _read(name: str) -> str:
+    with open(os.path.join(RECORDING_DIR, name), 'r', encoding='utf-8') as f:
+        return f.read()
+
+
+def test_parse_recorded_framestats():
+    """Frames flagged invalid are skipped, durations run from intended vsync to completion."""
+    frames = parse_framestats(_read('gfxinfo_002.txt'))
+
+    assert_that(frames).is_length(10)
+    assert_that([round(frame['duration_ms'], 1) for frame in frames])\
+        .is_equal_to([40.0, 8.0, 9.0, 8.0, 9.0, 8.0, 20.0, 8.0, 7.0, 8.0])
+
+
+def test_parse_recorded_meminfo():
+    """Total PSS and heap sizes are read from the meminfo summary."""
+    assert_that(parse_meminfo(_read('meminfo_001.txt'))).is_equal_to({
+        'total_pss_kb': 88104,
+        'java_heap_kb': 9736,
+        'native_heap_kb': 20336
+    })
+
+
+def test_report_from_recorded_dumpsys():
+    """Frames seen in an earlier sample are counted once and heap growth spans all samples."""
+    sampler = PerfSampler(RecordedDumpsysSource(RECORDING_DIR))
+    sampler.sample()
+    sampler.sample()
+
+    report = sampler.report()
+
+    assert_that(report).contains_only(UNTAGGED)
+    assert_that(report[UNTAGGED]).contains_entry(
+        {'frames': 16}, {'jank_percent': 18.75}, {'p90_ms': 25.0},
+        {'pss_start_kb': 88104}, {'pss_end_kb': 90152}, {'heap_growth_kb': 2048})
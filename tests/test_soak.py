@@ -0,0 +1,40 @@
+"""Soak/endurance test repeating a flow on one warm session."""
+
+import pytest
+from appium.webdriver.webdriver import WebDriver
+from assertpy import assert_that
+
+from flows.recipe_flows import FLOWS
+from utils.soak_runner import SoakRunner
+from utils.logger import logger
+
+
+@pytest.mark.soak
+def test_soak(driver: WebDriver, request):
+    """Repeat the flow selected with --soak-flow until the iteration or duration limit.
+    
+    Args:
+        driver: WebDriver instance reused by all iterations
+        request: PyTest request object carrying the soak options
+    """
+    flow_name = request.config.getoption("--soak-flow")
+    assert_that(FLOWS, "Available flows").contains_key(flow_name)
+
+    duration = request.config.getoption("--soak-duration")
+    iterations = request.config.getoption("--soak-iterations")
+    if not iterations and not duration:
+        iterations = 100
+
+    stats = SoakRunner(
+        driver,
+        FLOWS[flow_name],
+        iterations=iterations,
+        duration=duration * 60 if duration else None,
+        recorder=getattr(request.node, 'screen_recorder', None),
+        reset=request.config.getoption("--soak-reset")
+    ).run()
+    logger.info(f"Soak results written to {stats['results_file']}")
+
+    assert_that(stats['stop_reason'], "Soak stop reason")\
+        .is_in('iterations reached', 'duration reached')
+    assert_that(stats['failed'], f"Failed iterations {stats['failures']}").is_equal_to(0)
@@ -0,0 +1,236 @@
+"""Locators with alternative strategies, ranked by their measured speed and reliability."""
+
+import json
+import os
+import random
+import threading
+from time import perf_counter
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
+
+from selenium.common.exceptions import InvalidSelectorException, NoSuchElementException
+
+from utils.logger import logger
+from test_settings import (
+    APP_VERSION,
+    CACHE_DIR,
+    LOCATOR_EXPLORE_RATE,
+    LOCATOR_MIN_RELIABILITY,
+    LOCATOR_MIN_SAMPLES
+)
+
+if TYPE_CHECKING:
+    from appium.webdriver.webdriver import WebDriver
+    from selenium.webdriver.remote.webelement import WebElement
+
+LocatorType = Tuple[str, str]
+# Strategy name (its catalog source, e.g. "xpath=//...") and compiled locator
+Strategy = Tuple[str, LocatorType]
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(__file__))
+
+# Weight of the latest lookup in the moving averages
+SMOOTHING = 0.3
+# Reliability assumed for a strategy that was never tried
+PRIOR_RELIABILITY = 0.5
+_LOOKUP_ERRORS = (NoSuchElementException, InvalidSelectorException)
+
+
+class LocatorRanking:
+    """Moving averages of latency and reliability per locator strategy, kept across runs.
+
+    Reliability is an exponential moving average of found (1) / missed (0),
+    so a strategy broken by an app change drops below the threshold after
+    one or two misses. Statistics are kept per app version.
+    """
+
+    def __init__(self, path: Optional[str] = None, version: str = APP_VERSION):
+        """Initialize LocatorRanking.
+
+        Args:
+            path: Ranking file, defaults to CACHE_DIR/locator_ranking.json
+            version: Version of the app under test
+        """
+        self.path = path or os.path.join(PROJECT_ROOT, CACHE_DIR, 'locator_ranking.json')
+        self.version = version
+        self._stats: Optional[Dict[str, Dict[str, Dict[str, float]]]] = None
+        self._lock = threading.Lock()
+
+    def _load(self) -> Dict[str, Dict[str, Dict[str, float]]]:
+        if self._stats is None:
+            self._stats = {}
+            try:
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    self._stats = json.load(f).get(self.version, {})
+            except (OSError, ValueError) as e:
+                logger.debug(f"No locator ranking loaded: {e}")
+        return self._stats
+
+    def stats(self, key: str, name: str) -> Dict[str, float]:
+        """Get the statistics of one strategy of a locator."""
+        with self._lock:
+            return dict(self._load().get(key, {}).get(name, {
+                'attempts': 0, 'reliability': PRIOR_RELIABILITY, 'latency': None}))
+
+    def record(self, key: str, name: str, found: bool, duration: Optional[float] = None) -> None:
+        """Record one lookup of a strategy.
+
+        Args:
+            key: Locator key ("Screen.NAME")
+            name: Strategy name
+            found: Whether the strategy found the element
+            duration: Lookup time in seconds, for found elements
+        """
+        with self._lock:
+            stats = self._load().setdefault(key, {}).setdefault(name, {
+                'attempts': 0, 'reliability': PRIOR_RELIABILITY, 'latency': None})
+            stats['attempts'] += 1
+            stats['reliability'] += SMOOTHING * (float(found) - stats['reliability'])
+            if found and duration is not None:
+                stats['latency'] = duration if stats['latency'] is None \
+                    else stats['latency'] + SMOOTHING * (duration - stats['latency'])
+
+    def order(self, key: str, strategies: List[Strategy]) -> List[Strategy]:
+        """Sort strategies: reliable ones fastest first, then the rest by reliability.
+
+        Ties keep the catalog order, so the catalog's primary strategy is
+        tried first until measurements say otherwise.
+        """
+        def rank(item: Tuple[int, Strategy]) -> Tuple[Any, ...]:
+            position, (name, _) = item
+            stats = self.stats(key, name)
+            if stats['reliability'] >= LOCATOR_MIN_RELIABILITY and stats['latency'] is not None:
+                return (0, stats['latency'], position)
+            return (1, -stats['reliability'], position)
+        return [strategy for _, strategy in sorted(enumerate(strategies), key=rank)]
+
+    def to_explore(self, key: str, strategies: List[Strategy]) -> Optional[Strategy]:
+        """Pick, now and then, an alternative with too few samples to be ranked."""
+        candidates = [strategy for strategy in strategies
+                      if self.stats(key, strategy[0])['attempts'] < LOCATOR_MIN_SAMPLES]
+        if candidates and random.random() < LOCATOR_EXPLORE_RATE:
+            return random.choice(candidates)
+        return None
+
+    def report(self) -> Dict[str, List[Dict[str, Any]]]:
+        """Get the statistics of all locators, by key."""
+        with self._lock:
+            return {key: [{'strategy': name, **stats} for name, stats in strategies.items()]
+                    for key, strategies in sorted(self._load().items())}
+
+    def save(self) -> None:
+        """Write the statistics of this app version, keeping those of other versions."""
+        with self._lock:
+            if not self._stats:
+                return
+            try:
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+            except (OSError, ValueError):
+                data = {}
+            data[self.version] = self._stats
+            try:
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+                temp_path = f"{self.path}.tmp"
+                with open(temp_path, 'w', encoding='utf-8') as f:
+                    json.dump(data, f, indent=1)
+                os.replace(temp_path, self.path)
+            except OSError as e:
+                logger.warning(f"Failed to save locator ranking: {e}")
+
+
+# Global ranking shared by all adaptive locators
+locator_ranking = LocatorRanking()
+
+
+class AdaptiveLocator(tuple):
+    """Locator with ordered alternative strategies, trying the best-ranked one first.
+
+    It is a (by, value) tuple of the strategy ranked best when it was
+    created, so code unpacking locators keeps working; keywords call `find`
+    and `find_all` to get the ranked lookups. A strategy only counts as
+    missed when another strategy found the element in the same lookup, so
+    waiting for an element that is not shown yet does not penalize anything.
+    """
+
+    def __new__(cls, key: str, strategies: List[Strategy]) -> 'AdaptiveLocator':
+        """Create the locator.
+
+        Args:
+            key: Locator key for the ranking ("Screen.NAME")
+            strategies: Strategies in catalog order, the primary first
+        """
+        best = locator_ranking.order(key, strategies)[0][1]
+        locator = super().__new__(cls, best)
+        locator.key = key
+        locator.strategies = strategies
+        return locator
+
+    def __getnewargs__(self) -> Tuple[str, List[Strategy]]:
+        return self.key, self.strategies
+
+    def find(self, driver: "WebDriver") -> "WebElement":
+        """Find the element with the best-ranked strategy that matches.
+
+        Args:
+            driver: WebDriver instance
+
+        Returns:
+            Found WebElement
+
+        Raises:
+            NoSuchElementException: If no strategy matches
+        """
+        missed: List[str] = []
+        for name, locator in locator_ranking.order(self.key, self.strategies):
+            start = perf_counter()
+            try:
+                element = driver.find_element(*locator)
+            except _LOOKUP_ERRORS:
+                missed.append(name)
+                continue
+            self._found(driver, name, perf_counter() - start, missed)
+            return element
+        raise NoSuchElementException(f"No strategy of {self.key} matched: {self.strategies}")
+
+    def find_all(self, driver: "WebDriver") -> List["WebElement"]:
+        """Find all elements with the best-ranked strategy that matches any.
+
+        Args:
+            driver: WebDriver instance
+
+        Returns:
+            Found WebElements, empty if no strategy matches
+        """
+        missed: List[str] = []
+        for name, locator in locator_ranking.order(self.key, self.strategies):
+            start = perf_counter()
+            try:
+                elements = driver.find_elements(*locator)
+            except InvalidSelectorException:
+                elements = []
+            if not elements:
+                missed.append(name)
+                continue
+            self._found(driver, name, perf_counter() - start, missed)
+            return elements
+        return []
+
+    def _found(self, driver: "WebDriver", name: str, duration: float, missed: List[str]) -> None:
+        locator_ranking.record(self.key, name, True, duration)
+        for missed_name in missed:
+            locator_ranking.record(self.key, missed_name, False)
+        if missed:
+            logger.warning(f"{self.key} found by fallback {name} after {', '.join(missed)} missed")
+
+        alternatives = [strategy for strategy in self.strategies
+                        if strategy[0] != name and strategy[0] not in missed]
+        explored = locator_ranking.to_explore(self.key, alternatives)
+        if explored:
+            start = perf_counter()
+            try:
+                found = bool(driver.find_elements(*explored[1]))
+            except InvalidSelectorException:
+                found = False
+            locator_ranking.record(self.key, explored[0], found, perf_counter() - start)
+            logger.debug(f"Explored {explored[0]} for {self.key}: "
+                         f"{'found' if found else 'missed'} in {perf_counter() - start:.3f}s")
@@ -0,0 +1,105 @@
+"""Low-frequency app liveness checks that abort waits once the app is gone."""
+
+from time import monotonic
+from typing import TYPE_CHECKING, Optional
+
+from appium.webdriver.applicationstate import ApplicationState
+from appium.webdriver.common.appiumby import AppiumBy
+from selenium.common.exceptions import WebDriverException
+
+from utils.custom_keywords import AppCrashError
+from utils.logger import logger
+from test_settings import LIVENESS_CHECK_INTERVAL, PACKAGE_NAME
+
+if TYPE_CHECKING:
+    from appium.webdriver.webdriver import WebDriver
+
+# Buttons of the system "app has stopped" and "app isn't responding" dialogs
+SYSTEM_DIALOG_BUTTONS = (AppiumBy.ID, "android:id/aerr_close")
+ANR_DIALOG_BUTTONS = (AppiumBy.ID, "android:id/aerr_wait")
+SYSTEM_DIALOG_MESSAGE = (AppiumBy.ID, "android:id/alertTitle")
+
+
+class AppLivenessGuard:
+    """Wait guard checking that the app still runs in the foreground.
+
+    Checks run at most every LIVENESS_CHECK_INTERVAL seconds, so a normal
+    wait pays roughly one extra round trip per interval. The wait is aborted
+    when the app process is gone, when a crash or ANR dialog is shown, or
+    when another package stays in the foreground for two checks in a row
+    (a single check may catch a short-lived system activity).
+    """
+
+    def __init__(self, package: str = PACKAGE_NAME, interval: float = LIVENESS_CHECK_INTERVAL):
+        """Initialize AppLivenessGuard.
+
+        Args:
+            package: Package of the app under test
+            interval: Minimum seconds between checks
+        """
+        self.package = package
+        self.interval = interval
+        self.checks = 0
+        self._last_check = monotonic()
+        self._backgrounded = False
+
+    def __call__(self, driver: "WebDriver") -> None:
+        """Check the app if the interval has passed.
+
+        Args:
+            driver: WebDriver instance
+
+        Raises:
+            AppCrashError: If the app crashed, stopped or left the foreground
+        """
+        if monotonic() - self._last_check < self.interval:
+            return
+        self._last_check = monotonic()
+        self.checks += 1
+        problem = self.check(driver)
+        if problem:
+            logger.error(f"Aborting wait: {problem}")
+            raise AppCrashError(problem)
+
+    def check(self, driver: "WebDriver") -> Optional[str]:
+        """Run the liveness checks once.
+
+        Args:
+            driver: WebDriver instance
+
+        Returns:
+            Diagnostic message if the app is gone, None if it looks alive
+        """
+        try:
+            state = driver.query_app_state(self.package)
+        except WebDriverException as e:
+            logger.debug(f"App state unavailable: {e}")
+            return None
+        if state == ApplicationState.NOT_RUNNING:
+            return f"{self.package} is not running (crashed or killed)"
+
+        # An app that is not responding still runs in the foreground, so the
+        # dialogs are looked for whatever the state
+        try:
+            dialog = driver.find_elements(*SYSTEM_DIALOG_BUTTONS) \
+                or driver.find_elements(*ANR_DIALOG_BUTTONS)
+            if dialog:
+                titles = driver.find_elements(*SYSTEM_DIALOG_MESSAGE)
+                title = titles[0].text if titles else "crash/ANR dialog"
+                return f"System dialog shown over {self.package}: {title}"
+            if state == ApplicationState.RUNNING_IN_FOREGROUND:
+                self._backgrounded = False
+                return None
+            package = driver.current_package
+            activity = driver.current_activity
+        except WebDriverException as e:
+            logger.debug(f"Foreground app unavailable: {e}")
+            return None
+        if package == self.package:
+            self._backgrounded = False
+            return None
+        if self._backgrounded:
+            return (f"{self.package} left the foreground (state {state}); "
+                    f"{package}/{activity} is shown")
+        self._backgrounded = True
+        return None
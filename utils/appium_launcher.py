@@ -6,10 +6,12 @@ import signal
 import subprocess
 import threading
 import time
-from typing import Optional
+from collections import deque
+from typing import Deque, List, Optional
 
 import requests
 
+from config.logging_config import LogConfig
 from test_settings import (
     APPIUM_HOST,
     APPIUM_PORT,
@@ -24,6 +26,8 @@ class AppiumServer:
     def __init__(self):
         """Initialize AppiumServer instance."""
         self.process: Optional[subprocess.Popen] = None
+        self.output_tail: Deque[str] = deque(maxlen=LogConfig.APPIUM_OUTPUT_TAIL)
+        self.forward_output = True
         
     def get_process(self) -> Optional[subprocess.Popen]:
         """Get current Appium process."""
@@ -33,6 +37,10 @@ class AppiumServer:
         """Set current Appium process."""
         self.process = process
 
+    def get_output_tail(self) -> List[str]:
+        """Get the most recent Appium server output lines."""
+        return list(self.output_tail)
+
 
 # Global instance of AppiumServer
 appium_server = AppiumServer()
@@ -157,7 +165,9 @@ def start_appium() -> None:
                 if not line and process.poll() is not None:
                     break
                 if line:
-                    logger.debug(f"[APPIUM] {line.strip()}")
+                    appium_server.output_tail.append(line.rstrip())
+                    if appium_server.forward_output:
+                        logger.debug(f"[APPIUM] {line.strip()}")
         
         output_thread = threading.Thread(target=log_output, daemon=True)
         output_thread.start()
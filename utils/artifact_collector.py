@@ -0,0 +1,301 @@
+"""Failure artifacts (screenshot, page source, logcat) written in background threads."""
+
+import base64
+import json
+import os
+import re
+import subprocess
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from datetime import datetime
+from typing import TYPE_CHECKING, Dict, Iterator, List, Optional, Tuple
+
+from utils.artifact_store import ArtifactStore, artifact_store, iter_file
+from utils.logger import logger
+from test_settings import (
+    ARTIFACTS_DIR,
+    ARTIFACT_WORKERS,
+    ARTIFACT_ATTACH_TIMEOUT,
+    DEVICE_NAME,
+    LOGCAT_TAIL_LINES
+)
+
+if TYPE_CHECKING:
+    from appium.webdriver.webdriver import WebDriver
+
+# Base64 characters decoded at once; a multiple of 4 so chunks decode independently
+DECODE_CHUNK = 256 * 1024
+# Characters of text encoded at once
+TEXT_CHUNK = 256 * 1024
+
+# Attachment name, file path and MIME type of a written artifact
+Artifact = Tuple[str, str, str]
+
+
+def _safe_name(name: str) -> str:
+    return re.sub(r'[^\w.-]+', '_', name).strip('_')[:120]
+
+
+def base64_chunks(data: str) -> Iterator[bytes]:
+    """Decode base64 data chunk by chunk.
+
+    Args:
+        data: Base64 encoded content
+
+    Yields:
+        Decoded content in chunks
+    """
+    for offset in range(0, len(data), DECODE_CHUNK):
+        yield base64.b64decode(data[offset:offset + DECODE_CHUNK])
+
+
+def text_chunks(text: str) -> Iterator[bytes]:
+    """Encode text to UTF-8 chunk by chunk.
+
+    Args:
+        text: Text content
+
+    Yields:
+        Encoded content in chunks
+    """
+    for offset in range(0, len(text), TEXT_CHUNK):
+        yield text[offset:offset + TEXT_CHUNK].encode('utf-8')
+
+
+def logcat_chunks(lines: int = LOGCAT_TAIL_LINES, device: str = DEVICE_NAME) -> Iterator[bytes]:
+    """Stream the last logcat lines of the device.
+
+    Args:
+        lines: Number of most recent lines to dump
+        device: ADB serial of the device
+
+    Yields:
+        Logcat output in chunks
+    """
+    command = ['adb', '-s', device, 'logcat', '-d', '-v', 'threadtime', '-t', str(lines)]
+    process = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+    try:
+        yield from iter(lambda: process.stdout.read(64 * 1024), b'')
+    finally:
+        process.stdout.close()
+        process.wait(timeout=30)
+
+
+class ArtifactCollector:
+    """Capture debugging artifacts and finish writing them off the test's critical path.
+
+    Only the round trips that need the live session (screenshot and page
+    source) run on the caller's thread. Decoding, compression and the logcat
+    dump run in a thread pool, overlapping the rest of the test and its
+    teardown. Content is kept once in the artifact store; each test folder
+    holds a manifest pointing at the stored copies. Artifacts are attached
+    to Allure when the test report is finalized, because Allure only
+    accepts attachments for an open test.
+    """
+
+    def __init__(self, root: str = ARTIFACTS_DIR, workers: int = ARTIFACT_WORKERS,
+                 store: ArtifactStore = artifact_store):
+        """Initialize ArtifactCollector.
+
+        Args:
+            root: Artifact directory, relative to the project root
+            workers: Number of background writer threads
+            store: Content-addressed store keeping the artifact files
+        """
+        self.root = os.path.join(os.path.dirname(os.path.dirname(__file__)), root)
+        self.workers = workers
+        self.store = store
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._pending: Dict[str, List[Future]] = {}
+        self.current_test = "session"
+        self._lock = threading.Lock()
+
+    @property
+    def executor(self) -> ThreadPoolExecutor:
+        """Get the writer pool, created on first use."""
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.workers,
+                                                thread_name_prefix="artifact-writer")
+        return self._executor
+
+    def capture(self, driver: Optional["WebDriver"], label: str = "failure",
+                test_id: Optional[str] = None, logcat: bool = True) -> List[Future]:
+        """Capture the screen state now and write the artifacts in the background.
+
+        Args:
+            driver: WebDriver instance, or None to only dump logcat
+            label: Capture label, e.g. "failure" or a step name for on-demand captures
+            test_id: Identifier grouping the artifacts, defaults to the running test
+            logcat: Whether to dump the recent device log as well
+
+        Returns:
+            Futures resolving to the written artifacts
+        """
+        test_id = test_id or self.current_test
+        futures = []
+        if driver is not None:
+            try:
+                screenshot = driver.get_screenshot_as_base64()
+                futures.append(self.executor.submit(
+                    self._write, test_id, f"{label} screenshot", 'image/png', 'png',
+                    base64_chunks(screenshot)))
+            except Exception as e:
+                logger.warning(f"Screenshot not captured: {e}")
+            try:
+                page_source = driver.page_source
+                futures.append(self.executor.submit(
+                    self._write, test_id, f"{label} page source", 'application/gzip', 'xml',
+                    text_chunks(page_source)))
+            except Exception as e:
+                logger.warning(f"Page source not captured: {e}")
+        if logcat:
+            futures.append(self.executor.submit(
+                self._write, test_id, f"{label} logcat", 'application/gzip', 'txt',
+                logcat_chunks()))
+
+        with self._lock:
+            self._pending.setdefault(test_id, []).extend(futures)
+        logger.debug(f"Capturing {len(futures)} {label} artifact(s) for {test_id}")
+        return futures
+
+    def add_text(self, label: str, text: str, test_id: Optional[str] = None) -> Future:
+        """Store text (e.g. a log slice) as an artifact in the background.
+
+        Args:
+            label: Attachment name
+            text: Text content
+            test_id: Identifier grouping the artifacts, defaults to the running test
+
+        Returns:
+            Future resolving to the written artifact
+        """
+        test_id = test_id or self.current_test
+        future = self.executor.submit(self._write, test_id, label, 'application/gzip', 'txt',
+                                      text_chunks(text))
+        with self._lock:
+            self._pending.setdefault(test_id, []).append(future)
+        return future
+
+    def add_bytes(self, label: str, data: bytes, mime_type: str, extension: str,
+                  test_id: Optional[str] = None) -> Future:
+        """Store binary content (e.g. a rendered image) as an artifact in the background.
+
+        Args:
+            label: Attachment name
+            data: Content
+            mime_type: MIME type of the attachment, e.g. 'image/png'
+            extension: File extension, e.g. 'png'
+            test_id: Identifier grouping the artifacts, defaults to the running test
+
+        Returns:
+            Future resolving to the written artifact
+        """
+        test_id = test_id or self.current_test
+        future = self.executor.submit(self._write, test_id, label, mime_type, extension,
+                                      iter([data]))
+        with self._lock:
+            self._pending.setdefault(test_id, []).append(future)
+        return future
+
+    def add_file(self, label: str, path: str, mime_type: str, extension: str,
+                 test_id: Optional[str] = None, remove: bool = False) -> Future:
+        """Store an existing file (e.g. a video) as an artifact in the background.
+
+        Args:
+            label: Attachment name
+            path: File to store, read in chunks
+            mime_type: MIME type of the attachment, e.g. 'video/mp4'
+            extension: File extension, e.g. 'mp4'
+            test_id: Identifier grouping the artifacts, defaults to the running test
+            remove: Whether to delete the file once it is stored
+
+        Returns:
+            Future resolving to the written artifact
+        """
+        test_id = test_id or self.current_test
+
+        def write() -> Artifact:
+            artifact = self._write(test_id, label, mime_type, extension, iter_file(path))
+            if remove:
+                os.remove(path)
+            return artifact
+
+        future = self.executor.submit(write)
+        with self._lock:
+            self._pending.setdefault(test_id, []).append(future)
+        return future
+
+    def _write(self, test_id: str, name: str, mime_type: str, extension: str,
+               chunks: Iterator[bytes]) -> Artifact:
+        """Store one artifact and record it in the test's manifest."""
+        path, reused = self.store.put(chunks, extension)
+        directory = os.path.join(self.root, _safe_name(test_id))
+        os.makedirs(directory, exist_ok=True)
+        with self._lock, open(os.path.join(directory, 'manifest.jsonl'), 'a',
+                              encoding='utf-8') as f:
+            f.write(json.dumps({
+                'name': name,
+                'path': os.path.relpath(path, self.root),
+                'reused': reused,
+                'timestamp': datetime.now().isoformat(timespec='milliseconds')
+            }) + '\n')
+        return name, path, mime_type
+
+    def collect(self, test_id: str, timeout: float = ARTIFACT_ATTACH_TIMEOUT) -> List[Artifact]:
+        """Wait for the artifacts of a test to be written.
+
+        Args:
+            test_id: Identifier passed to capture
+            timeout: Maximum time to wait in seconds
+
+        Returns:
+            Written artifacts; failed or unfinished ones are logged and skipped
+        """
+        with self._lock:
+            futures = self._pending.pop(test_id, [])
+        if not futures:
+            return []
+        done, not_done = wait(futures, timeout=timeout)
+        if not_done:
+            logger.warning(f"{len(not_done)} artifact(s) of {test_id} not written "
+                           f"within {timeout}s")
+        artifacts = []
+        for future in done:
+            try:
+                artifacts.append(future.result())
+            except Exception as e:
+                logger.warning(f"Artifact of {test_id} not written: {e}")
+        return artifacts
+
+    def attach(self, test_id: str, timeout: float = ARTIFACT_ATTACH_TIMEOUT) -> List[Artifact]:
+        """Attach the written artifacts of a test to its Allure result.
+
+        Args:
+            test_id: Identifier passed to capture
+            timeout: Maximum time to wait for pending artifacts in seconds
+
+        Returns:
+            Attached artifacts
+        """
+        artifacts = self.collect(test_id, timeout)
+        if not artifacts:
+            return []
+        try:
+            import allure
+        except ImportError:
+            return artifacts
+        for name, path, mime_type in sorted(artifacts, key=lambda artifact: artifact[1]):
+            extension = os.path.basename(path).split('.', 1)[-1]
+            allure.attach.file(path, name=name, attachment_type=mime_type, extension=extension)
+        logger.info(f"Attached {len(artifacts)} artifact(s) to {test_id}")
+        return artifacts
+
+    def shutdown(self) -> None:
+        """Finish all pending writes and stop the writer pool."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+
+# Global artifact collector
+artifact_collector = ArtifactCollector()
@@ -0,0 +1,268 @@
+"""Content-addressed storage of test artifacts and deduplication of Allure results."""
+
+import glob
+import gzip
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from typing import Any, Dict, Iterable, Iterator, Optional, Tuple
+
+from utils.logger import logger
+from test_settings import ARTIFACTS_DIR, ARTIFACT_PHASH_DISTANCE
+
+try:
+    from PIL import Image
+except ImportError:  # Perceptual deduplication is optional
+    Image = None
+
+READ_CHUNK = 1024 * 1024
+
+# Extensions of already compressed formats, stored as they are
+COMPRESSED_EXTENSIONS = ('png', 'jpg', 'jpeg', 'webp', 'gz', 'zip', 'mp4')
+
+
+def _is_compressed(extension: str) -> bool:
+    return extension.rsplit('.', 1)[-1].lower() in COMPRESSED_EXTENSIONS
+
+
+def iter_file(path: str, chunk_size: int = READ_CHUNK) -> Iterator[bytes]:
+    """Read a file in chunks."""
+    with open(path, 'rb') as f:
+        yield from iter(lambda: f.read(chunk_size), b'')
+
+
+def file_digest(path: str) -> str:
+    """Get the SHA-256 of a file, read in chunks."""
+    digest = hashlib.sha256()
+    for chunk in iter_file(path):
+        digest.update(chunk)
+    return digest.hexdigest()
+
+
+def image_hash(path: str) -> Optional[int]:
+    """Get the 64-bit difference hash of an image, or None without Pillow.
+
+    Args:
+        path: Image file
+
+    Returns:
+        Perceptual hash; near-identical screenshots differ in few bits
+    """
+    if Image is None:
+        return None
+    try:
+        with Image.open(path) as image:
+            pixels = list(image.convert('L').resize((9, 8)).getdata())
+    except Exception as e:
+        logger.debug(f"Cannot hash image {path}: {e}")
+        return None
+    value = 0
+    for row in range(8):
+        for column in range(8):
+            left, right = pixels[row * 9 + column], pixels[row * 9 + column + 1]
+            value = (value << 1) | (left > right)
+    return value
+
+
+class ArtifactStore:
+    """Store each unique artifact once, under the SHA-256 of its content.
+
+    Text artifacts are gzip compressed with a fixed header, so identical
+    content always yields identical bytes; already compressed formats (PNG,
+    gzip) are kept as they are. With ARTIFACT_PHASH_DISTANCE set and Pillow
+    installed, screenshots within that many bits of a stored one are
+    collapsed onto it.
+    """
+
+    def __init__(self, root: str = ARTIFACTS_DIR,
+                 phash_distance: Optional[int] = ARTIFACT_PHASH_DISTANCE):
+        """Initialize ArtifactStore.
+
+        Args:
+            root: Artifact directory, relative to the project root; blobs
+                are kept in its 'objects' subdirectory
+            phash_distance: Maximum perceptual hash distance of collapsed
+                screenshots, or None to only collapse exact duplicates
+        """
+        self.root = os.path.join(os.path.dirname(os.path.dirname(__file__)), root, 'objects')
+        self.phash_distance = phash_distance
+        self.stored = 0
+        self.deduplicated = 0
+        self._image_hashes: Optional[Dict[int, str]] = None
+        self._lock = threading.Lock()
+
+    def _object_path(self, digest: str, extension: str) -> str:
+        return os.path.join(self.root, digest[:2], f"{digest}.{extension}")
+
+    def _phash_index_path(self) -> str:
+        return os.path.join(self.root, 'phash.json')
+
+    def _load_image_hashes(self) -> Dict[int, str]:
+        if self._image_hashes is None:
+            self._image_hashes = {}
+            if os.path.exists(self._phash_index_path()):
+                with open(self._phash_index_path(), 'r', encoding='utf-8') as f:
+                    self._image_hashes = {int(key): path for key, path in json.load(f).items()}
+        return self._image_hashes
+
+    def _similar_image(self, value: int) -> Optional[str]:
+        """Find a stored screenshot whose perceptual hash is close to the value."""
+        for stored_value, stored_path in self._load_image_hashes().items():
+            if bin(stored_value ^ value).count('1') <= self.phash_distance \
+                    and os.path.exists(stored_path):
+                return stored_path
+        return None
+
+    def _register_image(self, value: int, path: str) -> None:
+        hashes = self._load_image_hashes()
+        hashes[value] = path
+        with open(self._phash_index_path(), 'w', encoding='utf-8') as f:
+            json.dump({str(key): stored for key, stored in hashes.items()}, f)
+
+    def put(self, chunks: Iterable[bytes], extension: str) -> Tuple[str, bool]:
+        """Store streamed content unless an identical copy exists.
+
+        Args:
+            chunks: Content in chunks, uncompressed for text formats
+            extension: File extension of the content (e.g., "png", "xml");
+                ".gz" is appended when the store compresses it
+
+        Returns:
+            Path of the stored copy and whether an existing copy was reused
+        """
+        compress = not _is_compressed(extension)
+        if compress:
+            extension = f"{extension}.gz"
+        os.makedirs(self.root, exist_ok=True)
+        digest = hashlib.sha256()
+        with tempfile.NamedTemporaryFile(dir=self.root, suffix='.part', delete=False) as temp:
+            try:
+                output = gzip.GzipFile(filename='', mode='wb', fileobj=temp, mtime=0) \
+                    if compress else temp
+                for chunk in chunks:
+                    digest.update(chunk)
+                    output.write(chunk)
+                if compress:
+                    output.close()
+            except Exception:
+                temp.close()
+                os.remove(temp.name)
+                raise
+
+        path = self._object_path(digest.hexdigest(), extension)
+        with self._lock:
+            if os.path.exists(path):
+                os.remove(temp.name)
+                return self._reused(path)
+            value = image_hash(temp.name) \
+                if self.phash_distance is not None and extension == 'png' else None
+            if value is not None:
+                similar = self._similar_image(value)
+                if similar:
+                    os.remove(temp.name)
+                    return self._reused(similar)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            os.replace(temp.name, path)
+            if value is not None:
+                self._register_image(value, path)
+            self.stored += 1
+        return path, False
+
+    def _reused(self, path: str) -> Tuple[str, bool]:
+        self.deduplicated += 1
+        return path, True
+
+
+def _rewrite_sources(node: Any, renames: Dict[str, str]) -> bool:
+    """Point attachment sources of an Allure result (and its steps) at renamed files."""
+    changed = False
+    if isinstance(node, dict):
+        for attachment in node.get('attachments', []):
+            if attachment.get('source') in renames:
+                attachment['source'] = renames[attachment['source']]
+                changed = True
+        for value in node.values():
+            if isinstance(value, (dict, list)):
+                changed |= _rewrite_sources(value, renames)
+    elif isinstance(node, list):
+        for value in node:
+            changed |= _rewrite_sources(value, renames)
+    return changed
+
+
+def dedupe_allure_results(results_dir: str,
+                          phash_distance: Optional[int] = ARTIFACT_PHASH_DISTANCE
+                          ) -> Dict[str, int]:
+    """Keep one copy of each identical attachment in an Allure results directory.
+
+    Attachments are renamed after their SHA-256, duplicates are deleted and
+    result/container files are rewritten to reference the kept copy. With a
+    perceptual hash distance and Pillow installed, near-identical PNG
+    screenshots are collapsed as well.
+
+    Args:
+        results_dir: Directory given to --alluredir
+        phash_distance: Maximum perceptual hash distance of collapsed
+            screenshots, or None to only collapse exact duplicates
+
+    Returns:
+        Number of attachment files before and after, and bytes freed
+    """
+    stats = {'attachments': 0, 'unique': 0, 'bytes_freed': 0}
+    renames: Dict[str, str] = {}
+    kept: Dict[str, str] = {}
+    image_hashes: Dict[int, str] = {}
+    for path in sorted(glob.glob(os.path.join(results_dir, '*-attachment*'))):
+        name = os.path.basename(path)
+        stats['attachments'] += 1
+        extension = name.split('-attachment', 1)[1]
+        digest = file_digest(path)
+        canonical = kept.get(digest)
+        if canonical == name:  # Already renamed onto itself
+            continue
+        if canonical is None and phash_distance is not None and extension == '.png':
+            value = image_hash(path)
+            if value is not None:
+                canonical = next((stored for stored_value, stored in image_hashes.items()
+                                  if bin(stored_value ^ value).count('1') <= phash_distance),
+                                 None)
+                if canonical is None:
+                    image_hashes[value] = f"{digest}-attachment{extension}"
+        if canonical is not None:
+            stats['bytes_freed'] += os.path.getsize(path)
+            os.remove(path)
+            renames[name] = canonical
+            continue
+
+        canonical = f"{digest}-attachment{extension}"
+        if name != canonical:
+            os.replace(path, os.path.join(results_dir, canonical))
+            renames[name] = canonical
+        kept[digest] = canonical
+        stats['unique'] += 1
+
+    if renames:
+        for result_file in glob.glob(os.path.join(results_dir, '*-result.json')) + \
+                glob.glob(os.path.join(results_dir, '*-container.json')):
+            with open(result_file, 'r', encoding='utf-8') as f:
+                result = json.load(f)
+            if _rewrite_sources(result, renames):
+                with open(result_file, 'w', encoding='utf-8') as f:
+                    json.dump(result, f)
+    logger.info(
+        f"Allure attachments: {stats['attachments']} -> {stats['unique']} unique, "
+        f"{stats['bytes_freed'] / 1024:.0f}KB freed"
+    )
+    return stats
+
+
+# Global artifact store
+artifact_store = ArtifactStore()
+
+
+if __name__ == '__main__':
+    import sys
+
+    dedupe_allure_results(sys.argv[1] if len(sys.argv) > 1 else 'allure-results')
@@ -0,0 +1,229 @@
+"""Asyncio W3C client sharing the session of a WebDriver, for concurrent reads."""
+
+import asyncio
+import threading
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Awaitable,
+    Callable,
+    Dict,
+    List,
+    Optional,
+    TypeVar
+)
+
+import aiohttp
+
+from utils.custom_keywords import LocatorType
+from utils.logger import logger
+from test_settings import (
+    APPIUM_HOST,
+    APPIUM_PORT,
+    ASYNC_COMMAND_TIMEOUT,
+    ASYNC_MAX_CONNECTIONS
+)
+
+if TYPE_CHECKING:
+    from appium.webdriver.webdriver import WebDriver
+    from selenium.webdriver.remote.webelement import WebElement
+
+T = TypeVar('T')
+
+# Key of element references in W3C responses
+ELEMENT_KEY = 'element-6066-11e4-a23c-4418c6b29066'
+
+
+class AsyncElement:
+    """Element reference returned by AsyncDriver, with awaitable element commands."""
+
+    def __init__(self, client: "AsyncDriver", element_id: str):
+        """Initialize AsyncElement.
+
+        Args:
+            client: Client that found the element
+            element_id: W3C element reference
+        """
+        self.client = client
+        self.id = element_id
+
+    def _path(self, command: str = '') -> str:
+        return f"/element/{self.id}{command}"
+
+    async def get_attribute(self, name: str) -> Optional[str]:
+        """Get an attribute (e.g. 'content-desc', 'checked')."""
+        return await self.client.execute('GET', self._path(f"/attribute/{name}"))
+
+    async def text(self) -> str:
+        """Get the element text."""
+        return await self.client.execute('GET', self._path('/text'))
+
+    async def rect(self) -> Dict[str, int]:
+        """Get the element rectangle as x, y, width and height."""
+        return await self.client.execute('GET', self._path('/rect'))
+
+    async def is_displayed(self) -> bool:
+        """Check whether the element is displayed."""
+        return await self.client.execute('GET', self._path('/displayed'))
+
+    async def click(self) -> None:
+        """Click the element."""
+        await self.client.execute('POST', self._path('/click'), {})
+
+    def to_webelement(self) -> "WebElement":
+        """Get a synchronous WebElement for the same reference."""
+        return self.client.driver.create_web_element(self.id)
+
+
+class AsyncDriver:
+    """Thin asyncio W3C client issuing commands on an existing WebDriver's session.
+
+    Selenium sends one command at a time over a blocking connection, so
+    independent queries (reading the attributes of every card of a list,
+    checking several elements) add up their round trips. This client sends
+    them over a keep-alive aiohttp connection pool instead, letting
+    `asyncio.gather` overlap them. The session id is read from the driver on
+    every command, so sessions rebuilt by the driver watchdog are followed;
+    the commands themselves bypass the watchdog and the wait guards.
+
+    The event loop runs in a daemon thread owned by the client, so the pool
+    stays open across calls and synchronous code (screen objects) can use it
+    through `run`.
+    """
+
+    def __init__(self, driver: "WebDriver", max_connections: int = ASYNC_MAX_CONNECTIONS,
+                 timeout: float = ASYNC_COMMAND_TIMEOUT):
+        """Initialize AsyncDriver.
+
+        Args:
+            driver: WebDriver whose session and server are used
+            max_connections: Maximum concurrent connections to the server
+            timeout: Timeout of a single command in seconds
+        """
+        self.driver = driver
+        self.max_connections = max_connections
+        self.timeout = timeout
+        self.commands = 0
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._lock = threading.Lock()
+
+    @property
+    def url(self) -> str:
+        """Base URL of the current session."""
+        return f"http://{APPIUM_HOST}:{APPIUM_PORT}/session/{self.driver.session_id}"
+
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                self._thread = threading.Thread(target=self._loop.run_forever,
+                                                name="async-driver", daemon=True)
+                self._thread.start()
+        return self._loop
+
+    async def _get_session(self) -> aiohttp.ClientSession:
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=self.max_connections),
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+                headers={'Accept': 'application/json'}
+            )
+        return self._session
+
+    async def execute(self, method: str, path: str,
+                      payload: Optional[Dict[str, Any]] = None) -> Any:
+        """Send one W3C command on the driver's session.
+
+        Args:
+            method: HTTP method
+            path: Command path relative to the session (e.g. '/element')
+            payload: JSON body of POST commands
+
+        Returns:
+            The 'value' of the response
+
+        Raises:
+            WebDriverException: Subclass matching the W3C error, as raised by
+                the synchronous driver
+        """
+        session = await self._get_session()
+        self.commands += 1
+        async with session.request(method, f"{self.url}{path}", json=payload) as response:
+            body = await response.text()
+            if response.status >= 400:
+                self.driver.error_handler.check_response({'status': response.status,
+                                                          'value': body})
+            data = await response.json(content_type=None)
+        return data.get('value') if isinstance(data, dict) else data
+
+    async def find_element(self, locator: LocatorType) -> AsyncElement:
+        """Find the first element matching a locator.
+
+        Raises:
+            NoSuchElementException: If no element matches
+        """
+        by, value = locator
+        result = await self.execute('POST', '/element', {'using': by, 'value': value})
+        return AsyncElement(self, result[ELEMENT_KEY])
+
+    async def find_elements(self, locator: LocatorType) -> List[AsyncElement]:
+        """Find all elements matching a locator; empty if none match."""
+        by, value = locator
+        results = await self.execute('POST', '/elements', {'using': by, 'value': value})
+        return [AsyncElement(self, result[ELEMENT_KEY]) for result in results]
+
+    async def perform_actions(self, actions: List[Dict[str, Any]]) -> None:
+        """Perform a W3C action sequence (e.g. taps built by custom_keywords.pointer_taps)."""
+        await self.execute('POST', '/actions', {'actions': actions})
+
+    async def release_actions(self) -> None:
+        """Release all pressed keys and pointers."""
+        await self.execute('DELETE', '/actions')
+
+    def run(self, work: Callable[["AsyncDriver"], Awaitable[T]]) -> T:
+        """Run a coroutine function with this client and wait for its result.
+
+        Args:
+            work: Coroutine function taking the client
+
+        Returns:
+            The coroutine's result; its exceptions are raised as is
+        """
+        future = asyncio.run_coroutine_threadsafe(work(self), self._ensure_loop())
+        return future.result()
+
+    def close(self) -> None:
+        """Close the connection pool and stop the event loop."""
+        if self._loop is None:
+            return
+        if self._session is not None:
+            asyncio.run_coroutine_threadsafe(self._session.close(), self._loop).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(timeout=5)
+        self._loop.close()
+        self._loop, self._thread, self._session = None, None, None
+        logger.debug(f"Async driver closed after {self.commands} commands")
+
+
+def center(rect: Dict[str, int]) -> Dict[str, int]:
+    """Get the center point of an element rectangle."""
+    return {'x': rect['x'] + rect['width'] // 2, 'y': rect['y'] + rect['height'] // 2}
+
+
+_clients: Dict[int, AsyncDriver] = {}
+
+
+def get_async_driver(driver: "WebDriver") -> AsyncDriver:
+    """Get the shared async client of a WebDriver, created on first use."""
+    if id(driver) not in _clients:
+        _clients[id(driver)] = AsyncDriver(driver)
+    return _clients[id(driver)]
+
+
+def close_async_driver(driver: "WebDriver") -> None:
+    """Close the async client of a WebDriver, if one was created."""
+    client = _clients.pop(id(driver), None)
+    if client is not None:
+        client.close()
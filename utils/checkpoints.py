@@ -0,0 +1,233 @@
+"""App-state checkpoints: snapshot and restore the app's data directory."""
+
+import hashlib
+import json
+import os
+import shutil
+import subprocess
+from datetime import datetime
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
+
+from utils.logger import logger
+from test_settings import APK_NAME, CHECKPOINT_DIR, DEVICE_NAME, PACKAGE_NAME
+
+if TYPE_CHECKING:
+    from appium.webdriver.webdriver import WebDriver
+
+# Directories that only hold regenerable data
+EXCLUDED_DIRS = ('./cache', './code_cache')
+
+_apk_hash_cache: Dict[Tuple[str, float, int], str] = {}
+
+
+class CheckpointError(Exception):
+    """Raised when a checkpoint cannot be saved or restored."""
+
+
+def get_apk_path() -> str:
+    """Get the path of the APK under test."""
+    return os.path.join(os.getcwd(), 'apks', APK_NAME)
+
+
+def get_apk_hash(apk_path: Optional[str] = None) -> str:
+    """Get the SHA-256 of the APK, cached by path, modification time and size.
+
+    Args:
+        apk_path: Path of the APK, defaults to the configured APK
+
+    Returns:
+        Hex digest of the APK
+
+    Raises:
+        FileNotFoundError: If the APK does not exist
+    """
+    apk_path = apk_path or get_apk_path()
+    stat = os.stat(apk_path)
+    key = (apk_path, stat.st_mtime, stat.st_size)
+    if key not in _apk_hash_cache:
+        digest = hashlib.sha256()
+        with open(apk_path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b''):
+                digest.update(chunk)
+        _apk_hash_cache[key] = digest.hexdigest()
+    return _apk_hash_cache[key]
+
+
+class CheckpointStore:
+    """Local cache of app data archives keyed by APK hash and checkpoint name.
+
+    Archives are streamed with `tar` running as the app user (`run-as`, needs
+    a debuggable build) or as root (`su`, needs a rooted emulator). `adb
+    backup` is not used because restoring requires confirming a dialog on the
+    device. Only persisted state is captured; screens reached in memory must
+    be restored through navigation.
+    """
+
+    def __init__(self, cache_dir: str = CHECKPOINT_DIR, device: str = DEVICE_NAME,
+                 package: str = PACKAGE_NAME):
+        """Initialize CheckpointStore.
+
+        Args:
+            cache_dir: Local cache directory, relative to the project root
+            device: ADB serial of the device
+            package: Package whose data is checkpointed
+        """
+        self.root = os.path.join(os.path.dirname(os.path.dirname(__file__)), cache_dir)
+        self.device = device
+        self.package = package
+        self._access: Optional[str] = None
+
+    @property
+    def data_dir(self) -> str:
+        """Get the app's data directory on the device."""
+        return f"/data/data/{self.package}"
+
+    def _build_dir(self) -> str:
+        return os.path.join(self.root, get_apk_hash()[:16])
+
+    def _paths(self, name: str) -> Tuple[str, str]:
+        safe_name = name.replace(' ', '_').replace('/', '_')
+        base = os.path.join(self._build_dir(), safe_name)
+        return f"{base}.tar.gz", f"{base}.json"
+
+    def _shell_command(self, command: str) -> List[str]:
+        """Wrap a device shell command so it runs with access to the data directory."""
+        if self._access is None:
+            self._access = self._detect_access()
+        if self._access == 'run-as':
+            return ['run-as', self.package, 'sh', '-c', f"'{command}'"]
+        return ['su', '0', 'sh', '-c', f"'{command}'"]
+
+    def _detect_access(self) -> str:
+        for access, probe in (('run-as', ['run-as', self.package, 'true']),
+                              ('su', ['su', '0', 'true'])):
+            result = subprocess.run(['adb', '-s', self.device, 'shell', *probe],
+                                    capture_output=True, text=True, check=False)
+            if result.returncode == 0 and not result.stdout.strip():
+                logger.debug(f"Checkpoint access to {self.data_dir} through {access}")
+                return access
+        raise CheckpointError(
+            f"Cannot access {self.data_dir}: app is not debuggable and device is not rooted"
+        )
+
+    def exists(self, name: str) -> bool:
+        """Check whether a checkpoint exists for the current APK."""
+        return os.path.exists(self._paths(name)[0])
+
+    def list(self) -> List[Dict[str, Any]]:
+        """List checkpoint metadata for the current APK."""
+        build_dir = self._build_dir()
+        if not os.path.isdir(build_dir):
+            return []
+        checkpoints = []
+        for file_name in sorted(os.listdir(build_dir)):
+            if file_name.endswith('.json'):
+                with open(os.path.join(build_dir, file_name), 'r', encoding='utf-8') as f:
+                    checkpoints.append(json.load(f))
+        return checkpoints
+
+    def save(self, name: str, screen: Optional[str] = None) -> str:
+        """Archive the app's data directory under a checkpoint name.
+
+        Args:
+            name: Checkpoint name (e.g., "ingredients selected")
+            screen: Name of the screen the app shows at this checkpoint
+
+        Returns:
+            Path of the local archive
+
+        Raises:
+            CheckpointError: If the archive cannot be created
+        """
+        archive, metadata = self._paths(name)
+        os.makedirs(os.path.dirname(archive), exist_ok=True)
+        excludes = ' '.join(f"--exclude={d}" for d in EXCLUDED_DIRS)
+        command = ['adb', '-s', self.device, 'exec-out',
+                   *self._shell_command(f"tar -czf - -C {self.data_dir} {excludes} .")]
+
+        partial = f"{archive}.part"
+        with open(partial, 'wb') as f:
+            result = subprocess.run(command, stdout=f, stderr=subprocess.PIPE, check=False)
+        if result.returncode != 0 or os.path.getsize(partial) == 0:
+            os.remove(partial)
+            raise CheckpointError(
+                f"Failed to save checkpoint '{name}': {result.stderr.decode(errors='ignore')}"
+            )
+        os.replace(partial, archive)
+
+        with open(metadata, 'w', encoding='utf-8') as f:
+            json.dump({
+                'name': name,
+                'screen': screen,
+                'package': self.package,
+                'apk': APK_NAME,
+                'apk_hash': get_apk_hash(),
+                'size': os.path.getsize(archive),
+                'created': datetime.now().isoformat(timespec='seconds')
+            }, f, indent=2)
+        logger.info(f"Saved checkpoint '{name}' ({os.path.getsize(archive)} bytes)")
+        return archive
+
+    def restore(self, name: str, driver: Optional["WebDriver"] = None) -> Dict[str, Any]:
+        """Replace the app's data with a checkpoint and optionally relaunch the app.
+
+        Args:
+            name: Checkpoint name
+            driver: WebDriver used to relaunch the app after restoring
+
+        Returns:
+            Checkpoint metadata, including the screen it was taken on
+
+        Raises:
+            CheckpointError: If the checkpoint does not exist or cannot be restored
+        """
+        archive, metadata = self._paths(name)
+        if not os.path.exists(archive):
+            raise CheckpointError(f"Checkpoint '{name}' does not exist for this APK")
+        if self._access is None:
+            self._access = self._detect_access()
+
+        subprocess.run(['adb', '-s', self.device, 'shell', 'am', 'force-stop', self.package],
+                       check=True, capture_output=True)
+        subprocess.run(['adb', '-s', self.device, 'shell', 'pm', 'clear', self.package],
+                       check=True, capture_output=True)
+
+        extract = f"tar -xzf - -C {self.data_dir}"
+        if self._access == 'su':
+            extract += (f" && chown -R $(stat -c %u:%g {self.data_dir}) {self.data_dir}"
+                        f" && restorecon -R {self.data_dir}")
+        command = ['adb', '-s', self.device, 'exec-in', *self._shell_command(extract)]
+        with open(archive, 'rb') as f:
+            result = subprocess.run(command, stdin=f, capture_output=True, check=False)
+        if result.returncode != 0:
+            raise CheckpointError(
+                f"Failed to restore checkpoint '{name}': {result.stderr.decode(errors='ignore')}"
+            )
+
+        if driver is not None:
+            driver.activate_app(self.package)
+        logger.info(f"Restored checkpoint '{name}'")
+        with open(metadata, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def prune_stale(self) -> int:
+        """Delete checkpoints taken with other APK builds.
+
+        Returns:
+            Number of removed build directories
+        """
+        if not os.path.isdir(self.root):
+            return 0
+        current = os.path.basename(self._build_dir())
+        removed = 0
+        for entry in os.listdir(self.root):
+            if entry != current and os.path.isdir(os.path.join(self.root, entry)):
+                shutil.rmtree(os.path.join(self.root, entry))
+                removed += 1
+        if removed:
+            logger.debug(f"Removed checkpoints of {removed} outdated APK build(s)")
+        return removed
+
+
+# Global checkpoint store
+checkpoint_store = CheckpointStore()
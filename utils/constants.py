@@ -6,3 +6,7 @@ SPLASH_APP_SLOGAN = "Discover delicious meals everyday"
 
 # Ingredient Selection Screen Text
 INGREDIENT_SELECTION_TITLE = "Select Main Ingredients"
+
+# Dish List Screen Text
+FOUND_RECIPES_MESSAGE_TEMPLATE = "Found {count} matching recipes"
+FOUND_ONE_RECIPE_MESSAGE = "Found 1 matching recipe"
@@ -1,18 +1,146 @@
 """Custom keywords for mobile UI automation."""
 
 from time import time, sleep
-from typing import List, Tuple, Optional
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional, Sequence, Tuple
 
-from appium.webdriver.webdriver import WebDriver
-from appium.webdriver.common.appiumby import AppiumBy
-from selenium.webdriver.remote.webelement import WebElement
 from selenium.common.exceptions import TimeoutException
+from utils.adaptive_locator import AdaptiveLocator
 from utils.logger import logger
+from utils.session_cache import session_cache
+
+if TYPE_CHECKING:
+    from appium.webdriver.webdriver import WebDriver
+    from selenium.webdriver.remote.webelement import WebElement
 
 LocatorType = Tuple[str, str]
+WaitGuard = Callable[["WebDriver"], None]
+WaitListener = Callable[[LocatorType, float, bool], None]
+
+# Checks run on every poll of wait_for_visible; a guard raises to abort the wait
+_wait_guards: List[WaitGuard] = []
+# Callables receiving (locator, duration, found) after every wait_for_visible
+_wait_listeners: List[WaitListener] = []
+
+
+class AppCrashError(Exception):
+    """Raised when the app under test crashed or stopped while waiting for it."""
+
+
+def add_wait_guard(guard: WaitGuard) -> None:
+    """Register a check run on every poll of wait_for_visible.
+    
+    Args:
+        guard: Callable receiving the driver; raises (e.g. AppCrashError) to abort waits
+    """
+    if guard not in _wait_guards:
+        _wait_guards.append(guard)
+
+
+def remove_wait_guard(guard: WaitGuard) -> None:
+    """Unregister a check added with add_wait_guard.
+    
+    Args:
+        guard: Previously registered guard
+    """
+    if guard in _wait_guards:
+        _wait_guards.remove(guard)
+
+
+def add_wait_listener(listener: WaitListener) -> None:
+    """Register a callable notified with (locator, duration, found) after each wait.
+    
+    Args:
+        listener: Callable receiving the locator, the wait duration in seconds
+            and whether the element was found
+    """
+    if listener not in _wait_listeners:
+        _wait_listeners.append(listener)
+
+
+def remove_wait_listener(listener: WaitListener) -> None:
+    """Unregister a callable added with add_wait_listener.
+    
+    Args:
+        listener: Previously registered listener
+    """
+    if listener in _wait_listeners:
+        _wait_listeners.remove(listener)
+
+
+def _notify_wait(locator: LocatorType, duration: float, found: bool) -> None:
+    for listener in list(_wait_listeners):
+        try:
+            listener(locator, duration, found)
+        except Exception as e:
+            logger.warning(f"Wait listener failed on {locator}: {e}")
+
 
+def run_wait_guards(driver: "WebDriver") -> None:
+    """Run the registered wait guards once, for custom polling loops.
+    
+    Args:
+        driver: WebDriver instance passed to each guard
+    """
+    for guard in list(_wait_guards):
+        guard(driver)
+
+
+def find_element(driver: "WebDriver", locator: LocatorType) -> "WebElement":
+    """Find an element, trying the ranked strategies of adaptive locators.
+
+    Raises:
+        NoSuchElementException: If the element is not found
+    """
+    if isinstance(locator, AdaptiveLocator):
+        return locator.find(driver)
+    return driver.find_element(*locator)
 
-def scroll_down(driver: WebDriver) -> None:
+
+def find_elements(driver: "WebDriver", locator: LocatorType) -> List["WebElement"]:
+    """Find all matching elements, trying the ranked strategies of adaptive locators."""
+    if isinstance(locator, AdaptiveLocator):
+        return locator.find_all(driver)
+    return driver.find_elements(*locator)
+
+
+def pointer_taps(points: Sequence[Dict[str, int]], pause_ms: int = 100) -> List[Dict[str, Any]]:
+    """Build a touch action sequence tapping points one after another.
+
+    Args:
+        points: Dicts with the 'x' and 'y' of each tap
+        pause_ms: Pause between taps in milliseconds
+
+    Returns:
+        W3C actions for tap_points or AsyncDriver.perform_actions
+    """
+    steps: List[Dict[str, Any]] = []
+    for point in points:
+        steps += [
+            {'type': 'pointerMove', 'duration': 0, 'x': point['x'], 'y': point['y']},
+            {'type': 'pointerDown', 'button': 0},
+            {'type': 'pause', 'duration': 50},
+            {'type': 'pointerUp', 'button': 0},
+            {'type': 'pause', 'duration': pause_ms}
+        ]
+    return [{'type': 'pointer', 'id': 'finger1', 'parameters': {'pointerType': 'touch'},
+             'actions': steps}]
+
+
+def tap_points(driver: "WebDriver", points: Sequence[Dict[str, int]], pause_ms: int = 100) -> None:
+    """Tap points one after another with a single W3C action request.
+
+    Args:
+        driver: WebDriver instance
+        points: Dicts with the 'x' and 'y' of each tap
+        pause_ms: Pause between taps in milliseconds
+    """
+    if not points:
+        return
+    driver.execute('actions', {'actions': pointer_taps(points, pause_ms)})
+    logger.debug(f"Tapped {len(points)} points in one action sequence")
+
+
+def scroll_down(driver: "WebDriver") -> None:
     """Perform a scroll down action on the screen.
     
     Args:
@@ -42,9 +170,9 @@ def scroll_down(driver: WebDriver) -> None:
         logger.error(f"Error during scroll: {str(e)}")
         raise
 
-def wait_for_visible(driver: WebDriver, locator: LocatorType, 
+def wait_for_visible(driver: "WebDriver", locator: LocatorType, 
                    timeout: int = 10, poll_frequency: float = 0.2,
-                   is_scrollable: bool = True) -> Optional[WebElement]:
+                   is_scrollable: bool = True, cache: bool = False) -> Optional["WebElement"]:
     """Wait for an element to be visible with fluent wait. First tries to find the element without
     scrolling, then scrolls if necessary within the timeout period until the element is found and visible.
     
@@ -54,23 +182,41 @@ def wait_for_visible(driver: WebDriver, locator: LocatorType,
         timeout: Maximum time to wait in seconds
         poll_frequency: How often to poll in seconds
         is_scrollable: Whether to scroll to find element if not visible initially
+        cache: Whether the element is static on its screen, so its handle
+            can be reused until the screen changes (see utils.session_cache)
         
     Returns:
         WebElement if found and visible
         
     Raises:
         TimeoutException: If element is not visible within timeout
+        AppCrashError: If a wait guard detects that the app crashed
     """
     start_time = time()
     end_time = start_time + timeout
     attempts = 0
     max_attempts = 10
 
+    if cache:
+        element = session_cache.get_element(locator)
+        try:
+            if element is not None and element.is_displayed():
+                logger.debug(f"Cached element visible: {locator}")
+                _notify_wait(locator, time() - start_time, True)
+                return element
+        except:
+            pass
+        session_cache.forget_element(locator)
+
     while time() < end_time:
+        run_wait_guards(driver)
         try:
-            element = driver.find_element(*locator)
+            element = find_element(driver, locator)
             if element.is_displayed():
                 logger.debug(f"Element found and visible: {locator}")
+                if cache:
+                    session_cache.put_element(locator, element)
+                _notify_wait(locator, time() - start_time, True)
                 return element
         except:
             pass
@@ -89,10 +235,11 @@ def wait_for_visible(driver: WebDriver, locator: LocatorType,
             attempts += 1
             sleep(poll_frequency)  # Wait after error
 
+    _notify_wait(locator, time() - start_time, False)
     raise TimeoutException(f"Element not found or not visible after {timeout} seconds: {locator}")
 
 
-def get_element(driver: WebDriver, locator: LocatorType) -> WebElement:
+def get_element(driver: "WebDriver", locator: LocatorType) -> "WebElement":
     """Get a single element, raising an exception if not found.
     
     Args:
@@ -105,29 +252,31 @@ def get_element(driver: WebDriver, locator: LocatorType) -> WebElement:
     Raises:
         NoSuchElementException: If element is not found
     """
-    element = driver.find_element(*locator)
+    element = find_element(driver, locator)
     logger.debug(f"Found element: {locator}")
     return element
 
 
-def click_element(driver: WebDriver, locator: LocatorType, timeout: int = 10) -> None:
+def click_element(driver: "WebDriver", locator: LocatorType, timeout: int = 10,
+                  cache: bool = False) -> None:
     """Click on an element after ensuring it's visible.
     
     Args:
         driver: WebDriver instance
         locator: Tuple of (by, value)
         timeout: Maximum time to wait for element in seconds
+        cache: Whether the element handle may be reused (see wait_for_visible)
         
     Raises:
         TimeoutException: If element is not visible within timeout
     """
-    element = wait_for_visible(driver, locator, timeout=timeout)
+    element = wait_for_visible(driver, locator, timeout=timeout, cache=cache)
     element.click()
     logger.debug(f"Clicked element: {locator}")
     return element
 
 
-def get_elements(driver: WebDriver, locator: LocatorType) -> List[WebElement]:
+def get_elements(driver: "WebDriver", locator: LocatorType) -> List["WebElement"]:
     """Get all matching elements, raising an exception if none found.
     
     Args:
@@ -140,7 +289,7 @@ def get_elements(driver: WebDriver, locator: LocatorType) -> List[WebElement]:
     Raises:
         Exception: If no elements are found
     """
-    elements = driver.find_elements(*locator)
+    elements = find_elements(driver, locator)
     if not elements:
         error_msg = f"No elements found with locator: {locator}"
         logger.error(error_msg)
@@ -172,7 +321,7 @@ def get_elements(driver: WebDriver, locator: LocatorType) -> List[WebElement]:
         logger.error(f"Error during scroll: {str(e)}")
         raise
 
-def swipe_seek_bar(driver: WebDriver, locator: LocatorType, start_percent: float = 0.5, 
+def swipe_seek_bar(driver: "WebDriver", locator: LocatorType, start_percent: float = 0.5, 
                   end_percent: float = 0.95, timeout: int = 10) -> None:
     """Swipe a seek bar from one percentage to another.
     
@@ -195,14 +344,13 @@ def swipe_seek_bar(driver: WebDriver, locator: LocatorType, start_percent: float
     # Wait for seek bar to be visible
     seek_bar = wait_for_visible(driver, locator, timeout=timeout)
     
-    # Get the seek bar location and size
-    location = seek_bar.location
-    size = seek_bar.size
+    # Get the seek bar location and size in one request
+    rect = seek_bar.rect
     
     # Calculate start and end points for the swipe
-    start_x = location['x'] + (size['width'] * start_percent)
-    end_x = location['x'] + (size['width'] * end_percent)
-    y = location['y'] + (size['height'] / 2)  # Keep Y at the middle
+    start_x = rect['x'] + (rect['width'] * start_percent)
+    end_x = rect['x'] + (rect['width'] * end_percent)
+    y = rect['y'] + (rect['height'] / 2)  # Keep Y at the middle
     
     # Perform the swipe action
     driver.swipe(
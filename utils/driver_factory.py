@@ -40,6 +40,24 @@ def get_driver_options(apk_path: str) -> UiAutomator2Options:
     return options
 
 
+def get_recovery_options(apk_path: str) -> UiAutomator2Options:
+    """Get options for replacing a dead session without touching the app.
+    
+    The app keeps its data and is neither reinstalled nor relaunched, so it
+    stays on the screen it was showing when the session died.
+    
+    Args:
+        apk_path: Full path to the APK file
+        
+    Returns:
+        UiAutomator2Options instance for a recovery session
+    """
+    options = get_driver_options(apk_path)
+    options.no_reset = True
+    options.auto_launch = False
+    return options
+
+
 def verify_device_connection() -> None:
     """Verify ADB device connection.
     
@@ -86,6 +104,21 @@ def manage_app_installation(reinstall_app: bool) -> None:
             logger.warning(f"Failed to clear data for {PACKAGE_NAME}: {e}")
 
 
+def reset_app(driver: WebDriver) -> None:
+    """Restart the app with cleared data on an existing session.
+    
+    Much cheaper than creating a new driver, so flows can be repeated on a
+    warm session.
+    
+    Args:
+        driver: WebDriver instance whose app should be reset
+    """
+    logger.debug(f"Resetting app on warm session: {PACKAGE_NAME}")
+    driver.terminate_app(PACKAGE_NAME)
+    manage_app_installation(reinstall_app=False)
+    driver.activate_app(PACKAGE_NAME)
+
+
 def create_driver(reinstall_app: bool = False) -> WebDriver:
     """Create and configure an Appium WebDriver instance.
     
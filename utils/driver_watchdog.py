@@ -0,0 +1,203 @@
+"""Driver health watchdog: detect dead Appium/UiAutomator2 sessions and recover them."""
+
+import threading
+from time import monotonic, perf_counter
+from typing import TYPE_CHECKING, Any, Dict, Optional
+
+import requests
+
+from utils.logger import logger
+from utils.step_tracker import step_tracker
+from test_settings import (
+    APPIUM_HOST,
+    APPIUM_PORT,
+    WATCHDOG_INTERVAL,
+    WATCHDOG_MAX_RECOVERIES,
+    WATCHDOG_PROBE_TIMEOUT
+)
+
+if TYPE_CHECKING:
+    from appium.webdriver.webdriver import WebDriver
+
+# Error fragments meaning the session or the UiAutomator2 server is gone,
+# as opposed to an ordinary failed command
+DEAD_SESSION_MARKERS = (
+    'invalid session id',
+    'session is either terminated or not started',
+    'instrumentation process is not running',
+    'uiautomator2 server',
+    'cannot be proxied',
+    'socket hang up',
+    'econnrefused',
+    'econnreset',
+    'connection refused'
+)
+
+
+def is_dead_session_error(error: BaseException) -> bool:
+    """Check whether an error means the session must be rebuilt."""
+    if isinstance(error, (requests.ConnectionError, ConnectionError)):
+        return True
+    message = str(error).lower()
+    return any(marker in message for marker in DEAD_SESSION_MARKERS)
+
+
+class DriverWatchdog:
+    """Probe session liveness in the background and rebuild dead sessions in place.
+
+    A daemon thread probes the session with a cheap command proxied to the
+    UiAutomator2 server (device orientation) whenever the test has been idle
+    for an interval, so a dead instrumentation or an expired session
+    (`new_command_timeout`) is noticed between commands. The driver's
+    `execute` is wrapped: a command issued on a dead session, or failing with
+    a dead-session error, first starts a new session on the same WebDriver
+    object (so screen objects keep working), restores the screen the test was
+    on and is then retried once.
+    """
+
+    def __init__(self, driver: "WebDriver", capabilities: Dict[str, Any],
+                 interval: float = WATCHDOG_INTERVAL,
+                 probe_timeout: float = WATCHDOG_PROBE_TIMEOUT,
+                 max_recoveries: int = WATCHDOG_MAX_RECOVERIES):
+        """Initialize DriverWatchdog.
+
+        Args:
+            driver: WebDriver instance to watch
+            capabilities: Capabilities for new sessions; they should keep the
+                app data and the running app (see get_recovery_options)
+            interval: Idle seconds between liveness probes
+            probe_timeout: Timeout of a single probe request
+            max_recoveries: Recoveries allowed before errors are raised as is
+        """
+        self.driver = driver
+        self.capabilities = capabilities
+        self.interval = interval
+        self.probe_timeout = probe_timeout
+        self.max_recoveries = max_recoveries
+        self.recoveries = 0
+        self.recovery_time = 0.0
+        self.probe_failures = 0
+        self._dead = threading.Event()
+        self._stop = threading.Event()
+        self._lock = threading.RLock()
+        self._recovering = False
+        self._last_command = monotonic()
+        self._thread: Optional[threading.Thread] = None
+        self._execute = driver.execute
+
+    def start(self) -> None:
+        """Wrap the driver's commands and start probing in the background."""
+        if self._thread is not None:
+            return
+        self.driver.execute = self._guarded_execute
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="driver-watchdog", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop probing and restore the driver's original commands."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.probe_timeout + 1)
+            self._thread = None
+        self.driver.execute = self._execute
+
+    def _session_url(self) -> str:
+        return f"http://{APPIUM_HOST}:{APPIUM_PORT}/session/{self.driver.session_id}"
+
+    def probe(self) -> bool:
+        """Check session liveness with one lightweight request.
+
+        Returns:
+            True if the session answered, False if it is dead
+        """
+        try:
+            response = requests.get(f"{self._session_url()}/orientation",
+                                    timeout=self.probe_timeout)
+            if response.ok:
+                return True
+            alive = not is_dead_session_error(Exception(response.text))
+        except requests.Timeout:
+            # A busy server is slow, not dead
+            return True
+        except requests.RequestException as e:
+            alive = not is_dead_session_error(e)
+        if not alive:
+            self.probe_failures += 1
+        return alive
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            if self._dead.is_set() or self._recovering:
+                continue
+            if monotonic() - self._last_command < self.interval:
+                continue
+            if not self.probe():
+                logger.warning(f"Driver session {self.driver.session_id} is dead, "
+                               "recovering on the next command")
+                self._dead.set()
+
+    def _guarded_execute(self, driver_command: str, params: Optional[Dict] = None) -> Dict:
+        if self._recovering:
+            return self._execute(driver_command, params)
+        self._last_command = monotonic()
+        # Past the limit the command runs on the dead session and its error is raised below
+        if self._dead.is_set() and self.recoveries < self.max_recoveries:
+            self.recover()
+        try:
+            return self._execute(driver_command, params)
+        except Exception as e:
+            if driver_command == 'quit' or not is_dead_session_error(e):
+                raise
+            if self.recoveries >= self.max_recoveries:
+                logger.error(f"Driver session lost after {self.recoveries} recoveries")
+                raise
+            logger.warning(f"Command '{driver_command}' hit a dead session: {e}")
+            self.recover()
+            return self._execute(driver_command, params)
+
+    def recover(self) -> None:
+        """Start a new session on the same driver and return to the current screen."""
+        with self._lock:
+            if self._recovering:
+                return
+            self._recovering = True
+            start = perf_counter()
+            screen_name = step_tracker.current_screen
+            try:
+                old_session = self.driver.session_id
+                try:
+                    self._execute('quit', None)
+                except Exception as e:
+                    logger.debug(f"Old session {old_session} not closed: {e}")
+                self.driver.start_session(self.capabilities)
+                logger.info(f"Replaced dead session {old_session} with {self.driver.session_id}")
+                self._restore_screen(screen_name)
+            finally:
+                self._recovering = False
+                self._dead.clear()
+                self._last_command = monotonic()
+                self.recoveries += 1
+                self.recovery_time += perf_counter() - start
+
+    def _restore_screen(self, screen_name: Optional[str]) -> None:
+        """Bring the app back to the screen the test was on, if known."""
+        from flows.navigator import SCREENS, Navigator
+
+        navigator = Navigator(self.driver)
+        shown = navigator.resync()
+        if screen_name in SCREENS and shown != screen_name:
+            try:
+                navigator.go_to(SCREENS[screen_name])
+            except Exception as e:
+                logger.warning(f"Could not return to {screen_name} after recovery: {e}")
+                return
+        logger.info(f"Restored app to {screen_name or shown} after session recovery")
+
+    def summary(self) -> Dict[str, Any]:
+        """Get recovery statistics of this driver."""
+        return {
+            'recoveries': self.recoveries,
+            'recovery_time': round(self.recovery_time, 3),
+            'probe_failures': self.probe_failures
+        }
@@ -0,0 +1,145 @@
+"""Snapshots of the UI hierarchy, parsed from one page source request."""
+
+import re
+import xml.etree.ElementTree as ElementTree
+from typing import TYPE_CHECKING, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+if TYPE_CHECKING:
+    from appium.webdriver.webdriver import WebDriver
+
+_BOUNDS_PATTERN = re.compile(r'\[(-?\d+),(-?\d+)\]\[(-?\d+),(-?\d+)\]')
+# Text comparisons of locator catalog conditions
+_CHECKS: Dict[str, Callable[[str, str], bool]] = {
+    'equals': lambda value, text: value == text,
+    'contains': lambda value, text: text in value,
+    'starts-with': lambda value, text: value.startswith(text),
+}
+
+
+class UiNode:
+    """One element of a hierarchy snapshot."""
+
+    def __init__(self, attributes: Dict[str, str], order: int):
+        """Initialize UiNode.
+
+        Args:
+            attributes: XML attributes of the element in the page source
+            order: Position in document order
+        """
+        self.attributes = attributes
+        self.order = order
+        self.class_name = attributes.get('class', '')
+        self.description = attributes.get('content-desc', '')
+        self.text = attributes.get('text', '')
+        match = _BOUNDS_PATTERN.match(attributes.get('bounds', ''))
+        self.bounds: Optional[Tuple[int, int, int, int]] = \
+            tuple(int(value) for value in match.groups()) if match else None
+
+    @property
+    def selected(self) -> bool:
+        """Whether the element reports a selected or checked state."""
+        return self.attributes.get('selected') == 'true' or self.attributes.get('checked') == 'true'
+
+    @property
+    def selectable(self) -> bool:
+        """Whether the element exposes selection semantics (checkable or already selected)."""
+        return self.attributes.get('checkable') == 'true' or self.selected
+
+    @property
+    def state(self) -> Tuple[str, str, str]:
+        """Values that change when the element is toggled."""
+        return (self.attributes.get('selected', ''), self.attributes.get('checked', ''),
+                self.description)
+
+    @property
+    def center(self) -> Optional[Dict[str, int]]:
+        """Center point of the element, or None without bounds."""
+        if self.bounds is None:
+            return None
+        left, top, right, bottom = self.bounds
+        return {'x': (left + right) // 2, 'y': (top + bottom) // 2}
+
+    def matches(self, class_name: str, clauses: List[List[Tuple[str, str, str]]]) -> bool:
+        """Check the element against a locator catalog snapshot query.
+
+        Args:
+            class_name: Class the element must have, '*' for any
+            clauses: Lists of (attribute, kind, text) conditions; every list
+                needs one condition that holds
+
+        Returns:
+            True if the element matches
+        """
+        if class_name not in ('*', self.class_name):
+            return False
+        return all(any(_CHECKS[kind](self.attributes.get(attribute, ''), text)
+                       for attribute, kind, text in clause)
+                   for clause in clauses)
+
+    def is_within(self, width: int, height: int) -> bool:
+        """Check whether the element's center is inside a viewport of the given size."""
+        center = self.center
+        return center is not None and 0 <= center['x'] < width and 0 <= center['y'] < height
+
+
+class HierarchySnapshot:
+    """Elements of one page source, searchable without further round trips."""
+
+    def __init__(self, page_source: str):
+        """Initialize HierarchySnapshot.
+
+        Args:
+            page_source: XML page source of the UiAutomator2 driver
+        """
+        self.source = page_source
+        root = ElementTree.fromstring(page_source.encode('utf-8'))
+        self.nodes = [UiNode(dict(element.attrib), order)
+                      for order, element in enumerate(root.iter())]
+
+    @classmethod
+    def take(cls, driver: "WebDriver") -> 'HierarchySnapshot':
+        """Get a snapshot of the current screen with one request."""
+        return cls(driver.page_source)
+
+    def find_all(self, contains: str, class_name: Optional[str] = None,
+                 attributes: Sequence[str] = ('content-desc',)) -> Iterator[UiNode]:
+        """Find elements whose attributes contain a text, in document order.
+
+        Args:
+            contains: Text to look for
+            class_name: Class the element must have, if given
+            attributes: Attributes searched for the text
+
+        Yields:
+            Matching elements
+        """
+        for node in self.nodes:
+            if class_name and node.class_name != class_name:
+                continue
+            if any(contains in node.attributes.get(attribute, '') for attribute in attributes):
+                yield node
+
+    def find(self, contains: str, class_name: Optional[str] = None,
+             attributes: Sequence[str] = ('content-desc',)) -> Optional[UiNode]:
+        """Find the first element whose attributes contain a text (see find_all)."""
+        return next(self.find_all(contains, class_name, attributes), None)
+
+    def find_matching(self, class_name: str,
+                      clauses: List[List[Tuple[str, str, str]]]) -> Iterator[UiNode]:
+        """Find elements matching a locator catalog snapshot query, in document order.
+
+        Args:
+            class_name: Class the elements must have, '*' for any
+            clauses: Conditions as returned by LocatorCatalog.snapshot_query
+
+        Yields:
+            Matching elements
+        """
+        return (node for node in self.nodes if node.matches(class_name, clauses))
+
+    def same_screen_as(self, other: Optional['HierarchySnapshot']) -> bool:
+        """Check whether another snapshot shows the same elements at the same places."""
+        if other is None or len(self.nodes) != len(other.nodes):
+            return False
+        return all(mine.attributes == theirs.attributes
+                   for mine, theirs in zip(self.nodes, other.nodes))
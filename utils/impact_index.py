@@ -0,0 +1,613 @@
+"""Test impact analysis: map tests to the screen members, keywords and modules they use."""
+
+import ast
+import json
+import os
+import re
+import subprocess
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from utils.logger import logger
+from utils.screen_index import (
+    PROJECT_ROOT,
+    TESTS_DIR,
+    ScreenIndex,
+    ScreenTypeTracker,
+    build_screen_index,
+    file_hash
+)
+from test_settings import APP_VERSION, CACHE_DIR, LOCATOR_CATALOG
+
+# Top-level packages and modules belonging to the project
+PROJECT_PACKAGES = ('screens', 'flows', 'utils', 'config', 'test_settings')
+# Files whose changes may affect any test
+GLOBAL_FILES = ('conftest.py', 'test_settings.py', 'pytest.ini', 'requirements.txt',
+                'pytest_hooks.py', 'pyproject.toml', 'setup.cfg', 'tox.ini')
+# Data files, read by the modules importing the setting that names them
+DATA_DIR = 'config/'
+SETTINGS_FILE = 'test_settings.py'
+# Changed files that never affect test behavior
+IGNORED_PATTERN = re.compile(r'(\.md$|^docs/|^\.gitignore$|^README)')
+
+_HUNK_PATTERN = re.compile(r'^@@ -\d+(?:,\d+)? \+(\d+)(?:,(\d+))? @@')
+
+
+def _module_file(module: str) -> Optional[str]:
+    """Get the project-relative file of a dotted project module, if it exists."""
+    if module.split('.')[0] not in PROJECT_PACKAGES:
+        return None
+    base = module.replace('.', '/')
+    for candidate in (f"{base}.py", f"{base}/__init__.py"):
+        if os.path.exists(os.path.join(PROJECT_ROOT, candidate)):
+            return candidate
+    return None
+
+
+def _loaded_names(node: ast.AST) -> List[str]:
+    """Get the names a node loads, including `self.X` as 'self.X'."""
+    names = set()
+    for child in ast.walk(node):
+        if isinstance(child, ast.Name) and isinstance(child.ctx, ast.Load):
+            names.add(child.id)
+        elif isinstance(child, ast.Attribute) and isinstance(child.value, ast.Name) \
+                and child.value.id == 'self':
+            names.add(f"self.{child.attr}")
+    return sorted(names)
+
+
+def catalog_keys(node: ast.AST) -> List[Tuple[str, int]]:
+    """Find locator catalog lookups like `locator_catalog.get('Screen', 'NAME', ...)`.
+
+    Args:
+        node: Node to search
+
+    Returns:
+        ('Screen.NAME', line) of every lookup with literal screen and name
+    """
+    keys = []
+    for child in ast.walk(node):
+        if isinstance(child, ast.Call) and isinstance(child.func, ast.Attribute) \
+                and child.func.attr in ('get', 'entry', 'snapshot_query') \
+                and isinstance(child.func.value, ast.Name) \
+                and child.func.value.id == 'locator_catalog' and len(child.args) >= 2 \
+                and all(isinstance(arg, ast.Constant) for arg in child.args[:2]):
+            keys.append((f"{child.args[0].value}.{child.args[1].value}", child.lineno))
+    return keys
+
+
+def module_symbols(content: str) -> Dict[str, Any]:
+    """Index the structure of a module.
+
+    Args:
+        content: Source code of the module
+
+    Returns:
+        'members': name -> [first line, last line] of top-level functions,
+        classes and assignments, with class members as 'Class.member';
+        'names': member -> names it loads; 'catalog': member -> locator
+        catalog entries it looks up ('Screen.NAME'); 'imports': local name ->
+        [file, imported name or None] for project imports anywhere in the
+        module; 'modules': files of all project imports
+    """
+    tree = ast.parse(content)
+    members: Dict[str, List[int]] = {}
+    names: Dict[str, List[str]] = {}
+    imports: Dict[str, List[Optional[str]]] = {}
+    modules: Set[str] = set()
+
+    def add(name: str, node: ast.AST, body: ast.AST) -> None:
+        members[name] = [node.lineno, node.end_lineno]
+        names[name] = _loaded_names(body)
+
+    for node in tree.body:
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            add(node.name, node, node)
+        elif isinstance(node, ast.ClassDef):
+            members[node.name] = [node.lineno, node.end_lineno]
+            names[node.name] = []
+            for item in node.body:
+                if isinstance(item, (ast.FunctionDef, ast.AsyncFunctionDef)):
+                    add(f"{node.name}.{item.name}", item, item)
+                elif isinstance(item, ast.Assign):
+                    for target in item.targets:
+                        if isinstance(target, ast.Name):
+                            add(f"{node.name}.{target.id}", item, item.value)
+        elif isinstance(node, (ast.Assign, ast.AnnAssign)) and node.value is not None:
+            targets = node.targets if isinstance(node, ast.Assign) else [node.target]
+            for target in targets:
+                if isinstance(target, ast.Name):
+                    add(target.id, node, node.value)
+
+    for node in ast.walk(tree):
+        if isinstance(node, ast.ImportFrom) and node.module and node.level == 0:
+            file = _module_file(node.module)
+            if file:
+                modules.add(file)
+                for alias in node.names:
+                    imports[alias.asname or alias.name] = [file, alias.name]
+        elif isinstance(node, ast.Import):
+            for alias in node.names:
+                file = _module_file(alias.name)
+                if file:
+                    modules.add(file)
+                    imports[alias.asname or alias.name.split('.')[0]] = [file, None]
+
+    catalog: Dict[str, List[str]] = {}
+    for key, line in catalog_keys(tree):
+        inside = [name for name, (first, last) in members.items() if first <= line <= last]
+        if inside:
+            catalog.setdefault(max(inside, key=len), []).append(key)
+    return {'members': members, 'names': names, 'catalog': catalog, 'imports': imports,
+            'modules': sorted(modules)}
+
+
+def _fixture_modules(conftest: str) -> Dict[str, Dict[str, List[str]]]:
+    """Get the project modules each conftest fixture imports and the fixtures it requests."""
+    fixtures = {}
+    tree = ast.parse(conftest)
+    for node in tree.body:
+        if not isinstance(node, ast.FunctionDef):
+            continue
+        if not any('fixture' in ast.dump(decorator) for decorator in node.decorator_list):
+            continue
+        modules = set()
+        for child in ast.walk(node):
+            if isinstance(child, ast.ImportFrom) and child.module:
+                file = _module_file(child.module)
+                if file:
+                    modules.add(file)
+        fixtures[node.name] = {
+            'modules': sorted(modules),
+            'fixtures': [arg.arg for arg in node.args.args]
+        }
+    return fixtures
+
+
+class ImpactIndex:
+    """Persistent index from each test to the code it depends on.
+
+    Dependencies are keys like "screens/dish_list_screen.py::DishListScreen.
+    click_see_recipe_button" for screen members, keywords and module-level
+    names, or a bare file for modules used as a whole (flows, fixtures'
+    lazy imports). Screen methods are followed transitively, so a test
+    depends on every locator its screen calls touch. The index is cached in
+    CACHE_DIR and rebuilt when any project file changes.
+    """
+
+    def __init__(self, cache_file: Optional[str] = None):
+        """Initialize ImpactIndex.
+
+        Args:
+            cache_file: Index file, defaults to CACHE_DIR/impact_index.json
+        """
+        self.cache_file = cache_file or os.path.join(PROJECT_ROOT, CACHE_DIR, 'impact_index.json')
+        self.tests: Dict[str, List[str]] = {}
+        self.test_lines: Dict[str, List[int]] = {}
+        self.modules: Dict[str, Dict[str, Any]] = {}
+
+    def _project_files(self) -> List[str]:
+        files = []
+        for directory in ('screens', 'flows', 'utils', 'config', 'tests'):
+            root = os.path.join(PROJECT_ROOT, directory)
+            if os.path.isdir(root):
+                files += [f"{directory}/{name}" for name in sorted(os.listdir(root))
+                          if name.endswith('.py')]
+        return files + ['conftest.py', 'test_settings.py']
+
+    def load(self) -> 'ImpactIndex':
+        """Load the cached index, rebuilding it if any project file changed.
+
+        Returns:
+            The index itself
+        """
+        hashes = {}
+        for file in self._project_files():
+            path = os.path.join(PROJECT_ROOT, file)
+            if os.path.exists(path):
+                with open(path, 'r', encoding='utf-8') as f:
+                    hashes[file] = file_hash(f.read())
+        try:
+            with open(self.cache_file, 'r', encoding='utf-8') as f:
+                cache = json.load(f)
+            if cache.get('files') == hashes:
+                self.tests, self.test_lines, self.modules = \
+                    cache['tests'], cache['test_lines'], cache['modules']
+                return self
+        except (OSError, ValueError, KeyError):
+            pass
+
+        self.build()
+        try:
+            os.makedirs(os.path.dirname(self.cache_file), exist_ok=True)
+            with open(self.cache_file, 'w', encoding='utf-8') as f:
+                json.dump({'files': hashes, 'tests': self.tests, 'test_lines': self.test_lines,
+                           'modules': self.modules}, f)
+        except OSError as e:
+            logger.warning(f"Failed to write impact index: {e}")
+        return self
+
+    def build(self) -> None:
+        """Parse screens, modules and tests and compute every test's dependencies."""
+        index = build_screen_index()
+        self.modules = {}
+        for file in self._project_files():
+            path = os.path.join(PROJECT_ROOT, file)
+            if os.path.exists(path) and not file.startswith('tests/'):
+                with open(path, 'r', encoding='utf-8') as f:
+                    content = f.read()
+                self.modules[file] = module_symbols(content)
+                if not file.startswith('screens/'):
+                    self.modules[file]['calls'] = self._screen_calls(content, index)
+
+        with open(os.path.join(PROJECT_ROOT, 'conftest.py'), 'r', encoding='utf-8') as f:
+            fixtures = _fixture_modules(f.read())
+
+        self.tests, self.test_lines = {}, {}
+        for file_name in sorted(os.listdir(TESTS_DIR)):
+            if not (file_name.startswith('test_') and file_name.endswith('.py')):
+                continue
+            with open(os.path.join(TESTS_DIR, file_name), 'r', encoding='utf-8') as f:
+                content = f.read()
+            self._index_test_file(f"tests/{file_name}", content, index, fixtures)
+
+    @staticmethod
+    def _screen_calls(content: str, index: ScreenIndex) -> Dict[str, List[List[str]]]:
+        """Find the screen methods each top-level function of a module calls."""
+        calls = {}
+        for node in ast.parse(content).body:
+            if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+                tracker = ScreenTypeTracker(index)
+                tracker.visit(node)
+                calls[node.name] = [[call['screen'], call['method']]
+                                    for call in tracker.screen_calls]
+        return calls
+
+    def _index_test_file(self, file: str, content: str, index: ScreenIndex,
+                         fixtures: Dict[str, Dict[str, List[str]]]) -> None:
+        tree = ast.parse(content)
+        symbols = module_symbols(content)
+        functions = []
+        for node in tree.body:
+            if isinstance(node, ast.FunctionDef) and node.name.startswith('test'):
+                functions.append((node.name, node))
+            elif isinstance(node, ast.ClassDef) and node.name.startswith('Test'):
+                functions += [(f"{node.name}::{item.name}", item) for item in node.body
+                              if isinstance(item, ast.FunctionDef) and item.name.startswith('test')]
+
+        for name, node in functions:
+            tracker = ScreenTypeTracker(index)
+            tracker.visit(node)
+            deps: Set[str] = set()
+            for call in tracker.screen_calls:
+                deps.add(self._screen_member(index, call['screen'], call['method']))
+            for child in ast.walk(node):
+                if isinstance(child, ast.Call) and isinstance(child.func, ast.Name) \
+                        and child.func.id in index:
+                    deps.add(self._screen_member(index, child.func.id, '__init__'))
+                elif isinstance(child, ast.Name) and child.id in symbols['imports']:
+                    deps.add(self._imported(symbols['imports'][child.id], index))
+            deps.update(f"{LOCATOR_CATALOG}::{key}" for key, _ in catalog_keys(node))
+
+            requested = [arg.arg for arg in node.args.args]
+            while requested:
+                fixture = requested.pop()
+                if fixture in fixtures:
+                    deps.update(fixtures[fixture]['modules'])
+                    requested += fixtures[fixture]['fixtures']
+
+            nodeid = f"{file}::{name}"
+            self.tests[nodeid] = sorted(self._closure(deps, index))
+            self.test_lines[nodeid] = [node.lineno, node.end_lineno]
+
+    @staticmethod
+    def _screen_member(index: ScreenIndex, screen: str, member: str) -> str:
+        file = index[screen]['module'].replace('.', '/') + '.py'
+        return f"{file}::{screen}.{member}"
+
+    def _imported(self, imported: List[Optional[str]], index: ScreenIndex) -> str:
+        file, name = imported
+        if name and name in index:
+            return self._screen_member(index, name, '__init__')
+        if name and file in self.modules and name in self.modules[file]['members']:
+            return f"{file}::{name}"
+        return file
+
+    def _closure(self, deps: Set[str], index: ScreenIndex) -> Set[str]:
+        """Follow members to the members and modules they use."""
+        result: Set[str] = set()
+        pending = list(deps)
+        while pending:
+            dep = pending.pop()
+            if dep in result:
+                continue
+            result.add(dep)
+            file, _, member = dep.partition('::')
+            if not member:
+                pending += self._module_imports(file)
+                continue
+            pending += self._member_dependencies(file, member, index)
+        return result
+
+    def _member_dependencies(self, file: str, member: str, index: ScreenIndex) -> List[str]:
+        """Resolve what one member uses to dependency keys."""
+        symbols = self.modules.get(file)
+        if symbols is None:
+            return []
+        owner = member.split('.')[0]
+        used = list(symbols['names'].get(member, []))
+        if member in symbols['members'] and member != owner:
+            used.append(owner)  # Class-level code (decorators, base classes)
+
+        deps = []
+        for name in used:
+            if name.startswith('self.'):
+                candidate = f"{owner}.{name[5:]}"
+                if candidate in symbols['members']:
+                    deps.append(f"{file}::{candidate}")
+            elif name in symbols['imports']:
+                deps.append(self._imported(symbols['imports'][name], index))
+            elif name in symbols['members'] and name != member:
+                deps.append(f"{file}::{name}")
+
+        deps += [f"{LOCATOR_CATALOG}::{key}" for key in symbols['catalog'].get(member, [])]
+        for screen, method in symbols.get('calls', {}).get(member, []):
+            deps.append(self._screen_member(index, screen, method))
+
+        # Class attributes of other screens (e.g. DishDetailScreen.SAVE_RECIPE_BUTTON)
+        screen, _, name = member.partition('.')
+        info = index.get(screen, {}).get('methods', {}).get(name) \
+            or index.get(screen, {}).get('attributes', {}).get(name)
+        if info:
+            for used_screen, used_member in info['uses']['members']:
+                if used_screen in index and (used_member in index[used_screen]['methods']
+                                             or used_member in index[used_screen]['attributes']):
+                    deps.append(self._screen_member(index, used_screen, used_member))
+
+        if file.startswith('utils/'):
+            deps = [dep for dep in deps if not dep.startswith(('screens/', 'flows/'))]
+        return deps
+
+    def _module_imports(self, file: str) -> List[str]:
+        """Get the modules a module depends on as a whole.
+
+        Framework modules under utils/ reach into screens and flows only for
+        failure handling (session recovery, soak flows), so those imports are
+        not followed, here or from utils members; otherwise every test would
+        depend on every screen.
+        """
+        modules = self.modules.get(file, {}).get('modules', [])
+        if file.startswith('utils/'):
+            return [module for module in modules
+                    if not module.startswith(('screens/', 'flows/'))]
+        return list(modules)
+
+    def impacted(self, changes: Dict[str, Optional[Set[str]]],
+                 tests: Optional[Iterable[str]] = None) -> Tuple[Set[str], Dict[str, str]]:
+        """Select the tests affected by a set of changes.
+
+        Args:
+            changes: Changed file -> changed member names ('Class.member',
+                'Class' or module-level names), or None if the whole file changed
+            tests: Node ids to consider, defaults to all indexed tests
+
+        Returns:
+            Impacted node ids and, for each, the first change that selected it
+        """
+        tests = list(tests if tests is not None else self.tests)
+        reasons: Dict[str, str] = {}
+        global_change = next((file for file in changes if file in GLOBAL_FILES
+                              or (file.startswith(DATA_DIR) and file != LOCATOR_CATALOG
+                                  and not file.endswith('.py'))), None)
+
+        for nodeid in tests:
+            base = nodeid.split('[')[0]
+            if global_change:
+                reasons[nodeid] = global_change
+                continue
+            if base not in self.tests:
+                reasons[nodeid] = "not in impact index"
+                continue
+            file = base.split('::')[0]
+            if file in changes:
+                changed = changes[file]
+                lines = self.test_lines[base]
+                if changed is None or any(self._in_lines(change, lines)
+                                          for change in changed):
+                    reasons[nodeid] = file
+                    continue
+            for dep in self.tests[base]:
+                reason = self._dependency_changed(dep, changes)
+                if reason:
+                    reasons[nodeid] = reason
+                    break
+        return set(reasons), reasons
+
+    @staticmethod
+    def _in_lines(change: str, lines: List[int]) -> bool:
+        """Check whether a changed test-file line (encoded as 'line:N') is in a test."""
+        if change.startswith('line:'):
+            return lines[0] <= int(change[5:]) <= lines[1]
+        return False
+
+    @staticmethod
+    def _dependency_changed(dep: str, changes: Dict[str, Optional[Set[str]]]) -> Optional[str]:
+        file, _, member = dep.partition('::')
+        if file not in changes:
+            return None
+        changed = changes[file]
+        if changed is None or not member:
+            return file
+        owner = member.split('.')[0]
+        if member in changed or owner in changed:
+            return dep
+        return None
+
+    def changed_members(self, file: str, lines: Set[int]) -> Optional[Set[str]]:
+        """Map changed lines of a non-test project file to its changed members.
+
+        Args:
+            file: Project-relative file
+            lines: Changed line numbers in the new version of the file
+
+        Returns:
+            Changed member names, or None if a change lies outside every
+            member (imports, module code) so the whole file counts as changed
+        """
+        symbols = self.modules.get(file)
+        if symbols is None:
+            return None
+        changed = set()
+        for line in lines:
+            inside = [name for name, (first, last) in symbols['members'].items()
+                      if first <= line <= last]
+            if not inside:
+                return None
+            # Prefer the innermost member ('Class.method' over 'Class')
+            changed.add(max(inside, key=len))
+        return changed
+
+
+def git_changes(base: str = 'HEAD') -> Dict[str, Set[int]]:
+    """Get changed line numbers per file between a git ref and the working tree.
+
+    Untracked files count as fully changed (line 0). Deleted lines are
+    attributed to the line after the deletion.
+
+    Args:
+        base: Git ref to compare with (e.g., "HEAD", "origin/main")
+
+    Returns:
+        Project-relative file -> changed line numbers in the working tree
+    """
+    diff = subprocess.run(['git', 'diff', '--unified=0', '--no-color', base, '--'],
+                          cwd=PROJECT_ROOT, capture_output=True, text=True, check=True).stdout
+    changes: Dict[str, Set[int]] = {}
+    current = None
+    for line in diff.splitlines():
+        if line.startswith('+++ '):
+            path = line[4:]
+            current = path[2:] if path.startswith('b/') else None
+            if current:
+                changes.setdefault(current, set())
+        elif line.startswith('--- ') and line[4:].startswith('a/'):
+            # Deleted files only have a '--- a/...' side
+            changes.setdefault(line[6:], set())
+        else:
+            match = _HUNK_PATTERN.match(line)
+            if match and current:
+                start, count = int(match.group(1)), int(match.group(2) or 1)
+                changes[current].update(range(start, start + max(count, 1)))
+
+    untracked = subprocess.run(['git', 'ls-files', '--others', '--exclude-standard'],
+                               cwd=PROJECT_ROOT, capture_output=True, text=True,
+                               check=True).stdout
+    for file in untracked.splitlines():
+        changes[file] = {0}
+    return changes
+
+
+def changed_catalog_entries(base: str = 'HEAD') -> Optional[Set[str]]:
+    """Compare the locators the app under test gets from the catalog at a git ref and now.
+
+    Overrides for other app versions are ignored, since they change no locator.
+
+    Args:
+        base: Git ref to compare with
+
+    Returns:
+        Changed 'Screen.NAME' entries, or None if the catalog is new or unreadable
+    """
+    from utils.locator_catalog import effective_specs
+
+    try:
+        old = json.loads(subprocess.run(['git', 'show', f"{base}:{LOCATOR_CATALOG}"],
+                                        cwd=PROJECT_ROOT, capture_output=True, text=True,
+                                        check=True).stdout)
+        with open(os.path.join(PROJECT_ROOT, LOCATOR_CATALOG), 'r', encoding='utf-8') as f:
+            new = json.load(f)
+    except (OSError, ValueError, subprocess.CalledProcessError):
+        return None
+    old_specs, new_specs = effective_specs(old, APP_VERSION), effective_specs(new, APP_VERSION)
+    return {key for key in set(old_specs) | set(new_specs)
+            if old_specs.get(key) != new_specs.get(key)}
+
+
+def settings_naming(file: str) -> Set[str]:
+    """Get the settings whose value is a project file path (e.g. RECIPE_INDEX).
+
+    Args:
+        file: Project-relative file
+
+    Returns:
+        Names of the test_settings constants set to the file
+    """
+    with open(os.path.join(PROJECT_ROOT, SETTINGS_FILE), 'r', encoding='utf-8') as f:
+        tree = ast.parse(f.read())
+    return {target.id for node in tree.body if isinstance(node, ast.Assign)
+            and isinstance(node.value, ast.Constant) and node.value.value == file
+            for target in node.targets if isinstance(target, ast.Name)}
+
+
+def data_file_readers(index: 'ImpactIndex', file: str) -> Set[str]:
+    """Get the indexed modules reading a data file through its setting.
+
+    Args:
+        index: Loaded impact index
+        file: Project-relative data file
+
+    Returns:
+        Files of the modules importing a setting that names the data file
+    """
+    names = settings_naming(file)
+    return {module for module, symbols in index.modules.items()
+            if any(imported == [SETTINGS_FILE, name]
+                   for imported in symbols['imports'].values() for name in names)}
+
+
+def select_impacted_tests(base: str, tests: Iterable[str]) -> Tuple[Set[str], Dict[str, str]]:
+    """Select the tests affected by the changes since a git ref.
+
+    Args:
+        base: Git ref to compare with
+        tests: Collected node ids
+
+    Returns:
+        Impacted node ids and the change that selected each
+    """
+    index = ImpactIndex().load()
+    changes: Dict[str, Optional[Set[str]]] = {}
+    for file, lines in git_changes(base).items():
+        if IGNORED_PATTERN.search(file):
+            continue
+        if file == LOCATOR_CATALOG:
+            changes[file] = changed_catalog_entries(base)
+            continue
+        if file.startswith('tests/') and file in {nodeid.split('::')[0] for nodeid in index.tests}:
+            changes[file] = None if 0 in lines else {f"line:{line}" for line in lines}
+        elif file.endswith('.py') and file in index.modules and 0 not in lines:
+            changes[file] = index.changed_members(file, lines)
+        elif file.endswith('.py') or file in GLOBAL_FILES:
+            changes[file] = None
+        elif file.startswith(DATA_DIR):
+            readers = data_file_readers(index, file)
+            if readers:
+                logger.debug(f"Data file {file} is read by {sorted(readers)}")
+                changes.update({reader: None for reader in readers})
+            else:
+                # Read from conftest or by path only: may affect any test
+                changes[file] = None
+        else:
+            logger.debug(f"Ignoring change to non-code file {file}")
+    for file, members in changes.items():
+        logger.info(f"Changed: {file}" + (f" ({', '.join(sorted(members))})" if members else ""))
+    return index.impacted(changes, tests)
+
+
+if __name__ == '__main__':
+    import sys
+
+    impact_index = ImpactIndex().load()
+    selected, why = select_impacted_tests(sys.argv[1] if len(sys.argv) > 1 else 'HEAD',
+                                          impact_index.tests)
+    for test in sorted(impact_index.tests):
+        print(f"{'RUN ' if test in selected else 'skip'} {test}  {why.get(test, '')}")
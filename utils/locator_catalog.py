@@ -0,0 +1,437 @@
+"""Declarative locator catalog, compiled to the fastest strategy and indexed at startup."""
+
+import json
+import os
+import re
+from string import Formatter
+from typing import Any, Dict, List, Optional, Tuple
+
+from appium.webdriver.common.appiumby import AppiumBy
+
+from utils.adaptive_locator import AdaptiveLocator
+from utils.logger import logger
+from test_settings import APP_VERSION, LOCATOR_CATALOG
+
+LocatorType = Tuple[str, str]
+# (class, clauses) matching snapshot nodes: every clause must hold, a clause
+# holds when one of its (attribute, kind, text) conditions does
+SnapshotQuery = Tuple[str, List[List[Tuple[str, str, str]]]]
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(__file__))
+
+# XPath subset compiled to UiAutomator: `//Class[predicates]`, optionally
+# wrapped as `(...)[n]`, with predicates joined by 'and'
+_PATH_PATTERN = re.compile(r'^//(?P<cls>\*|[\w.$]+)(?:\[(?P<predicates>.+)\])?$')
+_INDEXED_PATTERN = re.compile(r'^\((?P<path>//.+)\)\[(?P<index>\d+)\]$')
+_CONDITION_PATTERN = re.compile(
+    r"^(?:@(?P<attr>[\w-]+)\s*=\s*'(?P<equals>[^']*)'"
+    r"|(?P<func>contains|starts-with)\(\s*@(?P<func_attr>[\w-]+)\s*,\s*'(?P<arg>[^']*)'\s*\))$"
+)
+# UiSelector methods per XPath attribute: exact, contains, starts-with, regex
+_SELECTOR_METHODS = {
+    'content-desc': ('description', 'descriptionContains', 'descriptionStartsWith',
+                     'descriptionMatches'),
+    'text': ('text', 'textContains', 'textStartsWith', 'textMatches'),
+    'resource-id': ('resourceId', None, None, 'resourceIdMatches'),
+}
+# Widget classes too common to identify an element by class name alone
+GENERIC_CLASSES = ('android.view.View', 'android.widget.ImageView', 'android.widget.TextView',
+                   'android.widget.Button', 'android.widget.FrameLayout')
+
+# Escaping of template parameters inside compiled values
+_XPATH, _JAVA, _REGEX, _PLAIN = 'xpath', 'java', 'regex', 'plain'
+_PARAM = '\x00'
+
+
+def _java_string(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"')
+
+
+def _java_regex(value: str) -> str:
+    """Quote a literal for a Java regex, leaving template markers intact."""
+    return ''.join(f"\\{char}" if char in r'\^$.|?*+()[]{}' else char for char in value)
+
+
+def _version_key(version: str) -> Tuple[int, ...]:
+    return tuple(int(part) for part in re.findall(r'\d+', version))
+
+
+def compile_locator(by: str, value: str) -> Tuple[LocatorType, Dict[str, str], Optional[str]]:
+    """Compile a locator to the fastest equivalent strategy.
+
+    Simple XPath (class plus content-desc/text/resource-id conditions and an
+    optional index) becomes an accessibility id, id, class name or
+    UiSelector lookup, which UiAutomator2 resolves without serializing the
+    whole view hierarchy. Template placeholders ("{ingredient}") are kept.
+
+    Args:
+        by: Strategy of the catalog entry (an AppiumBy value)
+        value: Locator value, possibly with placeholders
+
+    Returns:
+        Compiled (by, value), escaping of each placeholder ('xpath', 'java',
+        'regex' or 'plain') and the reason the XPath was kept, if it was
+    """
+    params = [name for _, name, _, _ in Formatter().parse(value) if name]
+    # Protect placeholders from escaping while compiling
+    marked = value
+    for name in params:
+        marked = marked.replace(f"{{{name}}}", f"{_PARAM}{name}{_PARAM}")
+
+    if by == AppiumBy.ANDROID_UIAUTOMATOR:
+        # Placeholders are inside Java string literals
+        return (by, marked), {name: _JAVA for name in params}, None
+    if by != AppiumBy.XPATH:
+        return (by, value), {name: _PLAIN for name in params}, None
+
+    index = None
+    path = marked.strip()
+    indexed = _INDEXED_PATTERN.match(path)
+    if indexed:
+        path, index = indexed.group('path'), int(indexed.group('index'))
+    match = _PATH_PATTERN.match(path)
+    if not match:
+        return ((by, value), {name: _XPATH for name in params},
+                "path is not a single //Class[...] step")
+    cls = match.group('cls')
+
+    conditions: Dict[str, List[Tuple[str, str]]] = {}
+    predicates = match.group('predicates')
+    for part in re.split(r'\s+and\s+', predicates) if predicates else []:
+        if re.search(r'\s+or\s+', part):
+            return (by, value), {name: _XPATH for name in params}, "uses 'or'"
+        condition = _CONDITION_PATTERN.match(part.strip())
+        if not condition:
+            return ((by, value), {name: _XPATH for name in params},
+                    f"unsupported predicate {part.strip()}")
+        attr = condition.group('attr') or condition.group('func_attr')
+        if attr not in _SELECTOR_METHODS:
+            return ((by, value), {name: _XPATH for name in params},
+                    f"unsupported attribute @{attr}")
+        kind = 'equals' if condition.group('attr') else condition.group('func')
+        text = condition.group('equals') if kind == 'equals' else condition.group('arg')
+        conditions.setdefault(attr, []).append((kind, text))
+
+    # Single-condition shortcuts with native strategies
+    if index is None and not params:
+        if not conditions and cls != '*':
+            return (AppiumBy.CLASS_NAME, cls), {}, None
+        if cls == '*' and len(conditions) == 1:
+            attr, checks = next(iter(conditions.items()))
+            if len(checks) == 1 and checks[0][0] == 'equals':
+                if attr == 'content-desc':
+                    return (AppiumBy.ACCESSIBILITY_ID, checks[0][1]), {}, None
+                if attr == 'resource-id':
+                    return (AppiumBy.ID, checks[0][1]), {}, None
+
+    kinds: Dict[str, str] = {}
+    selector = 'new UiSelector()'
+    if cls != '*':
+        selector += f'.className("{_java_string(cls)}")'
+    for attr, checks in conditions.items():
+        exact, contains, starts, matches = _SELECTOR_METHODS[attr]
+        method = {'equals': exact, 'contains': contains, 'starts-with': starts}[checks[0][0]]
+        if len(checks) == 1 and method:
+            text, escape = checks[0][1], _JAVA
+            selector += f'.{method}("{_java_string(text)}")'
+        else:
+            # Several conditions on one attribute: one regex of lookaheads
+            escape = _REGEX
+            parts = []
+            for kind, text in checks:
+                literal = _java_regex(text)
+                parts.append({'equals': f"(?=^{literal}$)", 'contains': f"(?=.*{literal})",
+                              'starts-with': f"(?=^{literal})"}[kind])
+            selector += f'.{matches}("{_java_string("(?s)" + "".join(parts) + ".*")}")'
+        for name in params:
+            if f"{_PARAM}{name}{_PARAM}" in ''.join(text for _, text in checks):
+                kinds[name] = escape
+    if index is not None:
+        selector += f'.instance({index - 1})'
+    return (AppiumBy.ANDROID_UIAUTOMATOR, selector), kinds, None
+
+
+def parse_snapshot_query(value: str) -> Optional[SnapshotQuery]:
+    """Parse a simple XPath into conditions evaluated on hierarchy snapshots.
+
+    Unlike compile_locator, predicates may combine conditions with 'or'.
+
+    Args:
+        value: XPath of a single //Class[...] step, possibly with placeholders
+
+    Returns:
+        Class and clauses, or None if the XPath is not supported
+    """
+    match = _PATH_PATTERN.match(value.strip())
+    if not match:
+        return None
+    clauses = []
+    predicates = match.group('predicates')
+    for part in re.split(r'\s+and\s+', predicates) if predicates else []:
+        clause = []
+        for option in re.split(r'\s+or\s+', part.strip()):
+            condition = _CONDITION_PATTERN.match(option.strip())
+            if not condition:
+                return None
+            kind = 'equals' if condition.group('attr') else condition.group('func')
+            text = condition.group('equals') if kind == 'equals' else condition.group('arg')
+            clause.append((condition.group('attr') or condition.group('func_attr'), kind, text))
+        clauses.append(clause)
+    return match.group('cls'), clauses
+
+
+def _escape(value: str, kind: str) -> str:
+    if kind == _JAVA:
+        return _java_string(value)
+    if kind == _REGEX:
+        return _java_string(_java_regex(value))
+    if kind == _XPATH and "'" in value:
+        raise ValueError(f"Template value {value!r} contains a quote")
+    return value
+
+
+def _fill(compiled: LocatorType, escapes: Dict[str, str], params: Dict[str, str]) -> LocatorType:
+    """Fill template placeholders of a compiled locator."""
+    by, value = compiled
+    for name, param in params.items():
+        escaped = _escape(str(param), escapes[name])
+        if escapes[name] in (_XPATH, _PLAIN):
+            value = value.replace(f"{{{name}}}", escaped)
+        else:
+            value = value.replace(f"{_PARAM}{name}{_PARAM}", escaped)
+    return by, value
+
+
+class CatalogEntry:
+    """One named locator of a screen, with its compiled form and alternatives."""
+
+    def __init__(self, screen: str, name: str, spec: Dict[str, Any]):
+        """Initialize CatalogEntry and compile its strategies.
+
+        Args:
+            screen: Screen class name
+            name: Locator name (e.g., "SAVE_RECIPE_BUTTON")
+            spec: Catalog entry: 'by' and 'value' of the primary strategy,
+                possibly a template, and optional 'alternatives' (a list of
+                'by'/'value' dicts taking the same placeholders)
+        """
+        self.screen = screen
+        self.name = name
+        self.source: LocatorType = (spec['by'], spec['value'])
+        self.compiled, self._escapes, self.kept_reason = compile_locator(*self.source)
+        self.params = sorted(self._escapes)
+
+        # (name, compiled, escapes) of every distinct strategy, the primary first
+        self.strategies: List[Tuple[str, LocatorType, Dict[str, str]]] = []
+        for alternative in [spec] + spec.get('alternatives', []):
+            compiled, escapes, _ = compile_locator(alternative['by'], alternative['value'])
+            if sorted(escapes) != self.params:
+                raise ValueError(f"Alternative {alternative['value']!r} of {screen}.{name} "
+                                 f"must take {self.params}")
+            if all(compiled != known for _, known, _ in self.strategies):
+                self.strategies.append((f"{alternative['by']}={alternative['value']}",
+                                        compiled, escapes))
+
+    def locator(self, **params: str) -> LocatorType:
+        """Get the compiled locator, filling template placeholders.
+
+        Args:
+            **params: Values of the placeholders (e.g., ingredient="Beef")
+
+        Returns:
+            Tuple of (by, value); an AdaptiveLocator if the entry has
+            alternatives
+
+        Raises:
+            ValueError: If placeholders are missing or unknown
+        """
+        if sorted(params) != self.params:
+            raise ValueError(f"{self.screen}.{self.name} takes {self.params}, got {sorted(params)}")
+        if len(self.strategies) == 1:
+            return _fill(self.compiled, self._escapes, params)
+        return AdaptiveLocator(f"{self.screen}.{self.name}", [
+            (name, _fill(compiled, escapes, params)) for name, compiled, escapes in self.strategies
+        ])
+
+    def snapshot_query(self, **params: str) -> SnapshotQuery:
+        """Get the entry as conditions on hierarchy snapshot nodes.
+
+        Args:
+            **params: Values of the placeholders (e.g., ingredient="Beef")
+
+        Returns:
+            Class and clauses (see parse_snapshot_query)
+
+        Raises:
+            ValueError: If placeholders are missing or unknown, or the entry
+                is not a simple XPath
+        """
+        if sorted(params) != self.params:
+            raise ValueError(f"{self.screen}.{self.name} takes {self.params}, got {sorted(params)}")
+        by, value = self.source
+        query = parse_snapshot_query(value) if by == AppiumBy.XPATH else None
+        if query is None:
+            raise ValueError(f"{self.screen}.{self.name} cannot be matched in a snapshot: {value}")
+        cls, clauses = query
+        return cls, [[(attr, kind, text.format(**params)) for attr, kind, text in clause]
+                     for clause in clauses]
+
+    def lint(self) -> Optional[str]:
+        """Describe why the locator is slow or fragile, or None if it is fine."""
+        by, value = self.compiled
+        if by == AppiumBy.XPATH:
+            return f"full-hierarchy XPath ({self.kept_reason})"
+        if by == AppiumBy.CLASS_NAME and value in GENERIC_CLASSES:
+            if len(self.strategies) > 1:
+                return None  # Ranked against its alternatives at runtime
+            return f"first element of the common class {value}"
+        return None
+
+
+class LocatorCatalog:
+    """Locators of all screens, loaded from a JSON catalog and indexed by screen and name.
+
+    The catalog has a 'base' section and per-version override sections
+    ('versions' -> app version -> screen -> name -> entry). Overrides of all
+    versions up to the app under test are applied in version order, so an
+    entry changed in 1.2 stays changed in 1.3.
+    """
+
+    def __init__(self, path: str = LOCATOR_CATALOG, version: str = APP_VERSION):
+        """Initialize LocatorCatalog.
+
+        Args:
+            path: Catalog file, relative to the project root
+            version: Version of the app under test
+        """
+        self.path = os.path.join(PROJECT_ROOT, path)
+        self.version = version
+        self._entries: Dict[str, Dict[str, CatalogEntry]] = {}
+
+    def load(self) -> 'LocatorCatalog':
+        """Read, resolve and compile the catalog.
+
+        Returns:
+            The catalog itself
+        """
+        with open(self.path, 'r', encoding='utf-8') as f:
+            self._entries = resolve_entries(json.load(f), self.version)
+        count = sum(len(entries) for entries in self._entries.values())
+        logger.debug(f"Loaded {count} locators of {len(self._entries)} screens "
+                      f"for app {self.version}")
+        return self
+
+    def get(self, screen: str, name: str, **params: str) -> LocatorType:
+        """Get a compiled locator.
+
+        Args:
+            screen: Screen class name
+            name: Locator name
+            **params: Values of template placeholders
+
+        Returns:
+            Tuple of (by, value)
+
+        Raises:
+            KeyError: If the screen has no such locator
+        """
+        return self.entry(screen, name).locator(**params)
+
+    def snapshot_query(self, screen: str, name: str, **params: str) -> SnapshotQuery:
+        """Get a locator as conditions on hierarchy snapshot nodes.
+
+        Args:
+            screen: Screen class name
+            name: Locator name
+            **params: Values of template placeholders
+
+        Returns:
+            Class and clauses (see parse_snapshot_query)
+
+        Raises:
+            KeyError: If the screen has no such locator
+            ValueError: If the locator is not a simple XPath
+        """
+        return self.entry(screen, name).snapshot_query(**params)
+
+    def entry(self, screen: str, name: str) -> CatalogEntry:
+        """Get a catalog entry.
+
+        Raises:
+            KeyError: If the screen has no such locator
+        """
+        try:
+            return self._entries[screen][name]
+        except KeyError:
+            raise KeyError(f"No locator {name} for {screen} in {self.path} "
+                           f"(app {self.version})") from None
+
+    def screen(self, screen: str) -> Dict[str, CatalogEntry]:
+        """Get all entries of a screen, by name."""
+        return dict(self._entries.get(screen, {}))
+
+    def lint(self) -> List[Dict[str, Any]]:
+        """List locators that force full-hierarchy XPath or are otherwise fragile.
+
+        Returns:
+            One dict per problem with 'screen', 'name', 'by', 'value' and 'issue'
+        """
+        report = []
+        for screen, entries in sorted(self._entries.items()):
+            for name, entry in sorted(entries.items()):
+                issue = entry.lint()
+                if issue:
+                    report.append({'screen': screen, 'name': name, 'by': entry.compiled[0],
+                                   'value': entry.compiled[1], 'issue': issue})
+        return report
+
+
+def effective_specs(catalog: Dict[str, Any], version: str) -> Dict[str, Dict[str, str]]:
+    """Apply the version overrides of a catalog.
+
+    Args:
+        catalog: Parsed catalog file
+        version: Version of the app under test
+
+    Returns:
+        'Screen.NAME' -> entry spec ('by', 'value') with overrides applied
+    """
+    sections = [catalog.get('base', {})]
+    sections += [screens for _, screens in sorted(
+        ((key, value) for key, value in catalog.get('versions', {}).items()
+         if _version_key(key) <= _version_key(version)),
+        key=lambda item: _version_key(item[0]))]
+    specs: Dict[str, Dict[str, str]] = {}
+    for screens in sections:
+        for screen, locators in screens.items():
+            for name, spec in locators.items():
+                specs[f"{screen}.{name}"] = spec
+    return specs
+
+
+def resolve_entries(catalog: Dict[str, Any], version: str) -> Dict[str, Dict[str, CatalogEntry]]:
+    """Apply the version overrides of a catalog and compile every entry.
+
+    Args:
+        catalog: Parsed catalog file
+        version: Version of the app under test
+
+    Returns:
+        Screen -> name -> compiled entry
+    """
+    entries: Dict[str, Dict[str, CatalogEntry]] = {}
+    for key, spec in effective_specs(catalog, version).items():
+        screen, name = key.split('.', 1)
+        entries.setdefault(screen, {})[name] = CatalogEntry(screen, name, spec)
+    return entries
+
+
+# Global catalog, compiled once when first imported
+locator_catalog = LocatorCatalog().load()
+
+
+if __name__ == '__main__':
+    problems = locator_catalog.lint()
+    for problem in problems:
+        print(f"{problem['screen']}.{problem['name']}: {problem['issue']}\n    {problem['value']}")
+    print(f"{len(problems)} locator issue(s)")
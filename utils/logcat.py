@@ -0,0 +1,196 @@
+"""Long-lived logcat stream per device, filtered to the app under test."""
+
+import re
+import subprocess
+import threading
+from bisect import bisect_left, bisect_right
+from collections import deque
+from time import time
+from typing import TYPE_CHECKING, Any, Deque, Dict, List, Optional, Set
+
+from utils.custom_keywords import AppCrashError, WaitGuard
+from utils.logger import logger
+from test_settings import DEVICE_NAME, LOGCAT_BUFFER_LINES, PACKAGE_NAME
+
+if TYPE_CHECKING:
+    from appium.webdriver.webdriver import WebDriver
+
+# `-v epoch` line: "  1697712345.123  1234  1256 E Tag     : message"
+_LINE_PATTERN = re.compile(
+    r'^\s*(?P<epoch>\d+\.\d+)\s+(?:\S+\s+)?(?P<pid>\d+)\s+(?P<tid>\d+)\s+'
+    r'(?P<level>[VDIWEFA])\s+(?P<tag>.*?)\s*:\s(?P<message>.*)$'
+)
+_PROCESS_START_PATTERN = re.compile(r'Start proc (\d+):([\w.]+)')
+
+# Seconds between PID lookups while the app has no known process
+PID_REFRESH_INTERVAL = 2.0
+
+
+class LogcatStream:
+    """Read `adb logcat` continuously into a bounded, time-indexed ring buffer.
+
+    Only lines of the app's processes are kept, plus system lines naming the
+    package (process deaths, ANRs). PIDs are learnt from `pidof` and from
+    ActivityManager "Start proc" lines, so restarts are followed. Lines are
+    indexed by host receive time, which makes slices line up with test
+    start and end times without syncing clocks.
+    """
+
+    # Message fragments marking an app crash or ANR. Process deaths alone are
+    # not crashes, since tests stop the app themselves (reset_app, checkpoints).
+    CRASH_PATTERNS = (
+        re.compile(r'FATAL EXCEPTION'),
+        re.compile(r'Fatal signal \d+'),
+        re.compile(r'ANR in '),
+    )
+
+    def __init__(self, device: str = DEVICE_NAME, package: str = PACKAGE_NAME,
+                 max_lines: int = LOGCAT_BUFFER_LINES):
+        """Initialize LogcatStream.
+
+        Args:
+            device: ADB serial of the device
+            package: Package whose lines are kept
+            max_lines: Capacity of the ring buffer
+        """
+        self.device = device
+        self.package = package
+        self.pids: Set[str] = set()
+        self.crashes: List[Dict[str, Any]] = []
+        self._times: Deque[float] = deque(maxlen=max_lines)
+        self._lines: Deque[str] = deque(maxlen=max_lines)
+        self._lock = threading.Lock()
+        self._process: Optional[subprocess.Popen] = None
+        self._thread: Optional[threading.Thread] = None
+        self._pid_checked = 0.0
+
+    @property
+    def running(self) -> bool:
+        """Check whether the stream is being read."""
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> None:
+        """Start the adb process and its reader thread, if not running yet."""
+        if self.running:
+            return
+        self._refresh_pids()
+        self._process = subprocess.Popen(
+            ['adb', '-s', self.device, 'logcat', '-v', 'epoch', '-T', '1'],
+            stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+            text=True, encoding='utf-8', errors='replace', bufsize=1
+        )
+        self._thread = threading.Thread(target=self._run, name=f"logcat-{self.device}",
+                                        daemon=True)
+        self._thread.start()
+        logger.debug(f"Streaming logcat of {self.device} for {self.package}")
+
+    def stop(self) -> None:
+        """Stop the adb process and wait for the reader to finish."""
+        if self._process is not None:
+            self._process.terminate()
+            try:
+                self._process.wait(timeout=5)
+            except subprocess.TimeoutExpired:
+                self._process.kill()
+            self._process = None
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def _refresh_pids(self) -> None:
+        self._pid_checked = time()
+        try:
+            result = subprocess.run(['adb', '-s', self.device, 'shell', 'pidof', self.package],
+                                    capture_output=True, text=True, timeout=5, check=False)
+        except (OSError, subprocess.TimeoutExpired):
+            return
+        self.pids.update(result.stdout.split())
+
+    def _run(self) -> None:
+        for line in self._process.stdout:
+            self.feed(line.rstrip('\n'), time())
+
+    def feed(self, line: str, received: float) -> bool:
+        """Filter one logcat line into the buffer and check it for crashes.
+
+        Args:
+            line: Raw line in `-v epoch` format
+            received: Host time the line was read
+
+        Returns:
+            True if the line was kept
+        """
+        match = _LINE_PATTERN.match(line)
+        if not match:
+            return False
+        message = match.group('message')
+        start = _PROCESS_START_PATTERN.search(message)
+        if start and start.group(2).split(':')[0] == self.package:
+            self.pids.add(start.group(1))
+        if not self.pids and received - self._pid_checked > PID_REFRESH_INTERVAL:
+            self._refresh_pids()
+
+        if match.group('pid') not in self.pids and self.package not in message:
+            return False
+        with self._lock:
+            self._times.append(received)
+            self._lines.append(line)
+        if 'has died' in message:
+            self.pids.difference_update(re.findall(r'pid (\d+)', message))
+        if any(pattern.search(message) for pattern in self.CRASH_PATTERNS):
+            self.crashes.append({'time': received, 'line': line})
+            logger.error(f"App crash in logcat: {message}")
+        return True
+
+    def slice(self, start: float, end: Optional[float] = None) -> List[str]:
+        """Get the buffered lines received within a time window.
+
+        Args:
+            start: Window start, host time in seconds
+            end: Window end, defaults to now
+
+        Returns:
+            Lines in the window, oldest first
+        """
+        with self._lock:
+            times = list(self._times)
+            lines = list(self._lines)
+        first = bisect_left(times, start)
+        last = bisect_right(times, end if end is not None else time())
+        return lines[first:last]
+
+    def crashes_since(self, start: float) -> List[Dict[str, Any]]:
+        """Get crash and ANR lines received after a host time."""
+        return [crash for crash in self.crashes if crash['time'] >= start]
+
+    def crash_guard(self, since: float) -> WaitGuard:
+        """Build a wait guard failing as soon as a crash is logged after a time.
+
+        Args:
+            since: Host time from which crashes count, usually the test start
+
+        Returns:
+            Guard for utils.custom_keywords.add_wait_guard
+        """
+        def guard(driver: "WebDriver") -> None:
+            crashes = self.crashes_since(since)
+            if crashes:
+                context = '\n'.join(self.slice(crashes[0]['time'] - 1)[:30])
+                raise AppCrashError(f"{self.package} crashed: {crashes[0]['line']}\n{context}")
+        return guard
+
+
+_streams: Dict[str, LogcatStream] = {}
+
+
+def get_logcat_stream(device: str = DEVICE_NAME) -> LogcatStream:
+    """Get the shared logcat stream of a device, created on first use."""
+    if device not in _streams:
+        _streams[device] = LogcatStream(device)
+    return _streams[device]
+
+
+def stop_logcat_streams() -> None:
+    """Stop the logcat streams of all devices."""
+    for stream in _streams.values():
+        stream.stop()
@@ -1,8 +1,12 @@
 """Centralized logging configuration for the automation framework."""
 
+import gzip
 import logging
 import os
+import shutil
 from datetime import datetime
+from collections import deque
+from logging.handlers import RotatingFileHandler
 from typing import Optional, ClassVar
 
 from config.logging_config import LogConfig
@@ -38,11 +42,41 @@ class AppiumFilter(logging.Filter):
         ])
 
 
+def _gzip_namer(name: str) -> str:
+    """Name rotated log files with a .gz suffix."""
+    return f"{name}.gz"
+
+
+def _gzip_rotator(source: str, dest: str) -> None:
+    """Compress a rotated log file and remove the uncompressed original."""
+    with open(source, 'rb') as f_in, gzip.open(dest, 'wb') as f_out:
+        shutil.copyfileobj(f_in, f_out)
+    os.remove(source)
+
+
+class BufferHandler(logging.Handler):
+    """Keep the most recent records in memory until they can be written elsewhere."""
+    
+    def __init__(self, capacity: int):
+        super().__init__()
+        self.buffer = deque(maxlen=capacity)
+    
+    def emit(self, record):
+        self.buffer.append(record)
+    
+    def drain_to(self, handler: logging.Handler) -> None:
+        """Pass buffered records to another handler and empty the buffer."""
+        while self.buffer:
+            handler.handle(self.buffer.popleft())
+
+
 class Logger:
     """Singleton logger class providing centralized logging functionality."""
     
     _instance: ClassVar[Optional['Logger']] = None
     _logger: ClassVar[Optional[logging.Logger]] = None
+    _file_buffer: ClassVar[Optional[BufferHandler]] = None
+    _file_level: ClassVar[int] = LogConfig.FILE_LOG_LEVEL
 
     def __new__(cls) -> 'Logger':
         """Create or return the singleton logger instance.
@@ -57,7 +91,10 @@ class Logger:
 
     @classmethod
     def _setup_logger(cls, debug_mode: bool = False) -> None:
-        """Configure the logger with file and console handlers.
+        """Configure the logger with a console handler and a buffer for the log file.
+        
+        The log file itself is only created by open_log_file(), so importing
+        the framework (e.g. for test collection) has no file system side effects.
         
         Args:
             debug_mode: If True, shows all log levels. If False, shows only important logs
@@ -101,9 +138,49 @@ class Logger:
         # Set log levels based on mode
         console_level = (LogConfig.DEBUG_CONSOLE_LEVEL 
                         if debug_mode else LogConfig.CONSOLE_LOG_LEVEL)
-        file_level = (LogConfig.DEBUG_FILE_LEVEL 
-                     if debug_mode else LogConfig.FILE_LOG_LEVEL)
+        cls._file_level = (LogConfig.DEBUG_FILE_LEVEL 
+                          if debug_mode else LogConfig.FILE_LOG_LEVEL)
+        
+        # Buffer records for the log file until it is opened
+        cls._file_buffer = BufferHandler(LogConfig.LOG_BUFFER_CAPACITY)
+        cls._file_buffer.setLevel(cls._file_level)
         
+        # Configure console handler
+        console_handler = logging.StreamHandler()
+        console_handler.setLevel(console_level)
+        console_handler.setFormatter(cls._formatter())
+
+        # Remove all existing handlers
+        if cls._logger.hasHandlers():
+            cls._logger.handlers.clear()
+
+        # Add handlers to logger
+        cls._logger.addHandler(cls._file_buffer)
+        cls._logger.addHandler(console_handler)
+        
+        # Prevent log propagation to avoid duplicate logs
+        cls._logger.propagate = False
+
+    @staticmethod
+    def _formatter() -> logging.Formatter:
+        """Create the formatter shared by all handlers."""
+        return logging.Formatter(
+            LogConfig.LOG_FORMAT,
+            LogConfig.DATE_FORMAT
+        )
+
+    @classmethod
+    def open_log_file(cls) -> None:
+        """Create the timestamped log file and write buffered records to it.
+        
+        Called once the first test that needs a device starts. Calling it
+        again has no effect.
+        """
+        if cls._logger is None:
+            cls._setup_logger(debug_mode=DEBUG_MODE)
+        if cls._file_buffer is None:
+            return
+
         # Set up log directory
         logs_dir = os.path.join(
             os.path.dirname(os.path.dirname(__file__)), 
@@ -113,37 +190,28 @@ class Logger:
         
         # Configure file handler
         timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        mode_suffix = '_debug' if debug_mode else ''
+        mode_suffix = '_debug' if DEBUG_MODE else ''
         log_file = os.path.join(
             logs_dir, 
             f'{LogConfig.LOG_FILE_PREFIX}{mode_suffix}_{timestamp}.log'
         )
         
-        file_handler = logging.FileHandler(log_file, encoding='utf-8')
-        file_handler.setLevel(file_level)
-        
-        # Configure console handler
-        console_handler = logging.StreamHandler()
-        console_handler.setLevel(console_level)
-        
-        # Set up formatter
-        formatter = logging.Formatter(
-            LogConfig.LOG_FORMAT,
-            LogConfig.DATE_FORMAT
+        file_handler = RotatingFileHandler(
+            log_file,
+            maxBytes=LogConfig.LOG_MAX_BYTES,
+            backupCount=LogConfig.LOG_BACKUP_COUNT,
+            encoding='utf-8'
         )
-        file_handler.setFormatter(formatter)
-        console_handler.setFormatter(formatter)
-
-        # Remove all existing handlers
-        if cls._logger.hasHandlers():
-            cls._logger.handlers.clear()
-
-        # Add handlers to logger
+        file_handler.namer = _gzip_namer
+        file_handler.rotator = _gzip_rotator
+        file_handler.setLevel(cls._file_level)
+        file_handler.setFormatter(cls._formatter())
+
+        # Replace the buffer with the file handler, keeping earlier records
+        cls._logger.removeHandler(cls._file_buffer)
+        cls._file_buffer.drain_to(file_handler)
+        cls._file_buffer = None
         cls._logger.addHandler(file_handler)
-        cls._logger.addHandler(console_handler)
-        
-        # Prevent log propagation to avoid duplicate logs
-        cls._logger.propagate = False
 
     @classmethod
     def debug(cls, message):
@@ -0,0 +1,337 @@
+"""Data-driven runner searching recipes for ingredient combinations on one warm session."""
+
+import csv
+import glob
+import json
+import os
+import statistics
+from collections import Counter
+from datetime import datetime
+from time import perf_counter
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from appium.webdriver.webdriver import WebDriver
+
+from flows.navigator import Navigator
+from screens.ingredient_selection_screen import IngredientSelectionScreen
+from utils.custom_keywords import wait_for_visible
+from utils.driver_factory import reset_app
+from utils.logger import logger
+from utils.recipe_oracle import recipe_oracle
+from utils.results_db import balance_shards
+from utils.test_helpers import format_duration
+from utils.transition_timer import get_build_id
+from test_settings import MATRIX_DEFAULT_CALORIES, MATRIX_RESET, PERF_RESULTS_DIR
+
+# Ways of returning to the ingredient selection screen between combinations
+RESET_STRATEGIES = ('back', 'relaunch')
+BACK_TIMEOUT = 10  # Seconds for the ingredient selection screen to reappear after back
+LIST_SEPARATOR = ';'  # Separator of ingredient lists in CSV matrix files
+
+
+class MatrixCase:
+    """One ingredient and calorie combination of the matrix."""
+
+    def __init__(self, case_id: str, meat: Optional[str] = None, vegetables: Iterable[str] = (),
+                 grains: Iterable[str] = (), calories: Optional[float] = None):
+        """Initialize MatrixCase.
+
+        Args:
+            case_id: Unique name of the combination
+            meat: Meat to select, if any
+            vegetables: Vegetables to select
+            grains: Grains and starches to select
+            calories: Seek bar percent, defaults to MATRIX_DEFAULT_CALORIES
+        """
+        self.case_id = case_id
+        self.meat = meat or None
+        self.vegetables = list(vegetables)
+        self.grains = list(grains)
+        self.calories = MATRIX_DEFAULT_CALORIES if calories is None else float(calories)
+
+    @property
+    def ingredients(self) -> List[str]:
+        """All ingredients of the combination, meat first."""
+        return ([self.meat] if self.meat else []) + self.vegetables + self.grains
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Get the combination as written to the report."""
+        return {'meat': self.meat, 'vegetables': self.vegetables, 'grains': self.grains,
+                'calories': self.calories}
+
+
+def _split(value: Any) -> List[str]:
+    if isinstance(value, str):
+        return [part.strip() for part in value.split(LIST_SEPARATOR) if part.strip()]
+    return list(value or [])
+
+
+def _describe(error: Exception) -> str:
+    """Get the type and first line of an error, as recorded per combination."""
+    return f"{type(error).__name__}: {str(error).splitlines()[0] if str(error) else ''}"
+
+
+def load_matrix(path: str) -> List[MatrixCase]:
+    """Load combinations from a JSON or CSV matrix file.
+
+    JSON files hold {"combinations": [{"id", "meat", "vegetables", "grains",
+    "calories"}, ...]}; CSV files have the same columns, with lists separated
+    by LIST_SEPARATOR. Only "id" is required.
+
+    Args:
+        path: Matrix file
+
+    Returns:
+        Combinations in file order
+
+    Raises:
+        ValueError: If an id is missing or used twice
+    """
+    if path.lower().endswith('.csv'):
+        with open(path, 'r', encoding='utf-8', newline='') as f:
+            rows: List[Dict[str, Any]] = list(csv.DictReader(f))
+    else:
+        with open(path, 'r', encoding='utf-8') as f:
+            rows = json.load(f)['combinations']
+
+    cases: List[MatrixCase] = []
+    seen = set()
+    for number, row in enumerate(rows, 1):
+        case_id = (row.get('id') or '').strip()
+        if not case_id:
+            raise ValueError(f"{path}: combination {number} has no id")
+        if case_id in seen:
+            raise ValueError(f"{path}: duplicate combination id {case_id!r}")
+        seen.add(case_id)
+        calories = row.get('calories')
+        cases.append(MatrixCase(
+            case_id,
+            meat=(row.get('meat') or '').strip() or None,
+            vegetables=_split(row.get('vegetables')),
+            grains=_split(row.get('grains')),
+            calories=None if calories in (None, '') else float(calories)
+        ))
+    return cases
+
+
+def results_dir() -> str:
+    """Get the directory of matrix results, creating it if needed."""
+    directory = os.path.join(os.path.dirname(os.path.dirname(__file__)), PERF_RESULTS_DIR, 'matrix')
+    os.makedirs(directory, exist_ok=True)
+    return directory
+
+
+def load_case_durations(directory: Optional[str] = None) -> Dict[str, float]:
+    """Get the latest duration of every passed combination from earlier matrix runs.
+
+    Args:
+        directory: Directory of matrix results, defaults to results_dir()
+
+    Returns:
+        Duration in seconds by combination id
+    """
+    durations: Dict[str, float] = {}
+    files = glob.glob(os.path.join(directory or results_dir(), '*.jsonl'))
+    for results_file in sorted(files, key=os.path.getmtime):
+        with open(results_file, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue
+                if record.get('outcome') == 'passed':
+                    durations[record['case']] = record['duration']
+    return durations
+
+
+def shard_cases(cases: List[MatrixCase], index: int, count: int,
+                durations: Optional[Dict[str, float]] = None) -> List[MatrixCase]:
+    """Select the combinations of one shard, balanced by their earlier durations.
+
+    Args:
+        cases: All combinations
+        index: Shard number, starting at 1
+        count: Number of shards
+        durations: Earlier durations by combination id; unknown ones get the median
+
+    Returns:
+        Combinations of the shard in file order
+
+    Raises:
+        ValueError: If index is not between 1 and count
+    """
+    if not 1 <= index <= count:
+        raise ValueError(f"Shard must be K/N with 1 <= K <= N, got {index}/{count}")
+    durations = durations or {}
+    known = [durations[case.case_id] for case in cases if case.case_id in durations]
+    default = statistics.median(known) if known else 1.0
+    expected = {case.case_id: durations.get(case.case_id, default) for case in cases}
+    selected = set(balance_shards(expected, count)[index - 1])
+    return [case for case in cases if case.case_id in selected]
+
+
+class MatrixRunner:
+    """Search recipes for every combination of a matrix without leaving the session.
+
+    Between combinations the app goes back to the ingredient selection
+    screen and only the chips that differ from the previous combination are
+    tapped. When going back fails, or with the 'relaunch' strategy, the app
+    is restarted with cleared data and navigated to the screen again. When a
+    recipe index was imported, every search is checked against the
+    oracle's prediction. Every combination is streamed to a JSON lines file.
+    """
+
+    def __init__(self, driver: WebDriver, cases: List[MatrixCase],
+                 navigator: Optional[Navigator] = None, reset: str = MATRIX_RESET,
+                 shard: Optional[Tuple[int, int]] = None):
+        """Initialize MatrixRunner.
+
+        Args:
+            driver: Warm WebDriver session reused by all combinations
+            cases: Combinations to run
+            navigator: Navigator used to reach the ingredient selection screen
+            reset: Return strategy between combinations, one of RESET_STRATEGIES
+            shard: (index, count) to run only one shard of the combinations
+
+        Raises:
+            ValueError: If the reset strategy is unknown
+        """
+        if reset not in RESET_STRATEGIES:
+            raise ValueError(f"Reset must be one of {RESET_STRATEGIES}, got {reset!r}")
+        self.driver = driver
+        self.navigator = navigator or Navigator(driver)
+        self.reset = reset
+        self.shard = shard
+        self.cases = shard_cases(cases, *shard, load_case_durations()) if shard else cases
+        self.stats: Dict[str, Any] = {'cases': 0, 'passed': 0, 'failed': 0,
+                                      'resets': Counter(), 'results': []}
+
+    def _results_file(self) -> str:
+        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        suffix = f"_shard{self.shard[0]}of{self.shard[1]}" if self.shard else ''
+        return os.path.join(results_dir(), f"{get_build_id()}_{timestamp}{suffix}.jsonl")
+
+    def run(self) -> Dict[str, Any]:
+        """Run all combinations.
+
+        Returns:
+            Dict with case, pass and failure counts, resets per strategy, the
+            per-combination records and the results file
+        """
+        results_file = self._results_file()
+        self.stats['results_file'] = results_file
+        logger.info(f"Matrix run started: {len(self.cases)} combinations"
+                    + (f" (shard {self.shard[0]}/{self.shard[1]})" if self.shard else ''))
+        start = perf_counter()
+
+        screen: Optional[IngredientSelectionScreen] = None
+        selected: List[str] = []
+        reset: Dict[str, Any] = {}
+        with open(results_file, 'a', encoding='utf-8') as f:
+            for number, case in enumerate(self.cases, 1):
+                record: Dict[str, Any] = {'case': case.case_id, **case.to_dict(),
+                                          'timestamp': datetime.now().isoformat(timespec='seconds')}
+                if screen is None:
+                    screen, reset = self._reach_selection(record)
+                record.update(reset)
+                if screen is not None:
+                    record.update(self._run_case(screen, case, selected))
+                self.stats['results'].append(record)
+                f.write(json.dumps(record) + '\n')
+                f.flush()
+
+                screen, selected, reset = None, [], {}
+                if record['outcome'] == 'passed' and number < len(self.cases):
+                    screen, reset = self._go_back()
+                    selected = case.ingredients if screen is not None else []
+
+        self.stats['elapsed'] = perf_counter() - start
+        self.log_report()
+        return self.stats
+
+    def _run_case(self, screen: IngredientSelectionScreen, case: MatrixCase,
+                  selected: List[str]) -> Dict[str, Any]:
+        """Select a combination, search and read the recipe count."""
+        result: Dict[str, Any] = {}
+        start = perf_counter()
+        changes = [name for name in selected if name not in case.ingredients] \
+            + [name for name in case.ingredients if name not in selected]
+        try:
+            expected = None
+            if recipe_oracle.available:
+                expected = recipe_oracle.predict(case.ingredients,
+                                                 recipe_oracle.calorie_cap(case.calories))
+                result['expected_count'] = expected.count
+            screen.select_calories(case.calories)
+            screen.toggle_ingredients(changes)
+            dish_list = screen.click_on_find_recipe_button(expected=expected)
+            result['search_latency'] = round(screen.last_search_duration, 3)
+            result['recipe_count'] = dish_list.get_recipe_count()
+            if expected is not None:
+                result['dishes_shown'] = dish_list.visible_dishes(expected.dishes)
+            result['outcome'] = 'passed'
+            self.stats['passed'] += 1
+        except Exception as e:
+            result['outcome'] = 'failed'
+            result['error'] = _describe(e)
+            self.stats['failed'] += 1
+            logger.error(f"Matrix combination {case.case_id} failed: {result['error']}")
+        result['duration'] = round(perf_counter() - start, 3)
+        self.stats['cases'] += 1
+        return result
+
+    def _go_back(self) -> Tuple[Optional[IngredientSelectionScreen], Dict[str, Any]]:
+        """Return to the ingredient selection screen with back, keeping its chips."""
+        if self.reset != 'back':
+            return None, {}
+        start = perf_counter()
+        try:
+            self.driver.back()
+            wait_for_visible(self.driver, IngredientSelectionScreen.TITLE, timeout=BACK_TIMEOUT,
+                             is_scrollable=False)
+        except Exception as e:
+            logger.warning(f"Back to ingredient selection failed, relaunching: {e}")
+            return None, {}
+        self.stats['resets']['back'] += 1
+        return IngredientSelectionScreen(self.driver), {
+            'reset': 'back', 'reset_time': round(perf_counter() - start, 3)}
+
+    def _reach_selection(self, record: Dict[str, Any]
+                         ) -> Tuple[Optional[IngredientSelectionScreen], Dict[str, Any]]:
+        """Navigate to ingredient selection, restarting the app with cleared data after a case.
+
+        When this fails, the combination of the record is counted as failed
+        and the next one starts with another relaunch.
+        """
+        start = perf_counter()
+        reset: Dict[str, Any] = {}
+        try:
+            if self.stats['cases']:
+                reset['reset'] = 'relaunch'
+                self.stats['resets']['relaunch'] += 1
+                reset_app(self.driver)
+                self.navigator.resync()
+            screen = self.navigator.go_to(IngredientSelectionScreen)
+        except Exception as e:
+            record.update(outcome='failed', error=f"reset: {_describe(e)}",
+                          duration=round(perf_counter() - start, 3))
+            self.stats['cases'] += 1
+            self.stats['failed'] += 1
+            logger.error(f"Matrix combination {record['case']} failed: {record['error']}")
+            return None, reset
+        reset['reset_time'] = round(perf_counter() - start, 3)
+        return screen, reset
+
+    def log_report(self) -> None:
+        """Log recipe count and search latency per combination."""
+        for record in self.stats['results']:
+            if record['outcome'] == 'passed':
+                logger.info(f"[MATRIX] {record['case']}: {record['recipe_count']} recipes, "
+                            f"search {record['search_latency']:.3f}s")
+            else:
+                logger.info(f"[MATRIX] {record['case']}: failed ({record['error']})")
+        logger.info(
+            f"Matrix run finished: {self.stats['passed']}/{self.stats['cases']} passed "
+            f"in {format_duration(self.stats.get('elapsed', 0))}, "
+            f"resets {dict(self.stats['resets'])}"
+        )
@@ -0,0 +1,271 @@
+"""Background frame-rendering and memory sampling during test flows."""
+
+import glob
+import os
+import re
+import subprocess
+import threading
+from collections import deque
+from datetime import datetime
+from typing import Any, Deque, Dict, List, Optional
+
+from utils.logger import logger
+from utils.step_tracker import step_tracker
+from test_settings import (
+    DEVICE_NAME,
+    PACKAGE_NAME,
+    PERF_MAX_SAMPLES,
+    PERF_SAMPLE_INTERVAL
+)
+
+JANK_THRESHOLD_MS = 1000 / 60  # A frame slower than one 60 Hz vsync is janky
+UNTAGGED = "<no screen step>"
+
+_TOTAL_PSS_PATTERN = re.compile(r'^\s*TOTAL(?: PSS)?:?\s+(\d+)', re.MULTILINE)
+_SUMMARY_PATTERNS = {
+    'java_heap_kb': re.compile(r'^\s*Java Heap:\s+(\d+)', re.MULTILINE),
+    'native_heap_kb': re.compile(r'^\s*Native Heap:\s+(\d+)', re.MULTILINE),
+}
+
+
+class AdbDumpsysSource:
+    """Read dumpsys output for the app from a connected device."""
+
+    def __init__(self, package: str = PACKAGE_NAME, device: str = DEVICE_NAME):
+        self.package = package
+        self.device = device
+
+    def _dumpsys(self, *args: str) -> str:
+        result = subprocess.run(
+            ['adb', '-s', self.device, 'shell', 'dumpsys', *args],
+            capture_output=True,
+            text=True,
+            check=True,
+            timeout=15
+        )
+        return result.stdout
+
+    def gfxinfo(self) -> str:
+        """Get `dumpsys gfxinfo <pkg> framestats` output."""
+        return self._dumpsys('gfxinfo', self.package, 'framestats')
+
+    def meminfo(self) -> str:
+        """Get `dumpsys meminfo <pkg>` output."""
+        return self._dumpsys('meminfo', self.package)
+
+
+class RecordedDumpsysSource:
+    """Replay dumpsys output recorded to files, for offline runs.
+
+    The directory is expected to contain ``gfxinfo_*.txt`` and
+    ``meminfo_*.txt`` files. They are returned in sorted order, and the last
+    file keeps being returned once the recording is exhausted.
+    """
+
+    def __init__(self, directory: str):
+        self._gfxinfo = sorted(glob.glob(os.path.join(directory, 'gfxinfo_*.txt')))
+        self._meminfo = sorted(glob.glob(os.path.join(directory, 'meminfo_*.txt')))
+        if not self._gfxinfo and not self._meminfo:
+            raise FileNotFoundError(f"No recorded dumpsys output found in {directory}")
+        self._index = {'gfxinfo': 0, 'meminfo': 0}
+
+    def _next(self, kind: str, files: List[str]) -> str:
+        if not files:
+            return ""
+        path = files[min(self._index[kind], len(files) - 1)]
+        self._index[kind] += 1
+        with open(path, 'r', encoding='utf-8') as f:
+            return f.read()
+
+    def gfxinfo(self) -> str:
+        """Get the next recorded gfxinfo output."""
+        return self._next('gfxinfo', self._gfxinfo)
+
+    def meminfo(self) -> str:
+        """Get the next recorded meminfo output."""
+        return self._next('meminfo', self._meminfo)
+
+
+def parse_framestats(output: str) -> List[Dict[str, float]]:
+    """Parse the PROFILEDATA section of `dumpsys gfxinfo framestats`.
+
+    Args:
+        output: Raw gfxinfo output
+
+    Returns:
+        List of frames with 'vsync' (ns) and 'duration_ms', skipping frames
+        flagged as invalid by the framework
+    """
+    frames = []
+    header: Optional[List[str]] = None
+    in_profile = False
+    for line in output.splitlines():
+        line = line.strip()
+        if line == '---PROFILEDATA---':
+            in_profile = not in_profile
+            header = None
+            continue
+        if not in_profile or not line:
+            continue
+        columns = line.rstrip(',').split(',')
+        if header is None:
+            header = columns
+            continue
+        try:
+            row = dict(zip(header, columns))
+            if int(row['Flags']) != 0:
+                continue
+            vsync = int(row['IntendedVsync'])
+            completed = int(row['FrameCompleted'])
+        except (KeyError, ValueError):
+            continue
+        if completed > vsync:
+            frames.append({'vsync': vsync, 'duration_ms': (completed - vsync) / 1e6})
+    return frames
+
+
+def parse_meminfo(output: str) -> Dict[str, int]:
+    """Parse heap figures from `dumpsys meminfo <pkg>`.
+
+    Args:
+        output: Raw meminfo output
+
+    Returns:
+        Dict with 'total_pss_kb' and, when present, 'java_heap_kb' and 'native_heap_kb'
+    """
+    values = {}
+    match = _TOTAL_PSS_PATTERN.search(output)
+    if match:
+        values['total_pss_kb'] = int(match.group(1))
+    for key, pattern in _SUMMARY_PATTERNS.items():
+        match = pattern.search(output)
+        if match:
+            values[key] = int(match.group(1))
+    return values
+
+
+def _percentile(values: List[float], percent: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not values:
+        return 0.0
+    return values[min(len(values) - 1, int(len(values) * percent / 100))]
+
+
+class PerfSampler:
+    """Periodically sample frame timings and memory in a background thread.
+
+    Every sample is tagged with the screen step running at sampling time.
+    Samples and frames are kept in bounded deques so long runs use
+    constant memory.
+    """
+
+    def __init__(self, source=None, interval: float = PERF_SAMPLE_INTERVAL,
+                 max_samples: int = PERF_MAX_SAMPLES):
+        """Initialize PerfSampler.
+
+        Args:
+            source: Object providing gfxinfo() and meminfo(), defaults to AdbDumpsysSource
+            interval: Seconds between samples
+            max_samples: Maximum number of samples kept in memory
+        """
+        self.source = source or AdbDumpsysSource()
+        self.interval = interval
+        self.samples: Deque[Dict[str, Any]] = deque(maxlen=max_samples)
+        self.frames: Deque[Dict[str, Any]] = deque(maxlen=max_samples * 20)
+        self._last_vsync = 0
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def start(self) -> None:
+        """Start sampling in a daemon thread."""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name='perf-sampler', daemon=True)
+        self._thread.start()
+        logger.debug(f"Performance sampler started (interval {self.interval}s)")
+
+    def stop(self) -> None:
+        """Stop sampling and take a final sample."""
+        self._stop_event.set()
+        if self._thread:
+            self._thread.join(timeout=self.interval + 15)
+            self._thread = None
+        self.sample()
+        logger.debug(f"Performance sampler stopped after {len(self.samples)} samples")
+
+    def _run(self) -> None:
+        while not self._stop_event.wait(self.interval):
+            self.sample()
+
+    def sample(self) -> Optional[Dict[str, Any]]:
+        """Collect one gfxinfo and meminfo sample tagged with the current step.
+
+        Returns:
+            The stored sample, or None if dumpsys could not be read
+        """
+        step = step_tracker.current_step or UNTAGGED
+        try:
+            gfxinfo = self.source.gfxinfo()
+            meminfo = self.source.meminfo()
+        except (subprocess.SubprocessError, OSError) as e:
+            logger.warning(f"Failed to sample dumpsys: {e}")
+            return None
+
+        with self._lock:
+            new_frames = [
+                frame for frame in parse_framestats(gfxinfo)
+                if frame['vsync'] > self._last_vsync
+            ]
+            if new_frames:
+                self._last_vsync = max(frame['vsync'] for frame in new_frames)
+            for frame in new_frames:
+                self.frames.append({'step': step, 'duration_ms': frame['duration_ms']})
+
+            sample = {
+                'step': step,
+                'timestamp': datetime.now().isoformat(timespec='milliseconds'),
+                'frames': len(new_frames),
+                **parse_meminfo(meminfo)
+            }
+            self.samples.append(sample)
+        return sample
+
+    def report(self) -> Dict[str, Dict[str, Any]]:
+        """Summarize jank percentiles and heap growth per screen.
+
+        Returns:
+            Mapping of screen name to frame count, jank percentage, frame time
+            percentiles (ms) and PSS growth (KB) between its first and last sample
+        """
+        with self._lock:
+            frames = list(self.frames)
+            samples = list(self.samples)
+
+        durations: Dict[str, List[float]] = {}
+        for frame in frames:
+            durations.setdefault(frame['step'].split('.')[0], []).append(frame['duration_ms'])
+
+        pss: Dict[str, List[int]] = {}
+        for sample in samples:
+            if 'total_pss_kb' in sample:
+                pss.setdefault(sample['step'].split('.')[0], []).append(sample['total_pss_kb'])
+
+        report = {}
+        for screen in sorted(set(durations) | set(pss)):
+            values = sorted(durations.get(screen, []))
+            heap = pss.get(screen, [])
+            report[screen] = {
+                'frames': len(values),
+                'jank_percent': round(
+                    100 * sum(1 for v in values if v > JANK_THRESHOLD_MS) / len(values), 2
+                ) if values else 0.0,
+                'p50_ms': round(_percentile(values, 50), 2),
+                'p90_ms': round(_percentile(values, 90), 2),
+                'p99_ms': round(_percentile(values, 99), 2),
+                'pss_start_kb': heap[0] if heap else None,
+                'pss_end_kb': heap[-1] if heap else None,
+                'heap_growth_kb': heap[-1] - heap[0] if heap else None
+            }
+        return report
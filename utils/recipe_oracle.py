@@ -0,0 +1,234 @@
+"""Local index of the app's recipe dataset, predicting search results for a selection."""
+
+import bisect
+import csv
+import json
+import os
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional
+
+from utils.constants import FOUND_ONE_RECIPE_MESSAGE, FOUND_RECIPES_MESSAGE_TEMPLATE
+from utils.logger import logger
+from test_settings import RECIPE_INDEX, RECIPE_MATCH
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(__file__))
+MATCH_MODES = ('all', 'any')
+LIST_SEPARATOR = ';'  # Separator of ingredient lists in CSV exports
+
+
+def _key(ingredient: str) -> str:
+    return ingredient.strip().casefold()
+
+
+class RecipePrediction:
+    """Expected result of a recipe search."""
+
+    def __init__(self, dishes: List[str]):
+        """Initialize RecipePrediction.
+
+        Args:
+            dishes: Names of the matching recipes, in dataset order
+        """
+        self.dishes = dishes
+
+    @property
+    def count(self) -> int:
+        """Number of matching recipes."""
+        return len(self.dishes)
+
+    @property
+    def message(self) -> str:
+        """Message the dish list shows for this result."""
+        if self.count == 1:
+            return FOUND_ONE_RECIPE_MESSAGE
+        return FOUND_RECIPES_MESSAGE_TEMPLATE.format(count=self.count)
+
+    def __repr__(self) -> str:
+        return f"RecipePrediction({self.count} recipes: {self.dishes})"
+
+
+def read_export(path: str) -> List[Dict[str, Any]]:
+    """Read recipes from a JSON or CSV export of the app's dataset.
+
+    JSON exports are a list (or {"recipes": [...]}) of {"name", "ingredients",
+    "calories"}; CSV exports have the same columns, with ingredients
+    separated by LIST_SEPARATOR.
+
+    Args:
+        path: Export file
+
+    Returns:
+        Recipes with 'name', 'ingredients' and 'calories'
+
+    Raises:
+        ValueError: If a recipe has no name or no numeric calories
+    """
+    if path.lower().endswith('.csv'):
+        with open(path, 'r', encoding='utf-8', newline='') as f:
+            rows: List[Dict[str, Any]] = list(csv.DictReader(f))
+    else:
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        rows = data['recipes'] if isinstance(data, dict) else data
+
+    recipes = []
+    for number, row in enumerate(rows, 1):
+        ingredients = row.get('ingredients') or []
+        if isinstance(ingredients, str):
+            ingredients = ingredients.split(LIST_SEPARATOR)
+        try:
+            recipes.append({'name': row['name'].strip(),
+                            'ingredients': [item.strip() for item in ingredients if item.strip()],
+                            'calories': float(row['calories'])})
+        except (KeyError, AttributeError, TypeError, ValueError) as e:
+            raise ValueError(f"{path}: recipe {number} is invalid ({e})") from None
+    return recipes
+
+
+class RecipeOracle:
+    """Predict the recipes found for an ingredient selection and calorie cap.
+
+    Recipes are indexed as bitmasks per ingredient, so a query is a few
+    integer intersections; the calorie cap is a prefix of the recipes sorted
+    by calories. The index file is written by `import_export` from an export
+    of the app's dataset and loaded on first use.
+    """
+
+    def __init__(self, path: str = RECIPE_INDEX, match: str = RECIPE_MATCH):
+        """Initialize RecipeOracle.
+
+        Args:
+            path: Index file, relative to the project root
+            match: 'all' if recipes must contain every selected ingredient,
+                'any' if one is enough
+
+        Raises:
+            ValueError: If the match mode is unknown
+        """
+        if match not in MATCH_MODES:
+            raise ValueError(f"Match must be one of {MATCH_MODES}, got {match!r}")
+        self.path = os.path.join(PROJECT_ROOT, path)
+        self.match = match
+        self.max_calories = 0.0
+        self._names: List[str] = []
+        self._ingredients: Dict[str, int] = {}
+        self._calories: List[float] = []
+        self._under_cap: List[int] = [0]
+        self._loaded = False
+
+    @property
+    def available(self) -> bool:
+        """Whether a recipe index was imported."""
+        return self._loaded or os.path.exists(self.path)
+
+    def load(self) -> 'RecipeOracle':
+        """Read the index file and build the bitmasks.
+
+        Returns:
+            The oracle itself
+        """
+        with open(self.path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        self._build(data['recipes'], data.get('max_calories'))
+        logger.debug(f"Loaded {len(self._names)} recipes with "
+                     f"{len(self._ingredients)} ingredients from {self.path}")
+        return self
+
+    def _build(self, recipes: List[Dict[str, Any]], max_calories: Optional[float]) -> None:
+        self._names = [recipe['name'] for recipe in recipes]
+        self._ingredients = {}
+        for position, recipe in enumerate(recipes):
+            for ingredient in recipe['ingredients']:
+                key = _key(ingredient)
+                self._ingredients[key] = self._ingredients.get(key, 0) | 1 << position
+        by_calories = sorted(range(len(recipes)),
+                             key=lambda position: recipes[position]['calories'])
+        self._calories = [recipes[position]['calories'] for position in by_calories]
+        self._under_cap = [0]
+        for position in by_calories:
+            self._under_cap.append(self._under_cap[-1] | 1 << position)
+        self.max_calories = float(max_calories or max(self._calories, default=0.0))
+        self._loaded = True
+
+    def calorie_cap(self, percent: float) -> float:
+        """Convert a calories seek bar position to a calorie cap."""
+        if not self._loaded:
+            self.load()
+        return self.max_calories * percent / 100
+
+    def predict(self, ingredients: Iterable[str],
+                calorie_cap: Optional[float] = None) -> RecipePrediction:
+        """Predict the recipes found for a selection.
+
+        Args:
+            ingredients: Selected ingredients
+            calorie_cap: Maximum calories of a recipe, no cap if None
+
+        Returns:
+            Prediction with the matching dish names
+        """
+        if not self._loaded:
+            self.load()
+        everything = (1 << len(self._names)) - 1
+        keys = {_key(ingredient) for ingredient in ingredients}
+        if self.match == 'all':
+            mask = everything
+            for key in keys:
+                mask &= self._ingredients.get(key, 0)
+        else:
+            mask = 0
+            for key in keys:
+                mask |= self._ingredients.get(key, 0)
+        if calorie_cap is not None:
+            mask &= self._under_cap[bisect.bisect_right(self._calories, calorie_cap)]
+        return RecipePrediction([name for position, name in enumerate(self._names)
+                                 if mask >> position & 1])
+
+    def import_export(self, export_path: str, max_calories: Optional[float] = None) -> int:
+        """Import an export of the app's dataset as the index file.
+
+        Args:
+            export_path: JSON or CSV export (see read_export)
+            max_calories: Calories at the end of the seek bar, defaults to
+                the highest recipe calories
+
+        Returns:
+            Number of imported recipes
+        """
+        recipes = read_export(export_path)
+        self._build(recipes, max_calories)
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        with open(self.path, 'w', encoding='utf-8') as f:
+            json.dump({'source': os.path.basename(export_path),
+                       'imported': datetime.now().isoformat(timespec='seconds'),
+                       'max_calories': self.max_calories,
+                       'recipes': recipes}, f, indent=1)
+        logger.info(f"Imported {len(recipes)} recipes from {export_path} into {self.path}")
+        return len(recipes)
+
+
+# Global oracle, loaded on first prediction
+recipe_oracle = RecipeOracle()
+
+
+if __name__ == '__main__':
+    import sys
+
+    command = sys.argv[1] if len(sys.argv) > 1 else ''
+    if command == 'import' and len(sys.argv) in (3, 4):
+        count = recipe_oracle.import_export(
+            sys.argv[2], float(sys.argv[3]) if len(sys.argv) == 4 else None)
+        print(f"{count} recipes imported into {recipe_oracle.path}")
+    elif command == 'query' and len(sys.argv) > 2:
+        arguments = sys.argv[2:]
+        percent = None
+        if arguments[-1].endswith('%'):
+            percent = float(arguments.pop()[:-1])
+        cap = recipe_oracle.calorie_cap(percent) if percent is not None else None
+        prediction = recipe_oracle.predict(arguments, cap)
+        print(prediction.message)
+        for dish in prediction.dishes:
+            print(f"  {dish}")
+    else:
+        print("Usage: python -m utils.recipe_oracle [import EXPORT [MAX_CALORIES] | "
+              "query INGREDIENT... [PERCENT%]]")
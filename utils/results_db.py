@@ -0,0 +1,367 @@
+"""SQLite database of test results, used for scheduling and trend queries."""
+
+import os
+import re
+import sqlite3
+import statistics
+import subprocess
+import threading
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from test_settings import (
+    APK_NAME,
+    DEVICE_NAME,
+    FLAKY_HISTORY_RUNS,
+    RESULTS_DB
+)
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(__file__))
+
+# (by, value) locator, as in utils.custom_keywords
+LocatorType = Tuple[str, str]
+
+_SHARD_PATTERN = re.compile(r'^\s*(\d+)\s*/\s*(\d+)\s*$')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    started TEXT NOT NULL,
+    finished TEXT,
+    git_commit TEXT,
+    build TEXT,
+    device TEXT,
+    shard TEXT
+);
+CREATE TABLE IF NOT EXISTS tests (
+    run_id INTEGER NOT NULL REFERENCES runs(id),
+    nodeid TEXT NOT NULL,
+    outcome TEXT NOT NULL,
+    duration REAL NOT NULL,
+    reruns INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS steps (
+    run_id INTEGER NOT NULL REFERENCES runs(id),
+    nodeid TEXT NOT NULL,
+    step TEXT NOT NULL,
+    outcome TEXT NOT NULL,
+    duration REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS waits (
+    run_id INTEGER NOT NULL REFERENCES runs(id),
+    nodeid TEXT NOT NULL,
+    locator TEXT NOT NULL,
+    found INTEGER NOT NULL,
+    duration REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS tests_nodeid ON tests(nodeid, run_id);
+"""
+
+
+def get_git_commit() -> Optional[str]:
+    """Get the commit of the working tree, or None outside a git checkout."""
+    try:
+        result = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=PROJECT_ROOT,
+                                capture_output=True, text=True, timeout=10, check=False)
+    except (OSError, subprocess.TimeoutExpired):
+        return None
+    return result.stdout.strip() or None
+
+
+class ResultsDB:
+    """Per-test durations, outcomes, step and wait timings of every run."""
+
+    def __init__(self, path: str = RESULTS_DB):
+        """Initialize ResultsDB.
+
+        Args:
+            path: Database file, relative to the project root
+        """
+        self.path = os.path.join(PROJECT_ROOT, path)
+        self.run_id: Optional[int] = None
+        self._connection: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    @property
+    def exists(self) -> bool:
+        """Check whether the database file exists."""
+        return os.path.exists(self.path)
+
+    @property
+    def connection(self) -> sqlite3.Connection:
+        """Get the database connection, creating the file and schema on first use."""
+        if self._connection is None:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            self._connection = sqlite3.connect(self.path, check_same_thread=False)
+            self._connection.executescript(SCHEMA)
+        return self._connection
+
+    def close(self) -> None:
+        """Close the database connection."""
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+
+    def start_run(self, shard: Optional[str] = None) -> int:
+        """Record the start of a test run.
+
+        Args:
+            shard: Shard of the run (e.g., "1/3"), if sharded
+
+        Returns:
+            Id of the new run
+        """
+        with self._lock, self.connection:
+            cursor = self.connection.execute(
+                "INSERT INTO runs (started, git_commit, build, device, shard) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (datetime.now().isoformat(timespec='seconds'), get_git_commit(),
+                 os.path.splitext(APK_NAME)[0], DEVICE_NAME, shard)
+            )
+        self.run_id = cursor.lastrowid
+        return self.run_id
+
+    def finish_run(self) -> None:
+        """Record the end of the current run."""
+        if self.run_id is None:
+            return
+        with self._lock, self.connection:
+            self.connection.execute("UPDATE runs SET finished = ? WHERE id = ?",
+                                    (datetime.now().isoformat(timespec='seconds'), self.run_id))
+
+    def record_test(self, nodeid: str, outcome: str, duration: float, reruns: int = 0,
+                    steps: Iterable[Dict[str, Any]] = (),
+                    waits: Iterable[Tuple[LocatorType, float, bool]] = ()) -> None:
+        """Record one test of the current run with its step and wait timings.
+
+        Args:
+            nodeid: Test node id
+            outcome: "passed", "failed" or "skipped"
+            duration: Setup, call and teardown time in seconds
+            reruns: Number of reruns before the final outcome
+            steps: Finished step events of the step tracker
+            waits: (locator, duration, found) of every wait_for_visible
+        """
+        if self.run_id is None:
+            self.start_run()
+        with self._lock, self.connection:
+            self.connection.execute(
+                "INSERT INTO tests (run_id, nodeid, outcome, duration, reruns) "
+                "VALUES (?, ?, ?, ?, ?)", (self.run_id, nodeid, outcome, duration, reruns))
+            self.connection.executemany(
+                "INSERT INTO steps (run_id, nodeid, step, outcome, duration) "
+                "VALUES (?, ?, ?, ?, ?)",
+                [(self.run_id, nodeid, step['step'], step['outcome'], step['duration'])
+                 for step in steps])
+            self.connection.executemany(
+                "INSERT INTO waits (run_id, nodeid, locator, found, duration) "
+                "VALUES (?, ?, ?, ?, ?)",
+                [(self.run_id, nodeid, f"{by}={value}", int(found), wait_duration)
+                 for (by, value), wait_duration, found in waits])
+
+    def expected_durations(self, runs: int = FLAKY_HISTORY_RUNS) -> Dict[str, float]:
+        """Get the median duration of each test over its recent runs.
+
+        Args:
+            runs: Number of most recent runs of a test considered
+
+        Returns:
+            Mapping of node id to expected duration in seconds
+        """
+        history = self._history(runs)
+        return {nodeid: statistics.median(duration for _, duration, _ in results)
+                for nodeid, results in history.items()}
+
+    def flaky_tests(self, runs: int = FLAKY_HISTORY_RUNS) -> Dict[str, float]:
+        """Get tests that both passed and failed, or needed reruns, recently.
+
+        Args:
+            runs: Number of most recent runs of a test considered
+
+        Returns:
+            Mapping of node id to its failure rate among those runs
+        """
+        flaky = {}
+        for nodeid, results in self._history(runs).items():
+            outcomes = {outcome for outcome, _, _ in results}
+            failures = sum(outcome == 'failed' for outcome, _, _ in results)
+            if {'passed', 'failed'} <= outcomes or any(reruns for _, _, reruns in results):
+                flaky[nodeid] = failures / len(results)
+        return flaky
+
+    def _history(self, runs: int) -> Dict[str, List[Tuple[str, float, int]]]:
+        if not self.exists:
+            return {}
+        rows = self.connection.execute(
+            "SELECT nodeid, outcome, duration, reruns FROM ("
+            "  SELECT *, ROW_NUMBER() OVER (PARTITION BY nodeid ORDER BY run_id DESC) AS recent"
+            "  FROM tests WHERE outcome != 'skipped'"
+            ") WHERE recent <= ?", (runs,)).fetchall()
+        history: Dict[str, List[Tuple[str, float, int]]] = {}
+        for nodeid, outcome, duration, reruns in rows:
+            history.setdefault(nodeid, []).append((outcome, duration, reruns))
+        return history
+
+    def slowest_tests(self, limit: int = 10) -> List[Tuple[str, float, int]]:
+        """Get the tests with the highest mean duration.
+
+        Returns:
+            (node id, mean duration, number of runs), slowest first
+        """
+        return self.connection.execute(
+            "SELECT nodeid, AVG(duration), COUNT(*) FROM tests WHERE outcome = 'passed' "
+            "GROUP BY nodeid ORDER BY AVG(duration) DESC LIMIT ?", (limit,)).fetchall()
+
+    def slowest_locators(self, limit: int = 10) -> List[Tuple[str, float, int, int]]:
+        """Get the locators whose waits take longest on average.
+
+        Returns:
+            (locator, mean wait duration, number of waits, number of timeouts), slowest first
+        """
+        return self.connection.execute(
+            "SELECT locator, AVG(duration), COUNT(*), SUM(1 - found) FROM waits "
+            "GROUP BY locator ORDER BY AVG(duration) DESC LIMIT ?", (limit,)).fetchall()
+
+    def regressions(self, base_commit: str, head_commit: str,
+                    threshold: float = 0.2) -> List[Tuple[str, float, float, float]]:
+        """Compare mean passed durations of tests and steps between two commits.
+
+        Args:
+            base_commit: Baseline commit (short hash as recorded)
+            head_commit: Commit to compare against the baseline
+            threshold: Minimum relative slowdown reported
+
+        Returns:
+            (test or step, base mean, head mean, relative change), worst first
+        """
+        query = """
+            SELECT name, base, head, (head - base) / base AS change FROM (
+                SELECT name,
+                       AVG(CASE WHEN git_commit LIKE ? || '%' THEN duration END) AS base,
+                       AVG(CASE WHEN git_commit LIKE ? || '%' THEN duration END) AS head
+                FROM (
+                    SELECT nodeid AS name, duration, run_id FROM tests WHERE outcome = 'passed'
+                    UNION ALL
+                    SELECT step AS name, duration, run_id FROM steps WHERE outcome = 'passed'
+                ) JOIN runs ON runs.id = run_id
+                GROUP BY name
+            ) WHERE base > 0 AND head IS NOT NULL AND (head - base) / base >= ?
+            ORDER BY change DESC
+        """
+        return self.connection.execute(query, (base_commit, head_commit, threshold)).fetchall()
+
+
+class ResultsRecorder:
+    """Collect the outcome, duration, steps and waits of each test and store them."""
+
+    def __init__(self, db: ResultsDB):
+        """Initialize ResultsRecorder.
+
+        Args:
+            db: Database the finished tests are written to
+        """
+        self.db = db
+        self._tests: Dict[str, Dict[str, Any]] = {}
+        self._current: Optional[Dict[str, Any]] = None
+
+    def begin(self, nodeid: str) -> None:
+        """Start collecting a test (again, on reruns) and make it the current one."""
+        test = self._tests.setdefault(nodeid, {'outcome': 'passed', 'duration': 0.0,
+                                               'reruns': 0})
+        test['steps'] = []
+        test['waits'] = []
+        self._current = test
+
+    def on_step(self, event: Dict[str, Any]) -> None:
+        """Step tracker listener keeping finished steps of the current test."""
+        if self._current is not None and event['event'] == 'finish':
+            self._current['steps'].append(event)
+
+    def on_wait(self, locator: LocatorType, duration: float, found: bool) -> None:
+        """Wait listener keeping wait_for_visible timings of the current test."""
+        if self._current is not None:
+            self._current['waits'].append((locator, duration, found))
+
+    def add_report(self, report) -> None:
+        """Account for one phase report (setup, call or teardown) of a test."""
+        test = self._tests.setdefault(report.nodeid, {'outcome': 'passed', 'duration': 0.0,
+                                                      'reruns': 0, 'steps': [], 'waits': []})
+        test['duration'] += report.duration
+        if report.outcome == 'rerun':
+            test['reruns'] += 1
+            test['outcome'] = 'passed'
+        elif report.failed:
+            test['outcome'] = 'failed'
+        elif report.skipped and test['outcome'] != 'failed':
+            test['outcome'] = 'skipped'
+
+    def end(self, nodeid: str) -> None:
+        """Write a finished test to the database."""
+        test = self._tests.pop(nodeid, None)
+        if test is None:
+            return
+        if test is self._current:
+            self._current = None
+        self.db.record_test(nodeid, test['outcome'], test['duration'], test['reruns'],
+                            test['steps'], test['waits'])
+
+
+def parse_shard(value: str) -> Tuple[int, int]:
+    """Parse a shard option of the form K/N.
+
+    Args:
+        value: Option value (e.g., "2/3")
+
+    Returns:
+        Tuple of (shard number starting at 1, number of shards)
+
+    Raises:
+        ValueError: If the value is not K/N with 1 <= K <= N
+    """
+    match = _SHARD_PATTERN.match(value)
+    if not match or not 1 <= int(match.group(1)) <= int(match.group(2)):
+        raise ValueError(f"shard must be K/N with 1 <= K <= N, got {value!r}")
+    return int(match.group(1)), int(match.group(2))
+
+
+def balance_shards(durations: Dict[str, float], shards: int) -> List[List[str]]:
+    """Split tests into shards of similar total duration (longest processing time first).
+
+    Ties, such as tests without a known duration, go to the shard with the
+    fewest tests.
+
+    Args:
+        durations: Expected duration of every test
+        shards: Number of shards
+
+    Returns:
+        Node ids of each shard, each longest first
+    """
+    buckets: List[List[str]] = [[] for _ in range(shards)]
+    totals = [0.0] * shards
+    for nodeid in sorted(durations, key=lambda test: (-durations[test], test)):
+        index = min(range(shards), key=lambda i: (totals[i], len(buckets[i])))
+        buckets[index].append(nodeid)
+        totals[index] += durations[nodeid]
+    return buckets
+
+
+# Global results database
+results_db = ResultsDB()
+
+
+if __name__ == '__main__':
+    import sys
+
+    command = sys.argv[1] if len(sys.argv) > 1 else 'slowest'
+    if command == 'slowest':
+        for nodeid, mean, count in results_db.slowest_tests():
+            print(f"{mean:8.2f}s  n={count:<4} {nodeid}")
+    elif command == 'locators':
+        for locator, mean, count, timeouts in results_db.slowest_locators():
+            print(f"{mean:8.2f}s  n={count:<4} timeouts={timeouts:<3} {locator}")
+    elif command == 'regressions' and len(sys.argv) == 4:
+        for name, base, head, change in results_db.regressions(sys.argv[2], sys.argv[3]):
+            print(f"{base:8.2f}s -> {head:8.2f}s  {change:+.0%}  {name}")
+    else:
+        print("Usage: python -m utils.results_db [slowest | locators | regressions BASE HEAD]")
@@ -0,0 +1,211 @@
+"""Static index of screen classes, built by parsing the screens package with ast."""
+
+import ast
+import hashlib
+import json
+import os
+from typing import Any, Dict, List, Optional
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(__file__))
+SCREENS_DIR = os.path.join(PROJECT_ROOT, 'screens')
+TESTS_DIR = os.path.join(PROJECT_ROOT, 'tests')
+
+ScreenIndex = Dict[str, Dict[str, Any]]
+
+
+def file_hash(content: str) -> str:
+    """Get the SHA-256 of file content."""
+    return hashlib.sha256(content.encode('utf-8')).hexdigest()
+
+
+def _annotation_name(annotation: Optional[ast.expr]) -> Optional[str]:
+    """Get the class name from a return annotation like `X`, `'X'` or `Optional[X]`."""
+    if isinstance(annotation, ast.Name):
+        return annotation.id
+    if isinstance(annotation, ast.Constant) and isinstance(annotation.value, str):
+        return annotation.value
+    if isinstance(annotation, ast.Attribute):
+        return annotation.attr
+    if isinstance(annotation, ast.Subscript):
+        return _annotation_name(annotation.slice)
+    return None
+
+
+def member_uses(node: ast.AST, class_name: str) -> Dict[str, List[Any]]:
+    """Collect what a screen method refers to, for dependency tracking.
+
+    Args:
+        node: Method (or class attribute) node
+        class_name: Name of the class defining it
+
+    Returns:
+        'members': [class, member] pairs used through `self.X`, `Class.X`
+        or `Class(...)` (as `__init__`); 'names': other names loaded, to be
+        resolved against the module's imports
+    """
+    members = set()
+    names = set()
+    for child in ast.walk(node):
+        if isinstance(child, ast.Attribute) and isinstance(child.value, ast.Name):
+            owner = child.value.id
+            if owner in ('self', 'cls'):
+                members.add((class_name, child.attr))
+            elif owner[:1].isupper():
+                members.add((owner, child.attr))
+            else:
+                names.add(owner)
+        elif isinstance(child, ast.Call) and isinstance(child.func, ast.Name) \
+                and child.func.id[:1].isupper():
+            members.add((child.func.id, '__init__'))
+        elif isinstance(child, ast.Name) and isinstance(child.ctx, ast.Load):
+            names.add(child.id)
+    names.discard('self')
+    return {'members': sorted([list(member) for member in members]), 'names': sorted(names)}
+
+
+def index_screen_source(content: str, module: str) -> ScreenIndex:
+    """Index the classes defined in one screen module.
+
+    Args:
+        content: Source code of the module
+        module: Module name (e.g., "screens.dish_list_screen")
+
+    Returns:
+        Mapping of class name to its module, methods (with return type, line
+        range and uses) and class attributes (with value source, line range
+        and uses)
+    """
+    index: ScreenIndex = {}
+    for node in ast.parse(content).body:
+        if not isinstance(node, ast.ClassDef):
+            continue
+        methods: Dict[str, Dict[str, Any]] = {}
+        attributes: Dict[str, Dict[str, Any]] = {}
+        for item in node.body:
+            if isinstance(item, (ast.FunctionDef, ast.AsyncFunctionDef)):
+                methods[item.name] = {
+                    'returns': _annotation_name(item.returns),
+                    'lines': [item.lineno, item.end_lineno],
+                    'uses': member_uses(item, node.name)
+                }
+            elif isinstance(item, ast.Assign):
+                for target in item.targets:
+                    if isinstance(target, ast.Name):
+                        attributes[target.id] = {
+                            'value': ast.get_source_segment(content, item.value),
+                            'lines': [item.lineno, item.end_lineno],
+                            'uses': member_uses(item.value, node.name)
+                        }
+        index[node.name] = {
+            'module': module,
+            'lines': [node.lineno, node.end_lineno],
+            'methods': methods,
+            'attributes': attributes
+        }
+    return index
+
+
+def build_screen_index(screens_dir: str = SCREENS_DIR) -> ScreenIndex:
+    """Discover all screen classes without importing the screen modules.
+
+    Args:
+        screens_dir: Directory containing the screen modules
+
+    Returns:
+        Mapping of class name to its index entry (see index_screen_source)
+    """
+    index: ScreenIndex = {}
+    for file_name in sorted(os.listdir(screens_dir)):
+        if not file_name.endswith('.py') or file_name.startswith('__'):
+            continue
+        with open(os.path.join(screens_dir, file_name), 'r', encoding='utf-8') as f:
+            content = f.read()
+        module = f"screens.{file_name[:-3]}"
+        index.update(index_screen_source(content, module))
+    return index
+
+
+def index_signature(index: ScreenIndex) -> str:
+    """Get a hash identifying the public API described by a screen index."""
+    api = {
+        name: {
+            'methods': {m: info['returns'] for m, info in entry['methods'].items()},
+            'attributes': sorted(entry['attributes'])
+        }
+        for name, entry in index.items()
+    }
+    return file_hash(json.dumps(api, sort_keys=True))
+
+
+class ScreenTypeTracker(ast.NodeVisitor):
+    """Walk a test module in source order and resolve which screen each call targets.
+
+    Variables are typed from screen constructors (`SplashScreen(driver)`),
+    from screen methods whose return annotation is a screen
+    (`ingredient_screen.click_on_find_recipe_button()`) and from annotations.
+    """
+
+    def __init__(self, index: ScreenIndex):
+        self.index = index
+        self.var_types: Dict[str, str] = {}
+        self.screen_calls = []
+
+    def expression_type(self, node: ast.expr) -> Optional[str]:
+        """Get the screen class an expression evaluates to, if known."""
+        if isinstance(node, ast.Call):
+            if isinstance(node.func, ast.Name) and node.func.id in self.index:
+                return node.func.id
+            if isinstance(node.func, ast.Attribute):
+                if node.func.attr == 'go_to' and node.args \
+                        and isinstance(node.args[0], ast.Name) and node.args[0].id in self.index:
+                    # Navigator.go_to(ScreenClass) returns an instance of that screen
+                    return node.args[0].id
+                owner = self.expression_type(node.func.value)
+                if owner:
+                    method = self.index[owner]['methods'].get(node.func.attr)
+                    if method and method['returns'] in self.index:
+                        return method['returns']
+        elif isinstance(node, ast.Name):
+            return self.var_types.get(node.id)
+        return None
+
+    def visit_FunctionDef(self, node: ast.FunctionDef) -> None:
+        outer_types = dict(self.var_types)
+        for arg in node.args.args:
+            screen = _annotation_name(arg.annotation)
+            if screen in self.index:
+                self.var_types[arg.arg] = screen
+        self.generic_visit(node)
+        self.var_types = outer_types
+
+    def visit_Assign(self, node: ast.Assign) -> None:
+        self.visit(node.value)
+        screen = self.expression_type(node.value)
+        for target in node.targets:
+            if isinstance(target, ast.Name):
+                if screen:
+                    self.var_types[target.id] = screen
+                else:
+                    self.var_types.pop(target.id, None)
+
+    def visit_AnnAssign(self, node: ast.AnnAssign) -> None:
+        if node.value is not None:
+            self.visit(node.value)
+        screen = _annotation_name(node.annotation)
+        if isinstance(node.target, ast.Name):
+            if screen in self.index:
+                self.var_types[node.target.id] = screen
+            elif node.value is not None and self.expression_type(node.value):
+                self.var_types[node.target.id] = self.expression_type(node.value)
+
+    def visit_Call(self, node: ast.Call) -> None:
+        if isinstance(node.func, ast.Attribute):
+            owner = self.expression_type(node.func.value)
+            if owner:
+                self.screen_calls.append({
+                    'screen': owner,
+                    'method': node.func.attr,
+                    'line': getattr(node, 'lineno', '?'),
+                    'column': getattr(node, 'col_offset', 0)
+                })
+        self.generic_visit(node)
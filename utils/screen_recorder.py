@@ -0,0 +1,193 @@
+"""Screen recording in rolling segments, kept only around failures."""
+
+import os
+import shutil
+import tempfile
+import threading
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from typing import TYPE_CHECKING, Deque, List, Optional, Tuple
+
+from selenium.common.exceptions import WebDriverException
+
+from utils.artifact_collector import artifact_collector, base64_chunks
+from utils.logger import logger
+from test_settings import (
+    ARTIFACTS_DIR,
+    ARTIFACT_ATTACH_TIMEOUT,
+    RECORDING_BIT_RATE,
+    RECORDING_KEEP_SEGMENTS,
+    RECORDING_SEGMENT_SECONDS
+)
+
+if TYPE_CHECKING:
+    from appium.webdriver.webdriver import WebDriver
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(__file__))
+# Longest recording UiAutomator2 allows, in seconds
+MAX_TIME_LIMIT = 1800
+# Extra recording time so a segment never ends before it is rotated
+TIME_LIMIT_MARGIN = 30
+
+
+class ScreenRecorder:
+    """Record the screen in segments and write them to disk in the background.
+
+    Every `segment_seconds` the running recording is stopped and a new one
+    started right away, so only one segment is ever held in memory as
+    base64. A single writer thread decodes segments to disk and deletes all
+    but the last `keep_segments`, keeping disk use flat however long the
+    test runs. `keep` attaches the last segments of a failed test, `stop`
+    discards them. Runs that keep going after a failure, like soak runs,
+    keep with `resume=True` so recording continues.
+    """
+
+    def __init__(self, driver: "WebDriver", segment_seconds: float = RECORDING_SEGMENT_SECONDS,
+                 keep_segments: int = RECORDING_KEEP_SEGMENTS,
+                 bit_rate: int = RECORDING_BIT_RATE):
+        """Initialize ScreenRecorder.
+
+        Args:
+            driver: WebDriver instance whose screen is recorded
+            segment_seconds: Length of a segment in seconds
+            keep_segments: Number of most recent segments kept on disk
+            bit_rate: Video bit rate in bits per second
+        """
+        self.driver = driver
+        self.segment_seconds = segment_seconds
+        self.keep_segments = keep_segments
+        self.bit_rate = bit_rate
+        self.segments = 0
+        self.directory: Optional[str] = None
+        self._saved: Deque[Tuple[str, Future]] = deque()
+        self._kept: List[Future] = []
+        self._recording = False
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._writer: Optional[ThreadPoolExecutor] = None
+
+    def start(self) -> None:
+        """Start recording and rotating segments."""
+        root = os.path.join(PROJECT_ROOT, ARTIFACTS_DIR)
+        os.makedirs(root, exist_ok=True)
+        self.directory = tempfile.mkdtemp(prefix='recording-', dir=root)
+        self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="recording-writer")
+        self._stop.clear()
+        with self._lock:
+            self._start_segment()
+        self._thread = threading.Thread(target=self._run, name="screen-recorder", daemon=True)
+        self._thread.start()
+
+    def _start_segment(self) -> None:
+        try:
+            self.driver.start_recording_screen(
+                timeLimit=min(int(self.segment_seconds) + TIME_LIMIT_MARGIN, MAX_TIME_LIMIT),
+                bitRate=self.bit_rate,
+                forceRestart=True
+            )
+            self._recording = True
+        except WebDriverException as e:
+            self._recording = False
+            logger.warning(f"Screen recording not started: {e}")
+
+    def _stop_segment(self) -> None:
+        """Stop the running recording and hand its video to the writer."""
+        if not self._recording:
+            return
+        self._recording = False
+        try:
+            video = self.driver.stop_recording_screen()
+        except WebDriverException as e:
+            logger.warning(f"Screen recording segment lost: {e}")
+            return
+        if not video:
+            return
+        self.segments += 1
+        path = os.path.join(self.directory, f"segment_{self.segments:04d}.mp4")
+        self._saved.append((path, self._writer.submit(self._write, path, video)))
+        while len(self._saved) > self.keep_segments:
+            old_path, _ = self._saved.popleft()
+            self._writer.submit(self._remove, old_path)
+
+    @staticmethod
+    def _write(path: str, video: str) -> str:
+        with open(path, 'wb') as f:
+            for chunk in base64_chunks(video):
+                f.write(chunk)
+        return path
+
+    @staticmethod
+    def _remove(path: str) -> None:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.segment_seconds):
+            with self._lock:
+                if self._stop.is_set():
+                    break
+                self._stop_segment()
+                self._start_segment()
+
+    def _halt(self) -> None:
+        """Stop rotating and stop the running recording, saving its segment."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.segment_seconds)
+            self._thread = None
+        with self._lock:
+            self._stop_segment()
+
+    def keep(self, test_id: Optional[str] = None,
+             timeout: float = ARTIFACT_ATTACH_TIMEOUT, label: str = "screen recording",
+             resume: bool = False) -> List[Future]:
+        """Attach the most recent segments to a test, stopping the recording unless resumed.
+
+        Args:
+            test_id: Identifier grouping the artifacts, defaults to the running test
+            timeout: Maximum time to wait for segments still being written
+            label: Attachment name prefix, numbered per segment
+            resume: Whether to start a new segment and keep rotating instead of stopping
+
+        Returns:
+            Futures resolving to the attached artifacts
+        """
+        if self._writer is None:
+            return []
+        if resume and not self._stop.is_set():
+            with self._lock:
+                self._stop_segment()
+                self._start_segment()
+        else:
+            self._halt()
+        futures = []
+        saved, self._saved = list(self._saved), deque()
+        for number, (path, write) in enumerate(saved, 1):
+            try:
+                write.result(timeout=timeout)
+            except Exception as e:
+                logger.warning(f"Screen recording segment {path} not written: {e}")
+                continue
+            futures.append(artifact_collector.add_file(
+                f"{label} {number}/{len(saved)}", path, 'video/mp4', 'mp4',
+                test_id=test_id, remove=True))
+        self._kept.extend(futures)
+        logger.info(f"Keeping {len(futures)} screen recording segment(s) of {self.segments}")
+        return futures
+
+    def stop(self) -> None:
+        """Stop recording and delete the segments that were not kept."""
+        if self._writer is None:
+            return
+        self._halt()
+        self._saved.clear()
+        self._writer.shutdown(wait=True)
+        self._writer = None
+        if self._kept:
+            wait(self._kept, timeout=ARTIFACT_ATTACH_TIMEOUT)
+            self._kept = []
+        shutil.rmtree(self.directory, ignore_errors=True)
+        logger.debug(f"Screen recorder stopped after {self.segments} segment(s)")
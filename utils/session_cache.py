@@ -0,0 +1,166 @@
+"""Per-session cache of window metrics, element rects and static element handles."""
+
+import copy
+from collections import Counter
+from typing import TYPE_CHECKING, Any, Callable, Dict, Optional, Tuple
+
+from selenium.common.exceptions import StaleElementReferenceException
+
+from utils.step_tracker import step_tracker
+
+if TYPE_CHECKING:
+    from appium.webdriver.webdriver import WebDriver
+    from selenium.webdriver.remote.webelement import WebElement
+
+LocatorType = Tuple[str, str]
+
+# Commands answered from the cache
+WINDOW_COMMANDS = ('getWindowRect', 'getWindowSize')
+RECT_COMMAND = 'getElementRect'
+# Commands changing the window metrics
+ORIENTATION_COMMANDS = ('setScreenOrientation', 'setScreenRotation')
+# Prefixes of commands that do not change the UI; any other command
+# (gestures, clicks, key presses, scripts) may move elements
+READ_ONLY_PREFIXES = ('get', 'is', 'find', 'query', 'status', 'screenshot', 'elementScreenshot')
+
+
+class SessionCache:
+    """Answer repeated metadata queries of a session without round trips.
+
+    Once attached, the driver's `execute` is wrapped so that window size
+    queries are served from the cache until the orientation is changed, and
+    element rects until a command that may change the UI is sent. Element
+    handles of static locators (see `wait_for_visible(..., cache=True)`) are
+    kept until the screen changes or the handle goes stale. Everything is
+    dropped when the driver gets a new session.
+    """
+
+    def __init__(self):
+        """Initialize SessionCache with empty caches."""
+        self.hits: Counter = Counter()
+        self.misses: Counter = Counter()
+        self.driver: Optional["WebDriver"] = None
+        self._execute: Optional[Callable] = None
+        self._session_id: Optional[str] = None
+        self._screen: Optional[str] = None
+        self._window: Dict[str, Dict[str, Any]] = {}
+        self._rects: Dict[str, Dict[str, Any]] = {}
+        self._elements: Dict[LocatorType, "WebElement"] = {}
+
+    def attach(self, driver: "WebDriver") -> None:
+        """Wrap a driver's commands and follow its screen transitions.
+
+        Args:
+            driver: WebDriver instance whose queries are cached
+        """
+        if self.driver is not None:
+            self.detach()
+        self.driver = driver
+        self._execute = driver.execute
+        driver.execute = self._cached_execute
+        self.clear()
+        self.hits.clear()
+        self.misses.clear()
+        step_tracker.add_listener(self._on_step)
+
+    def detach(self) -> None:
+        """Restore the driver's commands and drop all cached entries."""
+        if self.driver is None:
+            return
+        step_tracker.remove_listener(self._on_step)
+        self.driver.execute = self._execute
+        self.driver, self._execute = None, None
+        self.clear()
+
+    def clear(self) -> None:
+        """Drop all cached entries."""
+        self._window.clear()
+        self.invalidate_elements()
+        self._session_id = self.driver.session_id if self.driver else None
+
+    def invalidate_elements(self) -> None:
+        """Drop cached element handles and rects, e.g. after a screen transition."""
+        self._rects.clear()
+        self._elements.clear()
+
+    def _forget_element(self, element_id: Optional[str]) -> None:
+        self._rects.pop(element_id, None)
+        for locator, element in list(self._elements.items()):
+            if element.id == element_id:
+                del self._elements[locator]
+
+    def _on_step(self, event: Dict[str, Any]) -> None:
+        if event['event'] == 'start' and event['screen'] != self._screen:
+            self._screen = event['screen']
+            self.invalidate_elements()
+
+    def _cached_execute(self, driver_command: str, params: Optional[Dict] = None) -> Dict:
+        if self.driver.session_id != self._session_id:
+            self.clear()
+        if driver_command in WINDOW_COMMANDS:
+            return self._cached(self._window, driver_command, 'window', driver_command, params)
+        element_id = (params or {}).get('id')
+        if driver_command == RECT_COMMAND and element_id:
+            return self._cached(self._rects, element_id, 'rect', driver_command, params)
+
+        if not driver_command.startswith(READ_ONLY_PREFIXES):
+            self._rects.clear()
+        if driver_command in ORIENTATION_COMMANDS:
+            self._window.clear()
+        try:
+            return self._execute(driver_command, params)
+        except StaleElementReferenceException:
+            self._forget_element(element_id)
+            raise
+
+    def _cached(self, cache: Dict[str, Dict[str, Any]], key: str, kind: str,
+                driver_command: str, params: Optional[Dict]) -> Dict:
+        if key in cache:
+            self.hits[kind] += 1
+            return copy.deepcopy(cache[key])
+        self.misses[kind] += 1
+        try:
+            response = self._execute(driver_command, params)
+        except StaleElementReferenceException:
+            self._forget_element(key)
+            raise
+        cache[key] = copy.deepcopy(response)
+        return response
+
+    def get_element(self, locator: LocatorType) -> Optional["WebElement"]:
+        """Get the cached handle of a static element.
+
+        Args:
+            locator: Tuple of (by, value)
+
+        Returns:
+            The element found earlier on the current screen, or None
+        """
+        element = self._elements.get(locator)
+        if element is None:
+            self.misses['element'] += 1
+        else:
+            self.hits['element'] += 1
+        return element
+
+    def put_element(self, locator: LocatorType, element: "WebElement") -> None:
+        """Remember the handle of a static element until the screen changes."""
+        if self.driver is not None:
+            self._elements[locator] = element
+
+    def forget_element(self, locator: LocatorType) -> None:
+        """Drop a cached handle that no longer matches the screen."""
+        self._elements.pop(locator, None)
+
+    def stats(self) -> Dict[str, Any]:
+        """Get hit and miss counts per kind; every hit is a saved round trip."""
+        stats: Dict[str, Any] = {
+            kind: {'hits': self.hits[kind], 'misses': self.misses[kind]}
+            for kind in ('window', 'rect', 'element')
+        }
+        stats['saved_round_trips'] = sum(self.hits.values())
+        return stats
+
+
+# Global session cache shared by keywords and screen objects
+session_cache = SessionCache()
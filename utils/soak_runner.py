@@ -0,0 +1,284 @@
+"""Soak/endurance runner repeating a flow on one warm session."""
+
+import json
+import math
+import os
+import statistics
+from collections import deque
+from datetime import datetime
+from time import perf_counter, time
+from typing import TYPE_CHECKING, Any, Deque, Dict, List, Optional
+
+from appium.webdriver.webdriver import WebDriver
+from selenium.common.exceptions import TimeoutException
+
+from flows.recipe_flows import FlowType
+from screens.ingredient_selection_screen import IngredientSelectionScreen
+from utils.appium_launcher import appium_server
+from utils.custom_keywords import wait_for_visible
+from utils.driver_factory import reset_app
+from utils.logger import logger
+from utils.perf_sampler import AdbDumpsysSource, parse_meminfo
+from utils.test_helpers import format_duration
+from utils.transition_timer import get_build_id
+from test_settings import (
+    PERF_RESULTS_DIR,
+    SOAK_RESET,
+    SOAK_WINDOW,
+    SOAK_LATENCY_INCREASE,
+    SOAK_MEMORY_GROWTH_KB,
+    SOAK_Z_THRESHOLD
+)
+
+if TYPE_CHECKING:
+    from utils.screen_recorder import ScreenRecorder
+
+RESET_STRATEGIES = ('back', 'clear')
+BACK_PRESSES = 3  # Back presses tried to reach ingredient selection from any screen
+BACK_TIMEOUT = 5  # Seconds for the ingredient selection screen to appear after a back press
+
+
+def welch_z(baseline: List[float], recent: List[float]) -> float:
+    """Welch's t statistic for recent mean being greater than baseline mean.
+
+    With the window sizes used here the statistic is compared against a
+    normal quantile.
+
+    Args:
+        baseline: Values from the start of the run
+        recent: Values from the end of the run
+
+    Returns:
+        The test statistic, 0.0 if it cannot be computed
+    """
+    if len(baseline) < 2 or len(recent) < 2:
+        return 0.0
+    variance = (statistics.variance(baseline) / len(baseline)
+                + statistics.variance(recent) / len(recent))
+    if variance == 0:
+        return 0.0
+    return (statistics.mean(recent) - statistics.mean(baseline)) / math.sqrt(variance)
+
+
+def slope_z(values: List[float]) -> float:
+    """Statistic for a positive linear trend of values over their index.
+
+    Args:
+        values: Values in sampling order
+
+    Returns:
+        Slope divided by its standard error, 0.0 if it cannot be computed
+    """
+    n = len(values)
+    if n < 3:
+        return 0.0
+    xs = list(range(n))
+    slope, intercept = statistics.linear_regression(xs, values)
+    residuals = sum((y - (slope * x + intercept)) ** 2 for x, y in zip(xs, values))
+    x_mean = statistics.mean(xs)
+    sxx = sum((x - x_mean) ** 2 for x in xs)
+    if residuals == 0:
+        return math.inf if slope > 0 else 0.0
+    standard_error = math.sqrt(residuals / (n - 2) / sxx)
+    return slope / standard_error
+
+
+def _describe(error: Exception) -> str:
+    """Get the type and first line of an error, as recorded per iteration."""
+    return f"{type(error).__name__}: {str(error).splitlines()[0] if str(error) else ''}"
+
+
+class SoakRunner:
+    """Repeat a flow for a number of iterations or a duration and watch for degradation.
+
+    Memory use of the runner stays constant: only the baseline and the most
+    recent windows are kept, every iteration is streamed to a JSON lines file.
+
+    With the 'back' reset the app process lives through the whole run, so
+    leaks build up in the memory trend; the flow must then start from the
+    screen it finds (e.g. warm_full_flow). When going back fails, or with
+    the 'clear' reset, the app is restarted with cleared data.
+    """
+
+    def __init__(self, driver: WebDriver, flow: FlowType, iterations: Optional[int] = None,
+                 duration: Optional[float] = None, memory_source=None,
+                 recorder: Optional["ScreenRecorder"] = None, reset: str = SOAK_RESET):
+        """Initialize SoakRunner.
+
+        Args:
+            driver: Warm WebDriver session reused by all iterations
+            flow: Flow callable receiving the driver
+            iterations: Maximum number of iterations
+            duration: Maximum run time in seconds
+            memory_source: Object providing meminfo(), defaults to AdbDumpsysSource
+            recorder: Running screen recorder whose last segments are kept
+                for every failed iteration
+            reset: Reset between iterations, one of RESET_STRATEGIES
+
+        Raises:
+            ValueError: If neither iterations nor duration is given, or the
+                reset strategy is unknown
+        """
+        if not iterations and not duration:
+            raise ValueError("Either iterations or duration must be set")
+        if reset not in RESET_STRATEGIES:
+            raise ValueError(f"Reset must be one of {RESET_STRATEGIES}, got {reset!r}")
+        self.driver = driver
+        self.flow = flow
+        self.iterations = iterations
+        self.duration = duration
+        self.memory_source = memory_source or AdbDumpsysSource()
+        self.recorder = recorder
+        self.reset = reset
+        self.baseline: List[float] = []
+        self.recent: Deque[float] = deque(maxlen=SOAK_WINDOW)
+        self.memory: Deque[int] = deque(maxlen=SOAK_WINDOW * 4)
+        self.stats: Dict[str, Any] = {'iterations': 0, 'passed': 0, 'failed': 0,
+                                      'stop_reason': None, 'failures': {}, 'clears': 0}
+
+    def _results_file(self) -> str:
+        results_dir = os.path.join(
+            os.path.dirname(os.path.dirname(__file__)), PERF_RESULTS_DIR, 'soak'
+        )
+        os.makedirs(results_dir, exist_ok=True)
+        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        return os.path.join(results_dir, f"{get_build_id()}_{timestamp}.jsonl")
+
+    def _sample_memory(self) -> Optional[int]:
+        try:
+            return parse_meminfo(self.memory_source.meminfo()).get('total_pss_kb')
+        except Exception as e:
+            logger.warning(f"Failed to read meminfo during soak: {e}")
+            return None
+
+    def check_degradation(self) -> Optional[str]:
+        """Check whether latency or memory degraded significantly.
+
+        Returns:
+            Description of the degradation, or None if none was detected
+        """
+        if len(self.baseline) == SOAK_WINDOW and len(self.recent) == SOAK_WINDOW:
+            recent = list(self.recent)
+            increase = statistics.mean(recent) / statistics.mean(self.baseline) - 1
+            z = welch_z(self.baseline, recent)
+            if z > SOAK_Z_THRESHOLD and increase > SOAK_LATENCY_INCREASE:
+                return f"latency increased by {increase:.0%} (z={z:.1f})"
+
+        if len(self.memory) >= SOAK_WINDOW:
+            memory = list(self.memory)
+            growth = memory[-1] - memory[0]
+            z = slope_z(memory)
+            if z > SOAK_Z_THRESHOLD and growth > SOAK_MEMORY_GROWTH_KB:
+                return f"memory grew by {growth} KB over {len(memory)} iterations (z={z:.1f})"
+        return None
+
+    def run(self) -> Dict[str, Any]:
+        """Run the soak loop.
+
+        Returns:
+            Dict with iteration, pass and failure counts, failure counts per
+            exception type, the number of app restarts ('clears'), the stop
+            reason and the results file
+        """
+        results_file = self._results_file()
+        self.stats['results_file'] = results_file
+        forward_output = appium_server.forward_output
+        appium_server.forward_output = False
+        start = time()
+        logger.info(f"Soak run started (iterations={self.iterations}, duration={self.duration})")
+
+        try:
+            with open(results_file, 'a', encoding='utf-8') as f:
+                while True:
+                    if self.iterations and self.stats['iterations'] >= self.iterations:
+                        self.stats['stop_reason'] = 'iterations reached'
+                        break
+                    if self.duration and time() - start >= self.duration:
+                        self.stats['stop_reason'] = 'duration reached'
+                        break
+
+                    record = self._run_iteration()
+                    f.write(json.dumps(record) + '\n')
+                    f.flush()
+
+                    degradation = self.check_degradation()
+                    if degradation:
+                        logger.warning(f"Stopping soak run early: {degradation}")
+                        self.stats['stop_reason'] = degradation
+                        break
+        finally:
+            appium_server.forward_output = forward_output
+
+        self.stats['elapsed'] = time() - start
+        logger.info(
+            f"Soak run finished: {self.stats['passed']}/{self.stats['iterations']} passed "
+            f"in {format_duration(self.stats['elapsed'])} ({self.stats['stop_reason']})"
+        )
+        return self.stats
+
+    def _run_iteration(self) -> Dict[str, Any]:
+        index = self.stats['iterations'] + 1
+        record: Dict[str, Any] = {'iteration': index,
+                                  'timestamp': datetime.now().isoformat(timespec='seconds')}
+        iteration_start = perf_counter()
+        error: Optional[str] = None
+        failure: Optional[Exception] = None
+        try:
+            self.flow(self.driver)
+        except Exception as e:
+            error, failure = _describe(e), e
+        record['latency'] = round(perf_counter() - iteration_start, 3)
+
+        # Sampled before a 'clear' reset restarts the app
+        pss = self._sample_memory()
+        if pss is not None:
+            record['total_pss_kb'] = pss
+            self.memory.append(pss)
+
+        # A failed reset fails the iteration, the next one runs on whatever screen is left
+        try:
+            record['reset'] = self._reset()
+        except Exception as e:
+            if failure is None:
+                error, failure = f"reset: {_describe(e)}", e
+
+        self.stats['iterations'] = index
+        if failure is None:
+            record['outcome'] = 'passed'
+            self.stats['passed'] += 1
+            if len(self.baseline) < SOAK_WINDOW:
+                self.baseline.append(record['latency'])
+            else:
+                self.recent.append(record['latency'])
+        else:
+            record['outcome'] = 'failed'
+            record['error'] = error
+            self.stats['failed'] += 1
+            failures = self.stats['failures']
+            failures[type(failure).__name__] = failures.get(type(failure).__name__, 0) + 1
+            logger.error(f"Soak iteration {index} failed: {record['error']}")
+            if self.recorder:
+                self.recorder.keep(label=f"soak iteration {index} screen recording", resume=True)
+        return record
+
+    def _reset(self) -> str:
+        """Go back to ingredient selection, restarting the app if that fails or is not wanted.
+
+        Returns:
+            The reset that was done, 'back' or 'clear'
+        """
+        if self.reset == 'back':
+            if self.driver.find_elements(*IngredientSelectionScreen.TITLE):
+                return 'back'
+            for _ in range(BACK_PRESSES):
+                self.driver.back()
+                try:
+                    wait_for_visible(self.driver, IngredientSelectionScreen.TITLE,
+                                     timeout=BACK_TIMEOUT, is_scrollable=False)
+                    return 'back'
+                except TimeoutException:
+                    continue
+            logger.warning("Back to ingredient selection failed, restarting the app")
+        self.stats['clears'] += 1
+        reset_app(self.driver)
+        return 'clear'
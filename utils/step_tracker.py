@@ -0,0 +1,121 @@
+"""Tracking of the screen-object method currently being executed."""
+
+import functools
+import threading
+from time import perf_counter
+from typing import Any, Callable, Dict, List, Optional
+
+from utils.logger import logger
+
+StepListener = Callable[[Dict[str, Any]], None]
+
+
+class StepTracker:
+    """Keep track of running screen steps and notify listeners about them."""
+
+    def __init__(self):
+        """Initialize StepTracker with an empty step stack."""
+        self._lock = threading.Lock()
+        self._stack: List[str] = []
+        self._listeners: List[StepListener] = []
+        self.current_screen: Optional[str] = None
+
+    @property
+    def current_step(self) -> Optional[str]:
+        """Get the innermost running step (e.g., "DishListScreen.click_see_recipe_button")."""
+        with self._lock:
+            return self._stack[-1] if self._stack else None
+
+    def add_listener(self, listener: StepListener) -> None:
+        """Register a callable receiving step events.
+
+        Args:
+            listener: Callable receiving a dict with 'event', 'screen', 'method',
+                'step' and, for finished steps, 'outcome', 'duration' and 'error'
+        """
+        with self._lock:
+            if listener not in self._listeners:
+                self._listeners.append(listener)
+
+    def remove_listener(self, listener: StepListener) -> None:
+        """Unregister a previously added listener."""
+        with self._lock:
+            if listener in self._listeners:
+                self._listeners.remove(listener)
+
+    def reset(self) -> None:
+        """Forget running steps and the current screen, e.g. between tests."""
+        with self._lock:
+            self._stack.clear()
+            self.current_screen = None
+
+    def start(self, screen: str, method: str) -> None:
+        """Mark a screen step as started."""
+        step = f"{screen}.{method}"
+        with self._lock:
+            self._stack.append(step)
+            self.current_screen = screen
+        self._notify({'event': 'start', 'screen': screen, 'method': method, 'step': step})
+
+    def finish(self, screen: str, method: str, duration: float,
+               error: Optional[BaseException] = None) -> None:
+        """Mark a screen step as finished."""
+        step = f"{screen}.{method}"
+        with self._lock:
+            if step in self._stack:
+                del self._stack[len(self._stack) - 1 - self._stack[::-1].index(step)]
+        self._notify({
+            'event': 'finish',
+            'screen': screen,
+            'method': method,
+            'step': step,
+            'outcome': 'failed' if error else 'passed',
+            'duration': duration,
+            'error': error
+        })
+
+    def _notify(self, event: Dict[str, Any]) -> None:
+        """Send an event to all listeners, never letting a listener break a step."""
+        with self._lock:
+            listeners = list(self._listeners)
+        for listener in listeners:
+            try:
+                listener(event)
+            except Exception as e:
+                logger.warning(f"Step listener failed on {event['step']}: {e}")
+
+
+# Global step tracker shared by all screen objects
+step_tracker = StepTracker()
+
+
+def _track(screen: str, method: str, func: Callable) -> Callable:
+    """Wrap a screen method so that it reports start and finish to the step tracker."""
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        step_tracker.start(screen, method)
+        start = perf_counter()
+        try:
+            result = func(*args, **kwargs)
+        except BaseException as e:
+            step_tracker.finish(screen, method, perf_counter() - start, e)
+            raise
+        step_tracker.finish(screen, method, perf_counter() - start)
+        return result
+    return wrapper
+
+
+def track_screen_steps(cls: type) -> type:
+    """Class decorator reporting every public method and __init__ as a screen step.
+
+    Args:
+        cls: Screen object class
+
+    Returns:
+        The same class with its methods wrapped
+    """
+    for name, attr in list(vars(cls).items()):
+        if callable(attr) and (name == '__init__' or not name.startswith('_')):
+            method = 'open' if name == '__init__' else name
+            setattr(cls, name, _track(cls.__name__, method, attr))
+    return cls
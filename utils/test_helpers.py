@@ -4,119 +4,151 @@ import subprocess
 import time
 import ast
 import difflib
+import json
 import os
-from typing import List, Dict, Any
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Dict, Any, Optional, Tuple
 
 from utils.logger import logger
+from utils.screen_index import (
+    TESTS_DIR,
+    ScreenIndex,
+    ScreenTypeTracker,
+    build_screen_index,
+    file_hash,
+    index_signature
+)
 from test_settings import (
     DEVICE_NAME,
     AVD_NAME,
-    EMULATOR_BOOT_TIMEOUT
+    CACHE_DIR,
+    EMULATOR_BOOT_TIMEOUT,
+    VALIDATOR_PARALLEL_THRESHOLD
 )
 
+def _find_closest_method(wrong_method: str, available_methods: List[str]) -> str:
+    """Find the closest matching method name using string similarity."""
+    if not available_methods:
+        return ""
+    closest = difflib.get_close_matches(wrong_method, available_methods, n=1, cutoff=0.6)
+    return closest[0] if closest else ""
+
+
+def analyze_test_file(file_name: str, content: str, index: ScreenIndex) -> List[Dict[str, Any]]:
+    """Find calls to methods that do not exist on the screen they are called on.
+    
+    Args:
+        file_name: Test file name used in error reports
+        content: Source code of the test file
+        index: Screen index from build_screen_index
+        
+    Returns:
+        List of error dicts with file, line, column, screen, method and suggestion
+    """
+    try:
+        tracker = ScreenTypeTracker(index)
+        tracker.visit(ast.parse(content))
+    except Exception as e:
+        return [{'file': file_name, 'error': f"Failed to analyze file: {str(e)}"}]
+
+    file_errors = []
+    for call in tracker.screen_calls:
+        entry = index[call['screen']]
+        if call['method'] in entry['methods'] or call['method'] in entry['attributes']:
+            continue
+        available_methods = [m for m in entry['methods'] if not m.startswith('_')]
+        closest_match = _find_closest_method(call['method'], available_methods)
+        file_errors.append({
+            'file': file_name,
+            'line': call['line'],
+            'column': call['column'],
+            'screen': call['screen'],
+            'method': call['method'],
+            'suggestion': f"\n   💡 Did you mean: {closest_match}?" if closest_match else ""
+        })
+    return file_errors
+
+
+def _analyze_job(job: Tuple[str, str, ScreenIndex]) -> List[Dict[str, Any]]:
+    """Process pool entry point for analyze_test_file."""
+    return analyze_test_file(*job)
+
+
 class ScreenValidator:
-    """Validate test files against screen class methods."""
+    """Validate test files against screen class methods.
+    
+    Screen classes are discovered by parsing `screens/`. Results are cached per
+    test file by content hash and invalidated when the screens' API changes, so
+    only new or modified test files are analyzed.
+    """
     
-    def __init__(self):
+    def __init__(self, cache_file: Optional[str] = None):
         self.validation_result = {"errors": None, "validated": False}
-        
-    def validate_all_test_files(self) -> None:
-        """Validate all test files and screen classes for potential issues."""
-        from screens import (
-            dish_list_screen, 
-            dish_detail_screen, 
-            ingredient_selection_screen, 
-            splash_screen
+        self.cache_file = cache_file or os.path.join(
+            os.path.dirname(os.path.dirname(__file__)), CACHE_DIR, 'screen_validator.json'
         )
         
-        screens = {
-            'DishListScreen': dish_list_screen.DishListScreen,
-            'DishDetailScreen': dish_detail_screen.DishDetailScreen,
-            'IngredientSelectionScreen': ingredient_selection_screen.IngredientSelectionScreen,
-            'SplashScreen': splash_screen.SplashScreen
-        }
+    def _load_cache(self, signature: str) -> Dict[str, Any]:
+        try:
+            with open(self.cache_file, 'r', encoding='utf-8') as f:
+                cache = json.load(f)
+            if cache.get('signature') == signature:
+                return cache['files']
+        except (OSError, ValueError, KeyError):
+            pass
+        return {}
+    
+    def _save_cache(self, signature: str, files: Dict[str, Any]) -> None:
+        try:
+            os.makedirs(os.path.dirname(self.cache_file), exist_ok=True)
+            with open(self.cache_file, 'w', encoding='utf-8') as f:
+                json.dump({'signature': signature, 'files': files}, f)
+        except OSError as e:
+            logger.warning(f"Failed to write validation cache: {e}")
         
-        validation_errors = []
-        test_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'tests')
+    def validate_all_test_files(self, test_dir: str = TESTS_DIR) -> None:
+        """Validate all test files and screen classes for potential issues.
         
-        def find_closest_method(wrong_method: str, available_methods: list) -> str:
-            """Find the closest matching method name using string similarity."""
-            if not available_methods:
-                return ""
-            closest = difflib.get_close_matches(wrong_method, available_methods, n=1, cutoff=0.6)
-            return closest[0] if closest else ""
+        Args:
+            test_dir: Directory containing the test files
+        """
+        index = build_screen_index()
+        signature = index_signature(index)
+        cached = self._load_cache(signature)
         
-        for test_file in os.listdir(test_dir):
-            if not test_file.endswith('.py'):
-                continue
-                
-            file_path = os.path.join(test_dir, test_file)
-            try:
+        files: Dict[str, Any] = {}
+        jobs = []
+        for root, _, names in os.walk(test_dir):
+            for name in sorted(names):
+                if not name.endswith('.py'):
+                    continue
+                file_path = os.path.join(root, name)
+                test_file = os.path.relpath(file_path, test_dir).replace(os.sep, '/')
                 with open(file_path, 'r', encoding='utf-8') as f:
                     content = f.read()
-                    
-                tree = ast.parse(content)
-                var_to_screen = {}
-                file_errors = []
-                
-                # First walk: collect variable assignments
-                for node in ast.walk(tree):
-                    if isinstance(node, ast.Assign):
-                        for target in node.targets:
-                            if isinstance(target, ast.Name) and isinstance(node.value, ast.Call):
-                                if isinstance(node.value.func, ast.Name):
-                                    screen_name = node.value.func.id
-                                    if screen_name in screens:
-                                        var_to_screen[target.id] = screen_name
-                                        
-                # Second walk: analyze method calls
-                for node in ast.walk(tree):
-                    if isinstance(node, ast.Call) and isinstance(node.func, ast.Attribute):
-                        if isinstance(node.func.value, ast.Name):
-                            var_name = node.func.value.id
-                            method_name = node.func.attr
-                            
-                            if var_name in var_to_screen:
-                                screen_name = var_to_screen[var_name]
-                                screen_class = screens[screen_name]
-                                
-                                if not hasattr(screen_class, method_name):
-                                    line_no = getattr(node, 'lineno', '?')
-                                    col_offset = getattr(node, 'col_offset', 0)
-                                    
-                                    available_methods = [m for m in dir(screen_class) 
-                                                      if not m.startswith('_')]
-                                    closest_match = find_closest_method(method_name, available_methods)
-                                    
-                                    suggestion = f"\n   💡 Did you mean: {closest_match}?" if closest_match else ""
-                                    
-                                    error = {
-                                        'file': test_file,
-                                        'line': line_no,
-                                        'column': col_offset,
-                                        'screen': screen_name,
-                                        'method': method_name,
-                                        'suggestion': suggestion
-                                    }
-                                    file_errors.append(error)
-                                    
-                if file_errors:
-                    validation_errors.append({
-                        'file': test_file,
-                        'errors': file_errors
-                    })
-                                    
-            except Exception as e:
-                validation_errors.append({
-                    'file': test_file,
-                    'errors': [{
-                        'file': test_file,
-                        'error': f"Failed to analyze file: {str(e)}"
-                    }]
-                })
-                    
+                content_hash = file_hash(content)
+                if cached.get(test_file, {}).get('hash') == content_hash:
+                    files[test_file] = cached[test_file]
+                else:
+                    files[test_file] = {'hash': content_hash, 'errors': []}
+                    jobs.append((test_file, content, index))
+        
+        if len(jobs) >= VALIDATOR_PARALLEL_THRESHOLD:
+            with ProcessPoolExecutor() as executor:
+                results = list(executor.map(_analyze_job, jobs))
+        else:
+            results = [_analyze_job(job) for job in jobs]
+        for (test_file, _, _), file_errors in zip(jobs, results):
+            files[test_file]['errors'] = file_errors
+        
+        logger.debug(f"Validated {len(jobs)} changed of {len(files)} test files")
+        self._save_cache(signature, files)
+        
         self.validation_result["validated"] = True
-        self.validation_result["errors"] = validation_errors
+        self.validation_result["errors"] = [
+            {'file': test_file, 'errors': entry['errors']}
+            for test_file, entry in files.items() if entry['errors']
+        ]
         
     def format_validation_errors(self) -> str:
         """Format validation errors into a readable message."""
@@ -0,0 +1,163 @@
+"""Screen transition latency measurement for screen objects."""
+
+import json
+import os
+import statistics
+import threading
+from datetime import datetime
+from time import perf_counter, sleep
+from typing import TYPE_CHECKING, Any, Dict, List
+
+from selenium.common.exceptions import TimeoutException, WebDriverException
+
+from utils.custom_keywords import LocatorType, run_wait_guards
+from utils.logger import logger
+from test_settings import APK_NAME, PERF_RESULTS_DIR, TRANSITION_POLL_FREQUENCY
+
+if TYPE_CHECKING:
+    from appium.webdriver.webdriver import WebDriver
+    from selenium.webdriver.remote.webelement import WebElement
+
+
+def get_build_id() -> str:
+    """Get the identifier of the app build under test.
+
+    Returns:
+        The APK file name without extension (e.g., "app-release-1.0")
+    """
+    return os.path.splitext(os.path.basename(APK_NAME))[0]
+
+
+class TransitionTimer:
+    """Record the time from a triggering tap to the destination screen's anchor element."""
+
+    def __init__(self):
+        """Initialize an empty TransitionTimer."""
+        self.records: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+
+    def measure(self, driver: "WebDriver", name: str, trigger: "WebElement",
+                anchor: LocatorType, timeout: float = 60,
+                poll_frequency: float = TRANSITION_POLL_FREQUENCY) -> float:
+        """Tap the trigger element and time until the anchor element is visible.
+
+        The clock starts right before the tap is sent. Each poll is a full
+        find round trip, so the duration of the last poll is recorded as the
+        resolution of the measurement.
+
+        Args:
+            driver: WebDriver instance
+            name: Transition name (e.g., "IngredientSelectionScreen->DishListScreen")
+            trigger: Already located element whose tap starts the transition
+            anchor: Locator of the first element identifying the destination screen
+            timeout: Maximum time to wait for the anchor in seconds
+            poll_frequency: Pause between polls in seconds
+
+        Returns:
+            Transition duration in seconds
+
+        Raises:
+            TimeoutException: If the anchor is not visible within timeout
+            AppCrashError: If a wait guard detects that the app crashed
+        """
+        start = perf_counter()
+        trigger.click()
+        tap_duration = perf_counter() - start
+        polls = 0
+
+        while True:
+            poll_start = perf_counter()
+            polls += 1
+            try:
+                if driver.find_element(*anchor).is_displayed():
+                    end = perf_counter()
+                    duration = end - start
+                    self._record(name, "passed", duration, tap_duration, end - poll_start, polls)
+                    logger.info(f"Transition {name}: {duration:.3f}s")
+                    return duration
+            except WebDriverException:
+                pass
+
+            try:
+                run_wait_guards(driver)
+            except Exception:
+                self._record(name, "crash", perf_counter() - start, tap_duration,
+                             perf_counter() - poll_start, polls)
+                raise
+            if perf_counter() - start >= timeout:
+                self._record(name, "timeout", perf_counter() - start, tap_duration,
+                             perf_counter() - poll_start, polls)
+                raise TimeoutException(
+                    f"Transition {name} did not reach {anchor} after {timeout} seconds"
+                )
+            sleep(poll_frequency)
+
+    def _record(self, name: str, outcome: str, duration: float, tap_duration: float,
+                resolution: float, polls: int) -> None:
+        """Store a single transition measurement."""
+        with self._lock:
+            self.records.append({
+                'build': get_build_id(),
+                'transition': name,
+                'outcome': outcome,
+                'duration': round(duration, 4),
+                'tap_duration': round(tap_duration, 4),
+                'resolution': round(resolution, 4),
+                'polls': polls,
+                'timestamp': datetime.now().isoformat(timespec='seconds')
+            })
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """Summarize passed transitions by name.
+
+        Returns:
+            Mapping of transition name to count, min, median, p90 and max in seconds
+        """
+        durations: Dict[str, List[float]] = {}
+        with self._lock:
+            for record in self.records:
+                if record['outcome'] == 'passed':
+                    durations.setdefault(record['transition'], []).append(record['duration'])
+
+        result = {}
+        for name, values in durations.items():
+            values.sort()
+            result[name] = {
+                'count': len(values),
+                'min': values[0],
+                'median': statistics.median(values),
+                'p90': values[min(len(values) - 1, int(len(values) * 0.9))],
+                'max': values[-1]
+            }
+        return result
+
+    def export(self) -> str:
+        """Append recorded transitions to the per-build results file.
+
+        Records are written as JSON lines to
+        ``<PERF_RESULTS_DIR>/transitions/<build>.jsonl`` so results of several
+        sessions for the same build accumulate and builds can be compared.
+
+        Returns:
+            Path of the results file, or an empty string if nothing was recorded
+        """
+        with self._lock:
+            records, self.records = self.records, []
+        if not records:
+            return ""
+
+        results_dir = os.path.join(
+            os.path.dirname(os.path.dirname(__file__)), PERF_RESULTS_DIR, 'transitions'
+        )
+        os.makedirs(results_dir, exist_ok=True)
+        results_file = os.path.join(results_dir, f"{get_build_id()}.jsonl")
+        with open(results_file, 'a', encoding='utf-8') as f:
+            for record in records:
+                f.write(json.dumps(record) + '\n')
+
+        logger.info(f"Exported {len(records)} transition timings to {results_file}")
+        return results_file
+
+
+# Global transition timer shared by all screen objects
+transition_timer = TransitionTimer()
@@ -0,0 +1,440 @@
+"""Visual assertions on screenshot regions with perceptual hashes, pixel diffs and masks."""
+
+import io
+import os
+from time import perf_counter, sleep
+from typing import TYPE_CHECKING, Dict, Optional, Sequence, Tuple
+
+import numpy as np
+from PIL import Image
+from selenium.common.exceptions import TimeoutException
+
+from utils.artifact_collector import artifact_collector
+from utils.custom_keywords import run_wait_guards
+from utils.logger import logger
+from test_settings import (
+    APP_VERSION,
+    VISUAL_BASELINE_DIR,
+    VISUAL_MAX_DIFF_RATIO,
+    VISUAL_PHASH_DISTANCE,
+    VISUAL_PIXEL_TOLERANCE,
+    VISUAL_POLL_INTERVAL,
+    VISUAL_UPDATE_BASELINES
+)
+
+if TYPE_CHECKING:
+    from appium.webdriver.webdriver import WebDriver
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(__file__))
+
+# Side of the grayscale image transformed for the perceptual hash
+DCT_SIZE = 32
+# Side of the block of low frequencies forming the 64-bit hash
+HASH_SIZE = 8
+
+
+def _dct_matrix(size: int) -> np.ndarray:
+    """Orthonormal DCT-II matrix; M @ X @ M.T transforms a square image."""
+    frequencies = np.arange(size)[:, None]
+    positions = np.arange(size)[None, :]
+    matrix = np.cos(np.pi * (2 * positions + 1) * frequencies / (2 * size)) * np.sqrt(2 / size)
+    matrix[0] /= np.sqrt(2)
+    return matrix
+
+
+_DCT = _dct_matrix(DCT_SIZE)
+
+
+class Region:
+    """Rectangle of the screen, in window coordinates or as fractions of the screen."""
+
+    def __init__(self, x: float, y: float, width: float, height: float, relative: bool = False):
+        """Initialize Region.
+
+        Args:
+            x: Left edge
+            y: Top edge
+            width: Width
+            height: Height
+            relative: Whether the values are fractions (0-1) of the screen size
+        """
+        self.x, self.y, self.width, self.height = x, y, width, height
+        self.relative = relative
+
+    @classmethod
+    def from_rect(cls, rect: Dict[str, int]) -> 'Region':
+        """Create a region from an element rect (e.g. WebElement.rect)."""
+        return cls(rect['x'], rect['y'], rect['width'], rect['height'])
+
+    def bounds(self, image_size: Tuple[int, int], scale: float) -> Tuple[int, int, int, int]:
+        """Get (left, top, right, bottom) in screenshot pixels, clipped to the image.
+
+        Args:
+            image_size: Screenshot (width, height)
+            scale: Screenshot pixels per window coordinate
+        """
+        width, height = image_size
+        if self.relative:
+            box = (self.x * width, self.y * height, (self.x + self.width) * width,
+                   (self.y + self.height) * height)
+        else:
+            box = (self.x * scale, self.y * scale, (self.x + self.width) * scale,
+                   (self.y + self.height) * scale)
+        left, top, right, bottom = (int(round(value)) for value in box)
+        return (max(0, left), max(0, top), min(width, right), min(height, bottom))
+
+    def __repr__(self) -> str:
+        unit = ' relative' if self.relative else ''
+        return f"Region({self.x}, {self.y}, {self.width}x{self.height}{unit})"
+
+
+class Capture:
+    """Pixels of a screen region and which of them are compared."""
+
+    def __init__(self, pixels: np.ndarray, compared: np.ndarray):
+        """Initialize Capture.
+
+        Args:
+            pixels: RGB pixels, shape (height, width, 3)
+            compared: False where a mask hides dynamic content, shape (height, width)
+        """
+        self.pixels = pixels
+        self.compared = compared
+
+    def to_png(self) -> bytes:
+        """Encode the pixels as PNG."""
+        buffer = io.BytesIO()
+        Image.fromarray(self.pixels).save(buffer, format='PNG')
+        return buffer.getvalue()
+
+
+class VisualResult:
+    """Outcome of comparing a capture with a reference."""
+
+    def __init__(self, distance: int, diff_ratio: float, max_distance: int, max_diff: float):
+        """Initialize VisualResult.
+
+        Args:
+            distance: Perceptual hash distance in bits
+            diff_ratio: Share of compared pixels differing beyond the tolerance
+            max_distance: Maximum distance of a match
+            max_diff: Maximum diff ratio of a match
+        """
+        self.distance = distance
+        self.diff_ratio = diff_ratio
+        self.matches = distance <= max_distance and diff_ratio <= max_diff
+
+    def __repr__(self) -> str:
+        return (f"VisualResult({'match' if self.matches else 'mismatch'}, "
+                f"distance={self.distance}, diff={self.diff_ratio:.2%})")
+
+
+class VisualOptions:
+    """Thresholds and polling of visual checks and waits."""
+
+    def __init__(self, max_distance: int = VISUAL_PHASH_DISTANCE,
+                 max_diff: float = VISUAL_MAX_DIFF_RATIO,
+                 tolerance: int = VISUAL_PIXEL_TOLERANCE, timeout: float = 10,
+                 poll_interval: float = VISUAL_POLL_INTERVAL):
+        """Initialize VisualOptions.
+
+        Args:
+            max_distance: Maximum perceptual hash distance of a match
+            max_diff: Maximum share of differing pixels of a match; more
+                counts as a change when waiting for one
+            tolerance: Per-channel difference still counted as the same pixel
+            timeout: Maximum time to wait in seconds
+            poll_interval: Pause between screenshots in seconds
+        """
+        self.max_distance = max_distance
+        self.max_diff = max_diff
+        self.tolerance = tolerance
+        self.timeout = timeout
+        self.poll_interval = poll_interval
+
+
+def decode_png(png: bytes) -> np.ndarray:
+    """Decode a PNG screenshot to an RGB pixel array."""
+    with Image.open(io.BytesIO(png)) as image:
+        return np.asarray(image.convert('RGB'))
+
+
+def phash(pixels: np.ndarray) -> int:
+    """Get the 64-bit DCT perceptual hash of an image.
+
+    Args:
+        pixels: RGB pixels
+
+    Returns:
+        Hash whose bits tell whether each low frequency is above their median
+    """
+    gray = Image.fromarray(pixels).convert('L').resize((DCT_SIZE, DCT_SIZE), Image.BILINEAR)
+    coefficients = _DCT @ np.asarray(gray, dtype=np.float64) @ _DCT.T
+    low = coefficients[:HASH_SIZE, :HASH_SIZE].ravel()
+    bits = low > np.median(low[1:])
+    return int.from_bytes(np.packbits(bits).tobytes(), 'big')
+
+
+def hash_distance(first: int, second: int) -> int:
+    """Count the differing bits of two hashes."""
+    return bin(first ^ second).count('1')
+
+
+def diff_mask(first: np.ndarray, second: np.ndarray,
+              tolerance: int = VISUAL_PIXEL_TOLERANCE) -> np.ndarray:
+    """Mark the pixels whose largest channel difference exceeds the tolerance."""
+    return (np.abs(first.astype(np.int16) - second.astype(np.int16)).max(axis=2) > tolerance)
+
+
+def diff_ratio(actual: Capture, reference: Capture,
+               tolerance: int = VISUAL_PIXEL_TOLERANCE) -> float:
+    """Get the share of pixels compared in both captures that differ beyond the tolerance.
+
+    Captures of different sizes differ completely.
+    """
+    if actual.pixels.shape != reference.pixels.shape:
+        return 1.0
+    compared = actual.compared & reference.compared
+    total = int(compared.sum())
+    differing = diff_mask(actual.pixels, reference.pixels, tolerance) & compared
+    return float(differing.sum()) / total if total else 0.0
+
+
+def compare(actual: Capture, reference: Capture, max_distance: int = VISUAL_PHASH_DISTANCE,
+            max_diff: float = VISUAL_MAX_DIFF_RATIO,
+            tolerance: int = VISUAL_PIXEL_TOLERANCE) -> VisualResult:
+    """Compare a capture with a reference, ignoring masked pixels.
+
+    Masked pixels of the capture are replaced by the reference's before
+    hashing, so dynamic content changes neither the hash nor the diff.
+
+    Args:
+        actual: Current capture
+        reference: Baseline or earlier capture of the same region
+        max_distance: Maximum perceptual hash distance of a match
+        max_diff: Maximum share of differing pixels of a match
+        tolerance: Per-channel difference still counted as the same pixel
+
+    Returns:
+        Comparison result; captures of different sizes never match
+    """
+    if actual.pixels.shape != reference.pixels.shape:
+        return VisualResult(HASH_SIZE * HASH_SIZE, 1.0, max_distance, max_diff)
+    ratio = diff_ratio(actual, reference, tolerance)
+    pixels = np.where((actual.compared & reference.compared)[..., None],
+                      actual.pixels, reference.pixels)
+    return VisualResult(hash_distance(phash(pixels), phash(reference.pixels)), ratio,
+                        max_distance, max_diff)
+
+
+class VisualChecker:
+    """Capture screen regions and compare them with stored baselines or earlier captures.
+
+    Baselines are PNG files per app version. With VISUAL_UPDATE_BASELINES
+    they are recorded from the current screen; otherwise a missing baseline
+    is recorded for review and the check fails, so a new app version or a
+    fresh checkout cannot pass against whatever is on screen.
+    The wait primitives poll screenshots instead of the UI hierarchy, which
+    catches transient states such as snackbars that element queries miss.
+    """
+
+    def __init__(self, baseline_dir: str = VISUAL_BASELINE_DIR, version: str = APP_VERSION,
+                 update: bool = VISUAL_UPDATE_BASELINES):
+        """Initialize VisualChecker.
+
+        Args:
+            baseline_dir: Baseline directory, relative to the project root
+            version: Version of the app under test
+            update: Whether to overwrite baselines instead of comparing
+        """
+        self.root = os.path.join(PROJECT_ROOT, baseline_dir, version)
+        self.update = update
+
+    def baseline_path(self, name: str) -> str:
+        """Get the file of a named baseline."""
+        return os.path.join(self.root, f"{name}.png")
+
+    def capture(self, driver: "WebDriver", region: Optional[Region] = None,
+                masks: Sequence[Region] = ()) -> Capture:
+        """Take a screenshot and cut out a region.
+
+        Args:
+            driver: WebDriver instance
+            region: Region to keep, the whole screen if None
+            masks: Regions of dynamic content excluded from comparisons
+
+        Returns:
+            Pixels of the region and its compared-pixel mask
+        """
+        pixels = decode_png(driver.get_screenshot_as_png())
+        size = (pixels.shape[1], pixels.shape[0])
+        needs_scale = any(not area.relative for area in ([region] if region else []) + list(masks))
+        scale = size[0] / driver.get_window_size()['width'] if needs_scale else 1.0
+        left, top, right, bottom = region.bounds(size, scale) if region else (0, 0) + size
+        compared = np.ones((bottom - top, right - left), dtype=bool)
+        for mask in masks:
+            mask_left, mask_top, mask_right, mask_bottom = mask.bounds(size, scale)
+            compared[max(mask_top - top, 0):max(mask_bottom - top, 0),
+                     max(mask_left - left, 0):max(mask_right - left, 0)] = False
+        return Capture(pixels[top:bottom, left:right], compared)
+
+    def load_baseline(self, name: str, compared: np.ndarray) -> Optional[Capture]:
+        """Read a named baseline, or None if it was never recorded."""
+        path = self.baseline_path(name)
+        if not os.path.exists(path):
+            return None
+        with open(path, 'rb') as f:
+            return Capture(decode_png(f.read()), compared)
+
+    def save_baseline(self, name: str, capture: Capture) -> None:
+        """Record a capture as the named baseline."""
+        os.makedirs(self.root, exist_ok=True)
+        with open(self.baseline_path(name), 'wb') as f:
+            f.write(capture.to_png())
+        logger.info(f"Recorded visual baseline {self.baseline_path(name)}")
+
+    def check(self, driver: "WebDriver", name: str, region: Optional[Region] = None,
+              masks: Sequence[Region] = (),
+              options: Optional[VisualOptions] = None) -> VisualResult:
+        """Compare a region of the current screen with its named baseline.
+
+        Args:
+            driver: WebDriver instance
+            name: Baseline name
+            region: Compared region, the whole screen if None
+            masks: Regions of dynamic content excluded from the comparison
+            options: Match thresholds, the settings' defaults if None
+
+        Returns:
+            Comparison result; a match if baselines are being updated
+
+        Raises:
+            AssertionError: If the baseline is missing (it is recorded for review)
+        """
+        options = options or VisualOptions()
+        actual = self.capture(driver, region, masks)
+        if self.update:
+            self.save_baseline(name, actual)
+            return VisualResult(0, 0.0, options.max_distance, options.max_diff)
+        baseline = self._require_baseline(name, actual)
+        result = compare(actual, baseline, options.max_distance, options.max_diff,
+                         options.tolerance)
+        logger.debug(f"Visual check {name}: {result}")
+        if not result.matches:
+            self._attach_mismatch(name, actual, baseline)
+        return result
+
+    def assert_matches(self, driver: "WebDriver", name: str, region: Optional[Region] = None,
+                       masks: Sequence[Region] = (),
+                       options: Optional[VisualOptions] = None) -> VisualResult:
+        """Check a region against its baseline (see check) and fail on a mismatch.
+
+        Raises:
+            AssertionError: If the region does not match; the actual image and
+                the diff are attached to the test
+        """
+        result = self.check(driver, name, region, masks, options)
+        if not result.matches:
+            raise AssertionError(f"Screen does not match baseline {name}: {result}")
+        return result
+
+    def wait_until_changes(self, driver: "WebDriver", region: Optional[Region] = None,
+                           masks: Sequence[Region] = (), reference: Optional[Capture] = None,
+                           options: Optional[VisualOptions] = None) -> float:
+        """Wait until a region differs from a reference capture.
+
+        Args:
+            driver: WebDriver instance
+            region: Watched region, the whole screen if None
+            masks: Regions of dynamic content ignored
+            reference: Capture taken before the triggering action; taken now if None
+            options: Timeout and polling; more than max_diff differing pixels
+                count as a change
+
+        Returns:
+            Seconds until the change was seen
+
+        Raises:
+            TimeoutException: If the region does not change within the timeout
+        """
+        options = options or VisualOptions()
+        start = perf_counter()
+        reference = reference or self.capture(driver, region, masks)
+        while True:
+            run_wait_guards(driver)
+            ratio = diff_ratio(self.capture(driver, region, masks), reference, options.tolerance)
+            if ratio > options.max_diff:
+                elapsed = perf_counter() - start
+                logger.debug(f"Region {region} changed after {elapsed:.3f}s ({ratio:.2%} differ)")
+                return elapsed
+            if perf_counter() - start > options.timeout:
+                raise TimeoutException(f"Region {region} did not change within {options.timeout}s")
+            sleep(options.poll_interval)
+
+    def wait_until_matches(self, driver: "WebDriver", name: str, region: Optional[Region] = None,
+                           masks: Sequence[Region] = (),
+                           options: Optional[VisualOptions] = None) -> VisualResult:
+        """Wait until a region matches its named baseline.
+
+        Args:
+            driver: WebDriver instance
+            name: Baseline name
+            region: Compared region, the whole screen if None
+            masks: Regions of dynamic content excluded from the comparison
+            options: Match thresholds, timeout and polling
+
+        Returns:
+            The matching comparison
+
+        Raises:
+            TimeoutException: If the region does not match within the timeout
+            AssertionError: If the baseline is missing (it is recorded for review)
+        """
+        options = options or VisualOptions()
+        start = perf_counter()
+        baseline: Optional[Capture] = None
+        while True:
+            run_wait_guards(driver)
+            actual = self.capture(driver, region, masks)
+            if baseline is None:
+                if self.update:
+                    self.save_baseline(name, actual)
+                    return VisualResult(0, 0.0, options.max_distance, options.max_diff)
+                baseline = self._require_baseline(name, actual)
+            result = compare(actual, baseline, options.max_distance, options.max_diff,
+                             options.tolerance)
+            if result.matches:
+                logger.debug(f"Baseline {name} matched after {perf_counter() - start:.3f}s")
+                return result
+            if perf_counter() - start > options.timeout:
+                self._attach_mismatch(name, actual, baseline)
+                raise TimeoutException(f"Screen did not match baseline {name} within "
+                                       f"{options.timeout}s: {result}")
+            sleep(options.poll_interval)
+
+    def _require_baseline(self, name: str, actual: Capture) -> Capture:
+        """Load a baseline; record and attach a missing one, then fail."""
+        baseline = self.load_baseline(name, actual.compared)
+        if baseline is not None:
+            return baseline
+        self.save_baseline(name, actual)
+        artifact_collector.add_bytes(f"{name} recorded baseline", actual.to_png(),
+                                     'image/png', 'png')
+        raise AssertionError(f"Baseline {name} was missing and has been recorded from the current "
+                             f"screen as {self.baseline_path(name)}; review and commit it, or set "
+                             f"VISUAL_UPDATE_BASELINES")
+
+    def _attach_mismatch(self, name: str, actual: Capture, baseline: Capture) -> None:
+        """Attach the actual image and a diff highlighting changed pixels in red."""
+        artifact_collector.add_bytes(f"{name} actual", actual.to_png(), 'image/png', 'png')
+        if actual.pixels.shape != baseline.pixels.shape:
+            return
+        diff = baseline.pixels // 3
+        changed = diff_mask(actual.pixels, baseline.pixels) & actual.compared
+        diff[changed] = (255, 0, 0)
+        artifact_collector.add_bytes(f"{name} diff", Capture(diff, changed).to_png(),
+                                     'image/png', 'png')
+
+
+# Global visual checker
+visual_checker = VisualChecker()